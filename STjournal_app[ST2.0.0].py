@@ -1,93 +1,288 @@
 import streamlit as st
-import sqlite3
+import contextlib
 import datetime
-import pandas as pd
+import io
+import tempfile
+import weakref
 
-# Helper functions
-def format_full_date(date_obj):
-    day_name = date_obj.strftime("%A")
-    day = date_obj.day
-    suffix = get_ordinal_suffix(day)
-    month_year = date_obj.strftime("%B %Y")
-    return f"{day_name}, {day}{suffix} {month_year}"
-
-def get_ordinal_suffix(day):
-    if 11 <= (day % 100) <= 13:
-        return 'th'
-    return {1: 'st', 2: 'nd', 3: 'rd'}.get(day % 10, 'th')
+from journal_core import (
+    ACTIVITY_MAPPING,
+    ACTIVITY_NAMES_BY_LABEL,
+    ATTACHMENT_TYPES,
+    ACTIVITY_MATCH_ALL,
+    ACTIVITY_MATCH_ANY,
+    DEFAULT_PAGE_SIZE,
+    DRAFT_SAVE_INTERVAL,
+    EXPORT_FORMATS,
+    JOURNAL_MIGRATIONS,
+    MOOD_IDS_BY_LABEL,
+    MOOD_LABELS,
+    MOOD_MAPPING,
+    SETTINGS_MIGRATIONS,
+    ConnectionPool,
+    QueryCache,
+    THUMBNAIL_SIZE,
+    AttachmentStore,
+    DraftAutosaver,
+    SqlTracer,
+    activities_from_mask,
+    add_attachments,
+    add_entry,
+    build_fts_query,
+    delete_entry,
+    format_entry_time,
+    format_full_date,
+    is_empty_draft,
+    latest_draft_id,
+    list_entries,
+    load_activity_bits,
+    load_activity_ids,
+    load_attachments,
+    load_draft,
+    load_moods,
+    load_note,
+    load_settings,
+    load_writing_streaks,
+    new_draft_id,
+    run_migrations,
+    save_settings,
+    write_export,
+)
 
 # Database connections
+# One pool per database file, shared by every session and rerun
+@st.cache_resource(show_spinner=False)
+def get_connection_pool(path):
+    return ConnectionPool(path)
+
+# SQL tracing, switched on from the Debug panel in the sidebar. Each session
+# keeps its own traces; while tracing is off connections are not wrapped.
+def get_sql_tracer():
+    if not st.session_state.get('trace_sql'):
+        return None
+    if 'sql_tracer' not in st.session_state:
+        st.session_state.sql_tracer = SqlTracer()
+    tracer = st.session_state.sql_tracer
+    tracer.explain = st.session_state.get('explain_sql', False)
+    return tracer
+
+@contextlib.contextmanager
+def open_db(path, database):
+    with get_connection_pool(path).connection() as conn:
+        tracer = get_sql_tracer()
+        yield tracer.wrap(conn, database) if tracer else conn
+
 def get_journal_db():
-    conn = sqlite3.connect('my_journal.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    return open_db('my_journal.db', 'journal')
 
 def get_settings_db():
-    conn = sqlite3.connect('settings.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    return open_db('settings.db', 'settings')
+
+@st.cache_resource(show_spinner=False)
+def get_query_cache(path):
+    return QueryCache(path)
+
+def cached_journal_query(key, compute):
+    # Callers must not modify the result: the same object is handed to every
+    # rerun until the journal changes
+    return get_query_cache('my_journal.db').get(key, compute)
+
+# Schema setup runs once per process and database file. The schema version
+# (the number of migrations) is part of the cache key, so a newer app version
+# migrates again, but reruns never touch the schema.
+@st.cache_resource(show_spinner=False)
+def migrate_db(path, _migrations, schema_version):
+    with get_connection_pool(path).connection() as conn:
+        run_migrations(conn, _migrations)
+    return schema_version
 
 def init_dbs():
-    # Initialise journal database
-    conn_journal = get_journal_db()
-    cursor = conn_journal.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS entries (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            full_date DATE NOT NULL,
-            date TEXT NOT NULL,
-            weekday TEXT NOT NULL,
-            time TIME NOT NULL,
-            mood TEXT NOT NULL,
-            note_title TEXT,
-            note TEXT
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS activities (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS entry_activities (
-            entry_id INTEGER,
-            activity_id INTEGER,
-            FOREIGN KEY(entry_id) REFERENCES entries(id),
-            FOREIGN KEY(activity_id) REFERENCES activities(id)
-        )
-    ''')
-    predefined_activities = [
-        'work', 'relax', 'friends', 'date', 'sport', 'celebration',
-        'watching', 'reading', 'gaming', 'shopping', 'travel',
-        'good meal', 'cleaning', 'thinking', 'beaten up', 'art',
-        'sleeping', 'adrenaline', 'IDEA'
+    migrate_db('my_journal.db', JOURNAL_MIGRATIONS, len(JOURNAL_MIGRATIONS))
+    migrate_db('settings.db', SETTINGS_MIGRATIONS, len(SETTINGS_MIGRATIONS))
+
+# Attached photos are kept in the attachments folder next to the journal
+@st.cache_resource(show_spinner=False)
+def get_attachment_store(path):
+    return AttachmentStore(path)
+
+def remove_entry(entry_id):
+    with get_journal_db() as conn:
+        sha256s = [attachment['sha256'] for attachment in load_attachments(conn, entry_id)]
+        delete_entry(conn, entry_id)
+    if sha256s:
+        with get_journal_db() as conn:
+            get_attachment_store('attachments').remove_unused(conn, sha256s)
+
+# Note bodies for the Read page, fetched only when an entry is opened. Recently
+# opened bodies stay cached; entry ids are never reused, so deleted entries
+# simply age out of the cache.
+@st.cache_data(max_entries=32, show_spinner=False)
+def get_note(entry_id):
+    with get_journal_db() as conn:
+        return load_note(conn, entry_id)
+
+# Like note bodies, an entry's attachments are only looked up when it is opened
+@st.cache_data(max_entries=32, show_spinner=False)
+def get_attachments(entry_id):
+    with get_journal_db() as conn:
+        return load_attachments(conn, entry_id)
+
+def get_activity_ids():
+    def load():
+        with get_journal_db() as conn:
+            return load_activity_ids(conn)
+    return cached_journal_query(('activity_ids',), load)
+
+def get_activity_bits():
+    def load():
+        with get_journal_db() as conn:
+            return load_activity_bits(conn)
+    return cached_journal_query(('activity_bits',), load)
+
+def get_mood_labels():
+    # Emoji labels by mood id, including custom moods from imported journals
+    def load():
+        with get_journal_db() as conn:
+            return {mood_id: MOOD_MAPPING.get(name, name) for mood_id, name in load_moods(conn).items()}
+    return cached_journal_query(('mood_labels',), load)
+
+# Exports are written to a temporary file on disk as they are read, rather than
+# built up in memory, and only when the download button is clicked. Streamlit
+# runs the export outside the page script, so it takes a connection from the
+# pool directly instead of going through the session's tracer.
+def export_journal(pool, export_format, start_date, end_date, mood_ids, time_format):
+    export_file = tempfile.TemporaryFile()
+    if export_format == 'PDF':
+        # Months are laid out in worker processes, one per core
+        from journal_core.pdf_export import export_pdf_book
+        export_pdf_book(pool.path, export_file, start_date, end_date, mood_ids, time_format)
+    else:
+        text = io.TextIOWrapper(export_file, encoding='utf-8', newline='')
+        with pool.connection() as conn:
+            write_export(conn, text, export_format, start_date, end_date, mood_ids)
+        text.flush()
+        text.detach()
+    export_file.seek(0)
+    return export_file
+
+# Write page drafts
+# The Write page's fields are autosaved as a draft. Its id is kept in the page
+# URL, so a refresh or an expired session on the same URL brings it back. Any
+# other session starts a draft of its own, and the Write page offers to
+# restore the latest draft that no open session is using.
+@st.cache_resource(show_spinner=False)
+def get_open_drafts():
+    # Autosavers by draft id; each one goes away with its session's state
+    return weakref.WeakValueDictionary()
+
+def open_draft(draft_id, draft):
+    autosaver = DraftAutosaver(draft_id, saved=draft)
+    get_open_drafts()[draft_id] = autosaver
+    st.query_params['draft'] = draft_id
+    st.session_state.draft_autosaver = autosaver
+    return autosaver
+
+def get_draft_autosaver():
+    if 'draft_autosaver' not in st.session_state:
+        draft_id = st.query_params.get('draft')
+        held = get_open_drafts().get(draft_id) if draft_id else None
+        if held is not None:
+            # Another open session (a duplicated tab, say) is writing this
+            # draft. This one continues from a copy under a new id, so the two
+            # do not save over each other.
+            autosaver = open_draft(new_draft_id(), None)
+            if held.draft:
+                autosaver.update(held.draft)
+            return autosaver
+        draft = None
+        if draft_id:
+            with get_journal_db() as conn:
+                draft = load_draft(conn, draft_id)
+        open_draft(draft_id or new_draft_id(), draft)
+    return st.session_state.draft_autosaver
+
+def find_orphaned_draft():
+    with get_journal_db() as conn:
+        draft_id = latest_draft_id(conn, list(get_open_drafts().keys()))
+        return draft_id, load_draft(conn, draft_id) if draft_id else None
+
+def restore_draft(draft_id):
+    with get_journal_db() as conn:
+        draft = load_draft(conn, draft_id)
+    # Gone if it was restored and saved elsewhere in the meantime
+    if draft:
+        set_write_fields(open_draft(draft_id, draft).draft)
+
+def set_write_fields(draft):
+    now = datetime.datetime.now()
+    st.session_state.write_date = draft['entry_date'] if draft else now.date()
+    # Drafts keep the time to the minute
+    st.session_state.write_time = draft['entry_time'] if draft else now.time().replace(second=0, microsecond=0)
+    st.session_state.write_mood = MOOD_LABELS.get(draft['mood_id'], MOOD_MAPPING['Rad']) if draft else MOOD_MAPPING['Rad']
+    st.session_state.write_activities = [
+        ACTIVITY_MAPPING[activity] for activity in (draft['activities'] if draft else []) if activity in ACTIVITY_MAPPING
     ]
-    for activity in predefined_activities:
-        cursor.execute('INSERT OR IGNORE INTO activities (name) VALUES (?)', (activity,))
-    conn_journal.commit()
-    conn_journal.close()
-
-    # Initialise settings database
-    conn_settings = get_settings_db()
-    cursor = conn_settings.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS settings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            setting_name TEXT UNIQUE,
-            setting_value TEXT
-        )
-    ''')
-    conn_settings.commit()
-    conn_settings.close()
-
-def delete_entry(entry_id):
-    conn = get_journal_db()
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM entries WHERE id = ?', (entry_id,))
-    cursor.execute('DELETE FROM entry_activities WHERE entry_id = ?', (entry_id,))
-    conn.commit()
-    conn.close()
+    st.session_state.write_title = (draft['note_title'] or "") if draft else ""
+    st.session_state.write_text = (draft['note'] or "") if draft else ""
+
+def get_write_fields():
+    return {
+        'entry_date': st.session_state.write_date,
+        'entry_time': st.session_state.write_time,
+        'mood_id': MOOD_IDS_BY_LABEL[st.session_state.write_mood],
+        'activities': [ACTIVITY_NAMES_BY_LABEL[activity] for activity in st.session_state.write_activities],
+        'note_title': st.session_state.write_title,
+        'note': st.session_state.write_text,
+    }
+
+# Runs with every rerun of the page, and on its own every interval so the last
+# change is saved even if nothing else happens. At most one write per interval.
+@st.fragment(run_every=DRAFT_SAVE_INTERVAL)
+def autosave_draft():
+    autosaver = get_draft_autosaver()
+    autosaver.update(get_write_fields())
+    if autosaver.due():
+        with get_journal_db() as conn:
+            autosaver.flush(conn)
+
+def save_entry():
+    fields = get_write_fields()
+    autosaver = get_draft_autosaver()
+    photos = st.session_state.get(f"write_photos_{st.session_state.write_photos_key}") or []
+
+    # Photos are copied into the store first; the entry, its attachment rows
+    # and the removal of its draft are then saved in one transaction
+    attachment_store = get_attachment_store('attachments')
+    attachments = []
+    for photo in photos:
+        sha256, size = attachment_store.save(photo)
+        attachments.append((sha256, photo.name, photo.type, size))
+    with get_journal_db() as conn:
+        entry_id = add_entry(conn, fields['entry_date'], fields['entry_time'], fields['mood_id'],
+                             fields['activities'], fields['note_title'], fields['note'])
+        add_attachments(conn, entry_id, attachments)
+        autosaver.discard(conn)
+    autosaver.reset()
+    # Thumbnails are made in the background, ready for the Read page
+    attachment_store.prefetch_thumbnails([attachment[0] for attachment in attachments])
+
+    # Start a new entry. The file uploader can only be cleared by replacing it.
+    set_write_fields(None)
+    st.session_state.write_photos_key += 1
+    st.session_state.entry_saved = True
+
+# Read page pagination
+def show_next_read_page(page_start):
+    st.session_state.read_page_starts.append(page_start)
+
+def show_previous_read_page():
+    if len(st.session_state.read_page_starts) > 1:
+        st.session_state.read_page_starts.pop()
+
+# Start this rerun's traces
+sql_tracer = get_sql_tracer()
+if sql_tracer:
+    sql_tracer.start_rerun()
 
 # Initialise databases
 init_dbs()
@@ -107,86 +302,42 @@ st.set_page_config(
 
 # Session state initialisation
 if 'settings' not in st.session_state:
-    conn = get_settings_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT setting_name, setting_value FROM settings")
-    st.session_state.settings = {row['setting_name']: row['setting_value'] for row in cursor.fetchall()}
-    conn.close()
-
-# Mappings for UI display
-MOOD_MAPPING = {
-    'Rad': '😊 Rad',
-    'Great': '🎉 Great',
-    'meh': '😐 meh',
-    'Bad': '😞 Bad',
-    'Pissed': '😠 Pissed',
-    'Depressed': '😔 Depressed',
-    'Terrible': '😖 Terrible',
-    'Hurt': '💔 Hurt'
-}
-
-ACTIVITY_MAPPING = {
-    'work': '💼 Work',
-    'relax': '🛋️ Relax',
-    'friends': '👥 Friends',
-    'date': '💑 Date',
-    'sport': '🏋️ Sport',
-    'celebration': '🎉 Celebration',
-    'watching': '📺 Watching',
-    'reading': '📚 Reading',
-    'gaming': '🎮 Gaming',
-    'shopping': '🛍️ Shopping',
-    'travel': '✈️ Travel',
-    'good meal': '🍲 Good Meal',
-    'cleaning': '🧹 Cleaning',
-    'thinking': '🤔 Thinking',
-    'beaten up': '😵 Beaten Up',
-    'art': '🎨 Art',
-    'sleeping': '😴 Sleeping',
-    'adrenaline': '🎢 Adrenaline',
-    'IDEA': '💡 IDEA'
-}
+    with get_settings_db() as conn:
+        st.session_state.settings = load_settings(conn)
 
 # Navigation Sidebar
 page = st.sidebar.radio("Navigation", ["Write", "Read", "Analytics", "Settings"])
+if sql_tracer:
+    sql_tracer.begin_section(page)
 
 # Write Page
 if page == "Write":
     st.header("New Journal Entry")
-    with st.form("entry_form"):
-        entry_date = st.date_input("Entry Date", datetime.date.today())
-        entry_time = st.time_input("Entry Time", datetime.datetime.now().time())
-        mood = st.selectbox("Mood", list(MOOD_MAPPING.values()))
-        activities = st.multiselect("Activities", list(ACTIVITY_MAPPING.values()))
-        note_title = st.text_input("Entry Title")
-        note_text = st.text_area("Entry Text", height=200)
-        submitted = st.form_submit_button("Save Entry")
-
-    if submitted:
-        full_date = entry_date.isoformat()
-        date_str = entry_date.strftime("%B %d").lstrip("0").replace(" 0", " ")
-        weekday = entry_date.strftime("%A")
-        time_str = entry_time.strftime("%H:%M")
-        db_mood = [k for k, v in MOOD_MAPPING.items() if v == mood][0]
-        db_activities = [k for k, v in ACTIVITY_MAPPING.items() if v in activities]
-
-        conn = get_journal_db()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO entries 
-            (full_date, date, weekday, time, mood, note_title, note)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (full_date, date_str, weekday, time_str, db_mood, note_title, note_text))
-        entry_id = cursor.lastrowid
-
-        for activity in db_activities:
-            cursor.execute('''
-                INSERT INTO entry_activities (entry_id, activity_id)
-                SELECT ?, id FROM activities WHERE name = ?
-            ''', (entry_id, activity))
-        
-        conn.commit()
-        conn.close()
+    # Fields live in session state rather than a form, so they can be
+    # autosaved while the entry is written. They are filled from the draft
+    # when the page is first shown.
+    if 'write_date' not in st.session_state:
+        set_write_fields(get_draft_autosaver().draft)
+    st.session_state.setdefault('write_photos_key', 0)
+    if is_empty_draft(get_write_fields()):
+        orphan_id, orphan = find_orphaned_draft()
+        if orphan:
+            st.info(f"Unsaved draft from {format_full_date(orphan['entry_date'])}: "
+                    f"{orphan['note_title'] or 'Untitled'}")
+            st.button("Restore Draft", on_click=restore_draft, args=(orphan_id,))
+
+    st.date_input("Entry Date", key='write_date')
+    st.time_input("Entry Time", key='write_time')
+    st.selectbox("Mood", list(MOOD_MAPPING.values()), key='write_mood')
+    st.multiselect("Activities", list(ACTIVITY_MAPPING.values()), key='write_activities')
+    st.text_input("Entry Title", key='write_title')
+    st.text_area("Entry Text", height=200, key='write_text')
+    st.file_uploader("Photos", type=ATTACHMENT_TYPES, accept_multiple_files=True,
+                     key=f"write_photos_{st.session_state.write_photos_key}")
+    st.button("Save Entry", on_click=save_entry)
+    autosave_draft()
+
+    if st.session_state.pop('entry_saved', False):
         st.success("Entry saved successfully!")
 
 elif page == "Read":
@@ -202,84 +353,126 @@ elif page == "Read":
     
     selected_moods = st.sidebar.multiselect("Filter by Mood", list(MOOD_MAPPING.values()))
     selected_activities = st.sidebar.multiselect("Filter by Activities", list(ACTIVITY_MAPPING.values()))
+    activity_match = st.sidebar.radio(
+        "Activity match",
+        [ACTIVITY_MATCH_ANY, ACTIVITY_MATCH_ALL],
+        horizontal=True,
+        disabled=len(selected_activities) < 2
+    )
     search_text = st.sidebar.text_input("Search Entries")
 
     # Build query
-    base_query = '''
-        SELECT 
-            entries.*, 
-            GROUP_CONCAT(activities.name, ' | ') AS activities 
-        FROM entries
-        LEFT JOIN entry_activities ON entries.id = entry_activities.entry_id
-        LEFT JOIN activities ON entry_activities.activity_id = activities.id
-        WHERE entries.full_date BETWEEN ? AND ?
-    '''
-    params = [start_date.isoformat(), end_date.isoformat()]
-    query_parts = [base_query]
-
-    if selected_moods:
-        db_moods = [k for k, v in MOOD_MAPPING.items() if v in selected_moods]
-        placeholders = ','.join(['?'] * len(db_moods))
-        query_parts.append(f" AND entries.mood IN ({placeholders})")
-        params += db_moods
-
-    if selected_activities:
-        db_activities = [k for k, v in ACTIVITY_MAPPING.items() if v in selected_activities]
-        for activity in db_activities:
-            query_parts.append(" AND activities.name = ?")
-            params.append(activity)
-
-    if search_text:
-        query_parts.append(" AND (note_title LIKE ? OR note LIKE ?)")
-        params += [f"%{search_text}%", f"%{search_text}%"]
-
-    query_parts.append(" GROUP BY entries.id")
-    final_query = ' '.join(query_parts)
+    fts_query = build_fts_query(search_text)
+    activity_ids = get_activity_ids()
+    activity_bits = get_activity_bits()
+    activity_names = {
+        activity_bits[activity_id]: name for name, activity_id in activity_ids.items() if activity_id in activity_bits
+    }
+    use_activity_mask = len(activity_bits) == len(activity_ids)
+    mood_ids = [MOOD_IDS_BY_LABEL[mood] for mood in selected_moods]
+    db_activities = [ACTIVITY_NAMES_BY_LABEL[activity] for activity in selected_activities]
+
+    page_size = int(st.session_state.settings.get('page_size', DEFAULT_PAGE_SIZE))
+    filter_key = (
+        start_date, end_date, tuple(selected_moods), tuple(selected_activities),
+        activity_match, fts_query, page_size
+    )
+    if st.session_state.get('read_filters') != filter_key:
+        st.session_state.read_filters = filter_key
+        st.session_state.read_page_starts = [None]
+
+    page_start = st.session_state.read_page_starts[-1]
 
     # Fetch entries
-    conn = get_journal_db()
-    cursor = conn.cursor()
-    cursor.execute(final_query, params)
-    entries = cursor.fetchall()
-    conn.close()
+    def fetch_page():
+        with get_journal_db() as conn:
+            return list_entries(
+                conn,
+                start_date,
+                end_date,
+                page_start,
+                page_size,
+                mood_ids=mood_ids,
+                activity_ids=[activity_ids.get(activity) for activity in db_activities],
+                match_all=activity_match == ACTIVITY_MATCH_ALL,
+                activity_bits=activity_bits,
+                fts_query=fts_query,
+                use_activity_mask=use_activity_mask
+            )
+
+    entries, next_page_start = cached_journal_query(('read_page', filter_key, page_start), fetch_page)
 
     # Display entries
     if not entries:
         st.info("No entries found matching the current filters.")
     else:
+        mood_labels = get_mood_labels()
         for entry in entries:
-            with st.expander(f"{entry['note_title']} - {entry['date']}"):
+            header = f"{entry['note_title']} - {entry['date']}"
+            if fts_query and entry['excerpt']:
+                header += f" — {' '.join(entry['excerpt'].split())}"
+            with st.expander(header):
                 col1, col2 = st.columns([1, 3])
                 with col1:
                     st.subheader("Details")
                     st.write(f"**Date:** {format_full_date(datetime.date.fromisoformat(entry['full_date']))}")
                     
-                    # Time formatting
-                    time_str = entry['time']
-                    if st.session_state.settings.get('time_format') == '12-hour':
-                        time_obj = datetime.datetime.strptime(time_str, "%H:%M")
-                        display_time = time_obj.strftime("%I:%M %p")
-                    else:
-                        display_time = time_str
+                    display_time = format_entry_time(entry['time'], st.session_state.settings.get('time_format'))
                     st.write(f"**Time:** {display_time}")
                     
-                    st.write(f"**Mood:** {MOOD_MAPPING.get(entry['mood'], entry['mood'])}")
-                    activities = [ACTIVITY_MAPPING.get(a, a) for a in entry['activities'].split(' | ')] if entry['activities'] else []
+                    st.write(f"**Mood:** {mood_labels.get(entry['mood_id'], entry['mood_id'])}")
+                    if use_activity_mask:
+                        entry_activities = activities_from_mask(entry['activity_mask'], activity_names)
+                    else:
+                        entry_activities = entry['activities'].split(' | ') if entry['activities'] else []
+                    activities = [ACTIVITY_MAPPING.get(a, a) for a in entry_activities]
                     st.write(f"**Activities:** {', '.join(activities) if activities else 'None'}")
 
                     if st.button(
                         "🗑️ Delete Entry",
                         key=f"delete_{entry['id']}",
-                        on_click=delete_entry,
+                        on_click=remove_entry,
                         args=(entry['id'],),
                         help="Permanently delete this entry"
                     ):
                         st.success("Entry deleted successfully!")
-                        st.experimental_rerun()
+                        st.rerun()
 
                 with col2:
                     st.subheader("Entry Content")
-                    st.write(entry['note'])
+                    if st.toggle("📖 Show entry", key=f"show_{entry['id']}"):
+                        st.write(get_note(entry['id']))
+                        attachments = get_attachments(entry['id'])
+                        if attachments:
+                            thumbnails = get_attachment_store('attachments').thumbnails(
+                                [attachment['sha256'] for attachment in attachments]
+                            )
+                            shown = [(thumbnail, attachment['file_name'])
+                                     for thumbnail, attachment in zip(thumbnails, attachments) if thumbnail]
+                            if shown:
+                                st.image([thumbnail for thumbnail, _ in shown],
+                                         caption=[name for _, name in shown], width=THUMBNAIL_SIZE)
+
+        # Page controls
+        page_number = len(st.session_state.read_page_starts)
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            st.button(
+                "← Previous",
+                on_click=show_previous_read_page,
+                disabled=page_number == 1,
+                width='stretch'
+            )
+        with page_col:
+            st.caption(f"Page {page_number}")
+        with next_col:
+            st.button(
+                "Next →",
+                on_click=show_next_read_page,
+                args=(next_page_start,),
+                disabled=next_page_start is None,
+                width='stretch'
+            )
 
 # Settings Page
 elif page == "Settings":
@@ -291,35 +484,71 @@ elif page == "Settings":
         options=['24-hour', '12-hour'], 
         index=0 if current_format == '24-hour' else 1
     )
+
+    current_page_size = int(st.session_state.settings.get('page_size', DEFAULT_PAGE_SIZE))
+    new_page_size = st.number_input(
+        "Entries per page",
+        min_value=5,
+        max_value=200,
+        value=current_page_size,
+        step=5
+    )
     
     if st.button("Save Settings"):
-        conn = get_settings_db()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO settings (setting_name, setting_value)
-            VALUES ('time_format', ?)
-        ''', (new_format,))
-        conn.commit()
-        conn.close()
-        st.session_state.settings = {'time_format': new_format}
+        new_settings = {'time_format': new_format, 'page_size': str(new_page_size)}
+        with get_settings_db() as conn:
+            save_settings(conn, new_settings)
+        st.session_state.settings = new_settings
         st.success("Settings updated!")
 
+    st.subheader("Export Journal")
+    from journal_core.pdf_export import PDF_FORMAT, missing_pdf_dependencies
+    export_format = st.radio("Format", [*EXPORT_FORMATS, 'PDF'], horizontal=True)
+    export_all_dates = st.checkbox("All dates", value=True)
+    export_start = export_end = None
+    if not export_all_dates:
+        export_col1, export_col2 = st.columns(2)
+        with export_col1:
+            export_start = st.date_input("From", datetime.date.today() - datetime.timedelta(days=365))
+        with export_col2:
+            export_end = st.date_input("To", datetime.date.today())
+    mood_labels = get_mood_labels()
+    export_moods = st.multiselect("Moods (all when empty)", list(mood_labels.values()))
+    export_mood_ids = [mood_id for mood_id, label in mood_labels.items() if label in export_moods]
+
+    extension, mime = PDF_FORMAT if export_format == 'PDF' else EXPORT_FORMATS[export_format]
+    missing = missing_pdf_dependencies() if export_format == 'PDF' else []
+    if missing:
+        st.info(f"PDF export needs {' and '.join(missing)}: `pip install {' '.join(missing)}`")
+    else:
+        pool = get_connection_pool('my_journal.db')
+        time_format = st.session_state.settings.get('time_format', '24-hour')
+        st.download_button(
+            f"Download {export_format}",
+            data=lambda: export_journal(pool, export_format, export_start, export_end, export_mood_ids, time_format),
+            file_name=f"journal_entries.{extension}",
+            mime=mime,
+            on_click="ignore"
+        )
+    if export_format == 'CSV':
+        st.caption("CSV exports can be imported with helper-scripts/csv_to_sqlite.py")
+
 elif page == "Analytics":
+    # pandas and NumPy are only needed here, so they are imported the first
+    # time this page is opened instead of when the app starts
+    from journal_core.analytics import load_activity_pairs, load_mood_counts, summarise_moods
+
     st.header("📈 Journal Analytics")
     
-    conn = get_journal_db()
-    query = '''
-        SELECT full_date, mood 
-        FROM entries
-        ORDER BY full_date
-    '''
-    mood_df = pd.read_sql(query, conn)
-    conn.close()
+    def get_mood_counts():
+        with get_journal_db() as conn:
+            return load_mood_counts(conn)
+
+    mood_df = cached_journal_query(('mood_counts',), get_mood_counts)
     
     if not mood_df.empty:
-        mood_df['full_date'] = pd.to_datetime(mood_df['full_date'])
-        min_date = mood_df['full_date'].min().date()
-        max_date = mood_df['full_date'].max().date()
+        min_date = mood_df['day'].min().date()
+        max_date = mood_df['day'].max().date()
         
         with st.sidebar:
             st.subheader("Date Range")
@@ -329,46 +558,105 @@ elif page == "Analytics":
                 min_value=min_date,
                 max_value=max_date
             )
+
+        summary = cached_journal_query(
+            ('mood_summary', start_date, end_date),
+            lambda: summarise_moods(mood_df, start_date, end_date)
+        )
+        mood_totals = summary['mood_totals']
         
-        mask = (mood_df['full_date'].dt.date >= start_date) & (mood_df['full_date'].dt.date <= end_date)
-        filtered_df = mood_df[mask]
-        
-        if not filtered_df.empty:
+        if summary['total_entries']:
             # Mood Frequency Chart
             st.subheader("Mood Distribution")
-            freq_df = filtered_df['mood'].map(MOOD_MAPPING).value_counts().reset_index()
+            freq_df = mood_totals.reset_index()
             freq_df.columns = ['Mood', 'Count']
-            st.bar_chart(freq_df.set_index('Mood'), use_container_width=True)
+            st.bar_chart(freq_df.set_index('Mood'), width='stretch')
             
             # Mood Timeline Chart
             st.subheader("Mood Timeline")
-            timeline_df = filtered_df.copy()
-            timeline_df['mood'] = timeline_df['mood'].map(MOOD_MAPPING)
-            timeline_df = timeline_df.groupby(
-                [pd.Grouper(key='full_date', freq='D'), 'mood']
-            ).size().unstack(fill_value=0)
-            
-            date_range = pd.date_range(start=start_date, end=end_date)
-            timeline_df = timeline_df.reindex(date_range, fill_value=0)
-            
-            st.line_chart(timeline_df, height=400)
+            st.line_chart(summary['timeline'], height=400)
             
             # Statistics Section
             st.subheader("Key Statistics")
-            col1, col2, col3 = st.columns(3)
+            col1, col2, col3, col4, col5 = st.columns(5)
             
             with col1:
-                st.metric("Total Entries", len(filtered_df))
+                st.metric("Total Entries", summary['total_entries'])
                 
             with col2:
-                most_common_mood = filtered_df['mood'].map(MOOD_MAPPING).mode()[0]
+                most_common_mood = mood_totals.index[0] if not mood_totals.empty else "None"
                 st.metric("Most Frequent Mood", most_common_mood)
                 
             with col3:
-                days_with_entries = filtered_df['full_date'].nunique()
-                st.metric("Days with Entries", days_with_entries)
+                st.metric("Days with Entries", summary['days_with_entries'])
+
+            # Streaks cover the whole journal, not just the selected range
+            def get_writing_streaks():
+                with get_journal_db() as conn:
+                    return load_writing_streaks(conn, today)
+
+            today = datetime.date.today()
+            streaks = cached_journal_query(('writing_streaks', today), get_writing_streaks)
+            with col4:
+                st.metric("Current Streak (days)", streaks['current'])
+
+            with col5:
+                st.metric("Longest Streak (days)", streaks['longest'])
+
+            # Activity Co-occurrence
+            st.subheader("Activities Together")
+
+            def get_activity_pairs():
+                activity_names = {activity_id: name for name, activity_id in get_activity_ids().items()}
+                with get_journal_db() as conn:
+                    return load_activity_pairs(conn, start_date, end_date, activity_names)
+
+            pairs_df = cached_journal_query(('activity_pairs', start_date, end_date), get_activity_pairs)
+            if pairs_df.empty:
+                st.caption("No activities recorded in the selected date range")
+            else:
+                st.caption("How many entries had both activities. The diagonal is each activity on its own.")
+                st.dataframe(pairs_df, width='stretch')
                 
         else:
             st.warning("No entries found in the selected date range")
     else:
-        st.info("No journal entries available for analysis yet!")
\ No newline at end of file
+        st.info("No journal entries available for analysis yet!")
+
+if sql_tracer:
+    sql_tracer.end_section()
+
+# Debug panel
+with st.sidebar.expander("🐞 Debug"):
+    st.toggle("Trace SQL", key='trace_sql')
+    st.checkbox("Explain query plans", key='explain_sql', disabled=not st.session_state.trace_sql)
+    if sql_tracer:
+        for section in sql_tracer.rerun_sections():
+            st.caption(f"{section['section']} page: {section['ms']:.1f} ms")
+        slowest = sql_tracer.slowest()
+        if slowest:
+            st.write("Slowest statements this rerun")
+            st.dataframe(
+                [{
+                    'ms': round(record['ms'], 2),
+                    'rows': record['rows'],
+                    'database': record['database'],
+                    'statement': record['statement'],
+                    'params': record['params'],
+                    'plan': ' / '.join(record['plan'] or []),
+                } for record in slowest],
+                hide_index=True,
+                width='stretch'
+            )
+        else:
+            st.caption("No statements ran in this rerun")
+        st.download_button(
+            "Export traces (JSON lines)",
+            data=sql_tracer.to_jsonl(),
+            file_name="sql_traces.jsonl",
+            mime="application/x-ndjson"
+        )
+
+# Cache statistics
+query_cache = get_query_cache('my_journal.db')
+st.sidebar.caption(f"Query cache: {query_cache.hits} hits · {query_cache.misses} misses")
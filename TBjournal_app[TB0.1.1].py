@@ -1,7 +1,112 @@
-import ttkbootstrap as tb
 import time
-from PIL import Image, ImageTk
-from datetime import datetime
+
+# Taken before anything else is imported, to measure the time to first paint
+STARTED_AT = time.perf_counter()
+
+import os
+import ttkbootstrap as tb
+import tkinter as tk
+from collections import OrderedDict
+from datetime import date, datetime
+from ttkbootstrap.dialogs import Messagebox
+
+from journal_core import (
+    ACTIVITY_MAPPING,
+    ACTIVITY_NAMES_BY_LABEL,
+    MOOD_IDS_BY_LABEL,
+    MOOD_MAPPING,
+    DatabaseWorker,
+    activities_from_mask,
+    add_entry,
+    format_full_date,
+    get_entry,
+    list_entries,
+    load_activity_bits,
+    load_activity_ids,
+    load_moods,
+    load_page_anchors,
+    load_writing_streaks,
+)
+
+# How often finished database calls are picked up by the main loop
+DB_POLL_MS = 30
+
+# With this set, the app prints its time to first paint and closes
+# (benchmarks/startup_budget.py uses it)
+STARTUP_REPORT_ENV = "JOURNAL_STARTUP_REPORT"
+
+# The logo is shipped already resized, as a PNG Tk can load by itself. Delete
+# the cache after changing the logo and it is made again on the next start.
+LOGO_PATH = "images/smilecat.jpg"
+LOGO_CACHE_PATH = "images/smilecat_100.png"
+LOGO_SIZE = 100
+
+# Read page list: rows are fetched a page at a time, only around what is on
+# screen, and the most recently used pages are kept
+READ_PAGE_SIZE = 100
+READ_CACHED_PAGES = 30
+READ_PREFETCH_PAGES = 1
+
+def load_journal_overview(conn):
+    # Runs on the database thread; reads the daily rollup and streak tables
+    # rather than every entry
+    cursor = conn.cursor()
+    cursor.execute('SELECT COALESCE(SUM(n), 0), COUNT(DISTINCT day) FROM daily_mood_counts')
+    total_entries, days_with_entries = cursor.fetchone()
+    cursor.execute('''
+        SELECT moods.name FROM daily_mood_counts
+        JOIN moods ON moods.id = daily_mood_counts.mood_id
+        GROUP BY daily_mood_counts.mood_id
+        ORDER BY SUM(daily_mood_counts.n) DESC
+        LIMIT 1
+    ''')
+    row = cursor.fetchone()
+    streaks = load_writing_streaks(conn)
+    return {
+        'total_entries': total_entries,
+        'most_frequent_mood': MOOD_MAPPING.get(row[0], row[0]) if row else "None",
+        'days_with_entries': days_with_entries,
+        'current_streak': streaks['current'],
+        'longest_streak': streaks['longest'],
+    }
+
+def load_entry_list(conn):
+    # Runs on the database thread when the Read page is shown: the entry count,
+    # where every page of the list starts, and the names rows are shown with
+    activity_ids = load_activity_ids(conn)
+    activity_bits = load_activity_bits(conn)
+    total, anchors = load_page_anchors(conn, date.min, date.max, READ_PAGE_SIZE)
+    return {
+        'total': total,
+        'anchors': anchors,
+        'mood_labels': {mood_id: MOOD_MAPPING.get(name, name) for mood_id, name in load_moods(conn).items()},
+        'activity_names': {
+            activity_bits[activity_id]: name for name, activity_id in activity_ids.items()
+            if activity_id in activity_bits
+        },
+        'use_activity_mask': len(activity_bits) == len(activity_ids),
+    }
+
+def load_entry_list_page(conn, page_start, entry_list):
+    # Runs on the database thread; returns (entry id, column values) for each
+    # row of the page that starts after page_start
+    use_activity_mask = entry_list['use_activity_mask']
+    entries, _ = list_entries(conn, date.min, date.max, page_start, READ_PAGE_SIZE,
+                              use_activity_mask=use_activity_mask)
+    rows = []
+    for entry in entries:
+        if use_activity_mask:
+            activities = activities_from_mask(entry['activity_mask'], entry_list['activity_names'])
+        else:
+            activities = entry['activities'].split(' | ') if entry['activities'] else []
+        rows.append((entry['id'], (
+            format_full_date(date.fromisoformat(entry['full_date'])),
+            entry['time'],
+            entry_list['mood_labels'].get(entry['mood_id'], entry['mood_id']),
+            entry['note_title'] or "",
+            ', '.join(ACTIVITY_MAPPING.get(activity, activity) for activity in activities),
+        )))
+    return rows
 
 class JournalApp(tb.Window):
     def __init__(self):
@@ -16,22 +121,55 @@ class JournalApp(tb.Window):
         self.container.grid_rowconfigure(0, weight=1)
         self.container.grid_columnconfigure(0, weight=1)
 
-        # Initialise pages
+        # Database calls run on a worker thread so they never freeze the
+        # window; their results are handed back to the main loop by
+        # poll_database
+        self.db = DatabaseWorker("my_journal.db")
+        self.after(DB_POLL_MS, self.poll_database)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Pages are built the first time they are shown, so only the main
+        # menu is built before the window appears
+        self.page_classes = {
+            Page.__name__: Page for Page in (MainMenuPage, WritePage, ReadPage, StatsPage, SettingsPage)
+        }
         self.pages = {}
-        for Page in (MainMenuPage, WritePage, ReadPage, StatsPage, SettingsPage):
-            page_name = Page.__name__
-            self.pages[page_name] = Page(parent=self.container, controller=self)
-            self.pages[page_name].grid(row=0, column=0, sticky="nsew")
 
         self.show_page("MainMenuPage")
         self.bind("<Escape>", lambda e: self.toggle_fullscreen(False))
+        self.first_paint_ms = None
+        self.after_idle(self.record_first_paint)
 
     def show_page(self, page_name):
-        page = self.pages[page_name]
+        page = self.pages.get(page_name)
+        if page is None:
+            page = self.page_classes[page_name](parent=self.container, controller=self)
+            page.grid(row=0, column=0, sticky="nsew")
+            self.pages[page_name] = page
         page.tkraise()
         if hasattr(page, "on_page_enter"):
             page.on_page_enter()
 
+    def poll_database(self):
+        try:
+            self.db.deliver_results()
+        finally:
+            self.after(DB_POLL_MS, self.poll_database)
+
+    def record_first_paint(self):
+        # Runs once the main loop is idle for the first time; the window is
+        # fully drawn after update_idletasks
+        self.update_idletasks()
+        self.first_paint_ms = (time.perf_counter() - STARTED_AT) * 1000
+        if os.environ.get(STARTUP_REPORT_ENV):
+            print(f"first paint: {self.first_paint_ms:.0f} ms", flush=True)
+            self.on_close()
+
+    def on_close(self):
+        # Lets a save that is still running finish before the app exits
+        self.db.close()
+        self.destroy()
+
     def toggle_fullscreen(self, event=None):
         self.fullscreen = not self.fullscreen
         self.attributes("-fullscreen", self.fullscreen)
@@ -56,9 +194,15 @@ class MainMenuPage(tb.Frame):
         header = tb.Frame(main_frame)
         header.pack(pady=40)
         
-        image = Image.open("images/smilecat.jpg").resize((100, 100))
-        self.logo = ImageTk.PhotoImage(image)
-        tb.Label(header, image=self.logo).pack(side='left', padx=20)
+        if os.path.exists(LOGO_CACHE_PATH):
+            self.logo = tk.PhotoImage(file=LOGO_CACHE_PATH)
+        else:
+            # Blank placeholder the size of the logo, so the layout does not
+            # move when the logo arrives after the window is shown
+            self.logo = tk.PhotoImage(width=LOGO_SIZE, height=LOGO_SIZE)
+            self.after_idle(self.make_logo_cache)
+        self.logo_label = tb.Label(header, image=self.logo)
+        self.logo_label.pack(side='left', padx=20)
         
         title_frame = tb.Frame(header)
         title_frame.pack(side='left')
@@ -105,9 +249,20 @@ class MainMenuPage(tb.Frame):
                  bootstyle='outline',
                  padding=5).pack(side='left', padx=10)
 
+    def make_logo_cache(self):
+        # Pillow is only needed to make the logo cache, so it is imported here
+        # instead of before the window appears
+        from PIL import Image
+        with Image.open(LOGO_PATH) as image:
+            image.draft('RGB', (LOGO_SIZE, LOGO_SIZE))
+            image.resize((LOGO_SIZE, LOGO_SIZE)).save(LOGO_CACHE_PATH)
+        self.logo = tk.PhotoImage(file=LOGO_CACHE_PATH)
+        self.logo_label.configure(image=self.logo)
+
 class WritePage(tb.Frame):
-    MOOD_OPTIONS = ['Happy', 'Sad', 'Excited', 'Calm', 'Angry', 'Tired', 'Motivated']
-    ACTIVITY_OPTIONS = ['Work', 'Exercise', 'Study', 'Social', 'Relax', 'Hobby', 'Travel']
+    # Same moods and activities as the Streamlit app, which shares the journal
+    MOOD_OPTIONS = list(MOOD_MAPPING.values())
+    ACTIVITY_OPTIONS = list(ACTIVITY_MAPPING.values())
     
     def __init__(self, parent, controller):
         super().__init__(parent)
@@ -168,8 +323,9 @@ class WritePage(tb.Frame):
         button_frame = tb.Frame(main_frame)
         button_frame.grid(row=7, column=0, columnspan=2, pady=15)
 
-        tb.Button(button_frame, text="Save Entry", 
-                 command=self.save_entry, bootstyle="success").pack(side='left', padx=5)
+        self.save_button = tb.Button(button_frame, text="Save Entry",
+                                     command=self.save_entry, bootstyle="success")
+        self.save_button.pack(side='left', padx=5)
         tb.Button(button_frame, text="Clear", 
                  command=self.clear_form, bootstyle="warning").pack(side='left', padx=5)
         tb.Button(button_frame, text="← Main Menu", 
@@ -181,19 +337,51 @@ class WritePage(tb.Frame):
         main_frame.rowconfigure(6, weight=1)
 
     def save_entry(self):
-        entry_data = {
-            'date': self.date_entry.entry.get(),
-            'time': f"{self.time_hour.get()}:{self.time_minute.get()}",
-            'mood': self.mood.get(),
-            'activity': self.activity.get(),
-            'title': self.title_entry.get(),
-            'entry': self.entry_text.get("1.0", 'end-1c')
-        }
-        # Here you would typically save to database/file
-        print("Saved Entry:", entry_data)
+        try:
+            entry_date = self.parse_date(self.date_entry.entry.get())
+            entry_time = datetime.strptime(f"{self.time_hour.get()}:{self.time_minute.get()}", "%H:%M").time()
+        except ValueError:
+            Messagebox.show_error("Please enter a valid date and time.", title="Journal Entry", parent=self)
+            return
+        if self.mood.get() not in MOOD_IDS_BY_LABEL:
+            Messagebox.show_error("Please pick a mood.", title="Journal Entry", parent=self)
+            return
+        activity = ACTIVITY_NAMES_BY_LABEL.get(self.activity.get())
+
+        # Saved on the database thread; the button stays disabled until the
+        # save has finished so an entry cannot be saved twice
+        self.save_button.configure(state='disabled')
+        self.controller.db.submit(
+            add_entry,
+            entry_date,
+            entry_time,
+            MOOD_IDS_BY_LABEL[self.mood.get()],
+            [activity] if activity else [],
+            self.title_entry.get(),
+            self.entry_text.get("1.0", 'end-1c'),
+            on_done=self.entry_saved,
+            on_error=self.save_failed
+        )
+
+    @staticmethod
+    def parse_date(text):
+        # The date picker shows the locale's date format until the form is cleared
+        for date_format in ("%Y-%m-%d", "%x"):
+            try:
+                return datetime.strptime(text.strip(), date_format).date()
+            except ValueError:
+                continue
+        raise ValueError(f"Unrecognised date: {text}")
+
+    def entry_saved(self, entry_id):
+        self.save_button.configure(state='normal')
         self.clear_form()
         self.controller.show_page("MainMenuPage")
 
+    def save_failed(self, error):
+        self.save_button.configure(state='normal')
+        Messagebox.show_error(f"The entry could not be saved:\n{error}", title="Journal Entry", parent=self)
+
     def clear_form(self):
         self.date_entry.entry.delete(0, 'end')
         self.date_entry.entry.insert(0, datetime.now().strftime("%Y-%m-%d"))
@@ -206,13 +394,273 @@ class WritePage(tb.Frame):
         self.entry_text.delete("1.0", 'end')
 
 class ReadPage(tb.Frame):
+    # The list only ever holds the rows that fit on screen. Scrolling moves
+    # self.top (the index of the first row shown) and refills those rows from
+    # the cached pages, so it costs the same with a hundred entries or a
+    # hundred thousand. Pages that are not cached yet show as "Loading…" until
+    # the database thread has read them.
+    COLUMNS = (
+        ('date', "Date", 220),
+        ('time', "Time", 60),
+        ('mood', "Mood", 110),
+        ('title', "Title", 200),
+        ('activities', "Activities", 250),
+    )
+
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
-        tb.Label(self, text="Read Page - Coming Soon!", 
-                font=('Helvetica', 16)).pack(pady=50, expand=True)
+        self.entry_list = None
+        self.total = 0
+        self.top = 0
+        self.visible_rows = 20
+        self.pages = OrderedDict()
+        self.loading_page = None
+        # Bumped on every reload so results for an older list are ignored
+        self.generation = 0
+        self.selected_index = None
+        self.note_entry_id = None
+
+        header = tb.Frame(self)
+        header.pack(fill='x', padx=20, pady=10)
+        tb.Label(header, text="Read Entries", font=('Helvetica', 16)).pack(side='left')
+        self.status_label = tb.Label(header, text="", bootstyle='secondary')
+        self.status_label.pack(side='right')
+
         tb.Button(self, text="← Main Menu", command=lambda: self.controller.show_page("MainMenuPage")).pack(side="bottom", pady=15)
 
+        # Note of the selected entry
+        self.note_text = tb.Text(self, height=8, wrap='word', state='disabled')
+        self.note_text.pack(side='bottom', fill='x', padx=20)
+
+        list_frame = tb.Frame(self)
+        list_frame.pack(fill='both', expand=True, padx=20, pady=(0, 10))
+        self.scrollbar = tb.Scrollbar(list_frame, orient='vertical', command=self.scroll)
+        self.scrollbar.pack(side='right', fill='y')
+        self.tree_frame = tb.Frame(list_frame)
+        self.tree_frame.pack(side='left', fill='both', expand=True)
+        self.tree = tb.Treeview(self.tree_frame, columns=[key for key, _, _ in self.COLUMNS],
+                                show='headings', selectmode='browse', height=self.visible_rows)
+        for key, text, width in self.COLUMNS:
+            self.tree.heading(key, text=text)
+            self.tree.column(key, width=width, anchor='w')
+        self.tree.pack(fill='x', anchor='n')
+        self.slots = []
+
+        self.tree_frame.bind('<Configure>', self.resize)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.tree.bind('<MouseWheel>', self.on_mousewheel)
+        self.tree.bind('<Button-4>', self.on_mousewheel)
+        self.tree.bind('<Button-5>', self.on_mousewheel)
+        self.tree.bind('<Up>', lambda e: self.move_selection(-1))
+        self.tree.bind('<Down>', lambda e: self.move_selection(1))
+        self.tree.bind('<Prior>', lambda e: self.move_selection(-self.visible_rows))
+        self.tree.bind('<Next>', lambda e: self.move_selection(self.visible_rows))
+        self.tree.bind('<Home>', lambda e: self.move_selection(-self.total))
+        self.tree.bind('<End>', lambda e: self.move_selection(self.total))
+
+    def on_page_enter(self):
+        # Reloaded each time, so entries written since show up
+        self.generation += 1
+        self.entry_list = None
+        self.pages.clear()
+        self.loading_page = None
+        self.status_label.configure(text="Loading…")
+        generation = self.generation
+        self.controller.db.submit(load_entry_list, on_done=lambda entry_list: self.list_loaded(generation, entry_list),
+                                  on_error=lambda error: self.load_failed(generation, error))
+
+    def list_loaded(self, generation, entry_list):
+        if generation != self.generation:
+            return
+        self.entry_list = entry_list
+        self.total = entry_list['total']
+        self.status_label.configure(text=f"{self.total:,} entries")
+        if self.selected_index is not None and self.selected_index >= self.total:
+            self.selected_index = None
+        self.scroll_to(self.top, force=True)
+
+    def wanted_pages(self):
+        # Pages on screen first, then their neighbours
+        first_page = self.top // READ_PAGE_SIZE
+        last_page = (self.top + self.visible_rows - 1) // READ_PAGE_SIZE
+        pages = list(range(first_page, last_page + 1))
+        for distance in range(1, READ_PREFETCH_PAGES + 1):
+            pages += [first_page - distance, last_page + distance]
+        return [page for page in pages if 0 <= page * READ_PAGE_SIZE < self.total]
+
+    def fetch_pages(self):
+        # Only one page is read at a time, and which one is decided when the
+        # previous one arrives. Dragging the scrollbar across the journal so
+        # never queues up pages that are no longer on screen.
+        for page in self.wanted_pages():
+            if page in self.pages:
+                self.pages.move_to_end(page)
+            elif self.loading_page is None:
+                self.loading_page = page
+                page_start = self.entry_list['anchors'][page - 1] if page else None
+                generation = self.generation
+                self.controller.db.submit(load_entry_list_page, page_start, self.entry_list,
+                                          on_done=lambda rows, page=page: self.page_loaded(generation, page, rows),
+                                          on_error=lambda error, page=page: self.page_failed(page, error))
+
+    def page_loaded(self, generation, page, rows):
+        if generation != self.generation:
+            return
+        self.loading_page = None
+        self.pages[page] = rows
+        # Clears the message of an earlier failed read
+        self.status_label.configure(text=f"{self.total:,} entries")
+        # Pages on screen were used last, so they are never the ones dropped
+        while len(self.pages) > READ_CACHED_PAGES:
+            self.pages.popitem(last=False)
+        first_page = self.top // READ_PAGE_SIZE
+        last_page = (self.top + self.visible_rows - 1) // READ_PAGE_SIZE
+        if first_page <= page <= last_page:
+            self.render()
+        else:
+            self.fetch_pages()
+
+    def page_failed(self, page, error):
+        # Whatever the generation, a failed read must not leave loading_page
+        # set, or no page would be read again. It is retried when next wanted.
+        if self.loading_page == page:
+            self.loading_page = None
+        self.load_failed(self.generation, error)
+
+    def load_failed(self, generation, error):
+        if generation == self.generation:
+            self.status_label.configure(text=f"Entries could not be loaded: {error}")
+
+    def row_at(self, index):
+        page = self.pages.get(index // READ_PAGE_SIZE)
+        offset = index % READ_PAGE_SIZE
+        if page is None or offset >= len(page):
+            return None
+        return page[offset]
+
+    def render(self):
+        if self.entry_list is None:
+            return
+        # One Treeview item per row on screen, reused as the list scrolls
+        shown = max(0, min(self.visible_rows, self.total - self.top))
+        while len(self.slots) < shown:
+            self.slots.append(self.tree.insert('', tb.END))
+        while len(self.slots) > shown:
+            self.tree.delete(self.slots.pop())
+
+        selected_slot = None
+        for position, slot in enumerate(self.slots):
+            index = self.top + position
+            row = self.row_at(index)
+            self.tree.item(slot, values=row[1] if row else ("Loading…",))
+            if index == self.selected_index:
+                selected_slot = slot
+        if selected_slot:
+            if self.tree.selection() != (selected_slot,):
+                self.tree.selection_set(selected_slot)
+            self.show_note(self.selected_index)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+        if self.total:
+            self.scrollbar.set(self.top / self.total, (self.top + shown) / self.total)
+        else:
+            self.scrollbar.set(0, 1)
+        self.fetch_pages()
+
+    def scroll_to(self, top, force=False):
+        top = max(0, min(top, self.total - self.visible_rows))
+        if top != self.top or force:
+            self.top = top
+            self.render()
+
+    def scroll(self, action, amount, unit=None):
+        # Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * self.total))
+        else:
+            step = self.visible_rows if unit == 'pages' else 1
+            self.scroll_to(self.top + int(amount) * step)
+
+    def on_mousewheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.top - 3)
+        else:
+            self.scroll_to(self.top + 3)
+        return "break"
+
+    def resize(self, event):
+        # As many rows as fit in the space the list has (one row is left for
+        # the headings)
+        row_height = int(self.tree.tk.call('ttk::style', 'lookup', 'Treeview', '-rowheight') or 20)
+        visible_rows = max(1, event.height // row_height - 1)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.tree.configure(height=visible_rows)
+            self.scroll_to(self.top, force=True)
+
+    def move_selection(self, delta):
+        if not self.total:
+            return "break"
+        if self.selected_index is None:
+            index = self.top
+        else:
+            index = max(0, min(self.selected_index + delta, self.total - 1))
+        self.selected_index = index
+        if index < self.top:
+            self.scroll_to(index)
+        elif index >= self.top + self.visible_rows:
+            self.scroll_to(index - self.visible_rows + 1)
+        else:
+            self.render()
+        return "break"
+
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self.slots:
+            return
+        self.selected_index = self.top + self.slots.index(selection[0])
+        self.show_note(self.selected_index)
+
+    def show_note(self, index):
+        row = self.row_at(index)
+        if row is None or row[0] == self.note_entry_id:
+            return
+        entry_id = row[0]
+        self.note_entry_id = entry_id
+        self.controller.db.submit(get_entry, entry_id,
+                                  on_done=lambda entry: self.note_loaded(entry_id, entry),
+                                  on_error=lambda error: self.note_failed(entry_id, error))
+
+    def note_loaded(self, entry_id, entry):
+        if entry_id != self.note_entry_id:
+            return
+        # The entry may have been deleted since the list was read
+        lines = []
+        if entry is not None:
+            if entry['note_title']:
+                lines.append(entry['note_title'])
+            if entry['activities']:
+                lines.append(", ".join(ACTIVITY_MAPPING.get(activity, activity) for activity in entry['activities']))
+            if lines:
+                lines.append("")
+            lines.append(entry['note'] or "")
+        self.set_note_text("\n".join(lines))
+
+    def note_failed(self, entry_id, error):
+        if entry_id != self.note_entry_id:
+            return
+        # Forgotten, so selecting the entry again reads it again
+        self.note_entry_id = None
+        self.set_note_text(f"The note could not be loaded: {error}")
+
+    def set_note_text(self, text):
+        self.note_text.configure(state='normal')
+        self.note_text.delete('1.0', tb.END)
+        self.note_text.insert('1.0', text)
+        self.note_text.configure(state='disabled')
+
 
 class StatsPage(tb.Frame):
     def __init__(self, parent, controller):
@@ -221,10 +669,26 @@ class StatsPage(tb.Frame):
 
         tb.Label(self, text="Learn Page", font=('Helvetica', 16)).pack(pady=10)
 
-        # Create a Notebook to hold both the Glossary and Acronyms
+        # Create a Notebook to hold the Overview, Glossary and Acronyms
         notebook = tb.Notebook(self)
         notebook.pack(fill="both", expand=True, padx=20, pady=10)
 
+        # Tab 0: Overview, loaded from the journal each time the page is shown
+        overview_frame = tb.Frame(notebook, padding=20)
+        notebook.add(overview_frame, text="Overview")
+        self.overview_values = {}
+        overview_fields = [
+            ('total_entries', "Total Entries"),
+            ('most_frequent_mood', "Most Frequent Mood"),
+            ('days_with_entries', "Days with Entries"),
+            ('current_streak', "Current Streak (days)"),
+            ('longest_streak', "Longest Streak (days)"),
+        ]
+        for row, (key, text) in enumerate(overview_fields):
+            tb.Label(overview_frame, text=text, font=('Helvetica', 12)).grid(row=row, column=0, sticky='w', pady=5)
+            self.overview_values[key] = tb.Label(overview_frame, text="…", font=('Helvetica', 12, 'bold'))
+            self.overview_values[key].grid(row=row, column=1, sticky='w', padx=20, pady=5)
+
         # Tab 1: Glossary
         glossary_frame = tb.Frame(notebook)
         notebook.add(glossary_frame, text="Glossary")
@@ -295,6 +759,19 @@ class StatsPage(tb.Frame):
 
         tb.Button(self, text="← Main Menu", command=lambda: self.controller.show_page("MainMenuPage")).pack(side="bottom", pady=15)
 
+    def on_page_enter(self):
+        self.controller.db.submit(load_journal_overview, on_done=self.show_overview,
+                                  on_error=self.overview_failed)
+
+    def show_overview(self, overview):
+        for key, label in self.overview_values.items():
+            label.configure(text=str(overview[key]))
+
+    def overview_failed(self, error):
+        for label in self.overview_values.values():
+            label.configure(text="–")
+        Messagebox.show_error(f"The statistics could not be loaded:\n{error}", title="Learn Page", parent=self)
+
 class SettingsPage(tb.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent)
@@ -0,0 +1,190 @@
+import argparse
+import csv
+import datetime
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal_core import ACTIVITY_MAPPING, JOURNAL_MIGRATIONS, MOOD_IDS, MOOD_MAPPING, run_migrations
+from journal_core.schema import analyze_journal
+
+# Builds seeded synthetic journals for the benchmarks. The same seed and size
+# always give the same journal, so timings from different commits are measured
+# against identical data.
+
+DEFAULT_SIZES = ['1k', '100k', '1M']
+DEFAULT_SEED = 2017
+DEFAULT_OUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+ENTRIES_PER_DAY = 2
+# Large journals are packed into at most 20 years instead of going back centuries
+MAX_DAYS = 20 * 365
+LAST_DAY = datetime.date(2025, 12, 31)
+BATCH_SIZE = 10000
+
+# Mostly good days, with the occasional bad one
+MOOD_WEIGHTS = {
+    'Rad': 18, 'Great': 30, 'meh': 28, 'Bad': 11,
+    'Pissed': 4, 'Depressed': 4, 'Terrible': 2, 'Hurt': 3
+}
+
+# Everyday activities are tagged far more often than rare ones
+ACTIVITY_WEIGHTS = {
+    'work': 40, 'relax': 30, 'friends': 18, 'date': 6, 'sport': 14,
+    'celebration': 3, 'watching': 22, 'reading': 12, 'gaming': 15,
+    'shopping': 8, 'travel': 4, 'good meal': 16, 'cleaning': 9,
+    'thinking': 10, 'beaten up': 2, 'art': 5, 'sleeping': 20,
+    'adrenaline': 2, 'IDEA': 3
+}
+
+# Number of activities tagged on one entry
+ACTIVITY_COUNT_WEIGHTS = [12, 25, 28, 18, 10, 5, 2]
+
+WORDS = '''
+    today I went to the work with friends and we had a long day it was good
+    really tired after meeting coffee lunch dinner home walk park rain sun
+    felt happy sad anxious calm excited bored proud grateful late early again
+    finally started finished project game movie book music gym run train bus
+    called mum dad sister brother talked about plans weekend holiday money
+    sleep dream morning evening night tomorrow maybe should need want think
+'''.split()
+
+TITLES = [
+    'Work', 'Long day', 'Weekend', 'Gym', 'Family dinner', 'Movie night',
+    'Trip', 'Thoughts', 'Idea', 'Bad day', 'Great day', 'Study'
+]
+
+def parse_size(size):
+    # 1k, 100k, 1M or a plain number
+    size = size.strip()
+    multiplier = {'k': 1000, 'm': 1000000}.get(size[-1].lower(), 1)
+    count = int(size.rstrip('kKmM')) * multiplier
+    if count < 0:
+        raise ValueError(f"Journal size cannot be negative: {size}")
+    return count
+
+def generate_entries(count, seed=DEFAULT_SEED):
+    # Yields entries oldest first, as the row for the entries table plus the
+    # names of its activities
+    if count == 0:
+        return
+    rng = random.Random(seed)
+    moods = [mood for mood in MOOD_MAPPING if mood in MOOD_WEIGHTS]
+    mood_weights = [MOOD_WEIGHTS[mood] for mood in moods]
+    activities = [activity for activity in ACTIVITY_MAPPING if activity in ACTIVITY_WEIGHTS]
+    activity_weights = [ACTIVITY_WEIGHTS[activity] for activity in activities]
+
+    days = max(1, min(count // ENTRIES_PER_DAY, MAX_DAYS))
+    # Average gap between entries, in minutes
+    gap = max(1, days * 24 * 60 // count)
+    day = LAST_DAY - datetime.timedelta(days=days)
+    minute = 0
+    for _ in range(count):
+        # Entries go forward by a random gap, about ENTRIES_PER_DAY a day
+        # (more for journals too big to fit in MAX_DAYS)
+        minute += rng.randint(1, 2 * gap)
+        day += datetime.timedelta(days=minute // (24 * 60))
+        minute %= 24 * 60
+
+        # Note lengths are skewed: mostly a few sentences, sometimes a long page
+        if rng.random() < 0.25:
+            note = ''
+        else:
+            words = min(int(rng.lognormvariate(3.5, 0.9)) + 1, 2000)
+            note = ' '.join(rng.choices(WORDS, k=words)).capitalize() + '.'
+        note_title = rng.choice(TITLES) if rng.random() < 0.4 else None
+
+        activity_count = rng.choices(range(len(ACTIVITY_COUNT_WEIGHTS)), ACTIVITY_COUNT_WEIGHTS)[0]
+        entry_activities = set()
+        while len(entry_activities) < activity_count:
+            entry_activities.add(rng.choices(activities, activity_weights)[0])
+
+        yield ((day.isoformat(),
+                day.strftime("%B %d").replace(" 0", " "),
+                day.strftime("%A"),
+                f"{minute // 60:02d}:{minute % 60:02d}",
+                rng.choices(moods, mood_weights)[0],
+                note_title,
+                note),
+               sorted(entry_activities))
+
+def build_database(db_path, count, seed=DEFAULT_SEED):
+    for path in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+    conn = sqlite3.connect(db_path)
+    # The file is rebuilt from scratch if anything goes wrong, so skip the
+    # rollback journal and fsyncs while it is being filled
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('PRAGMA cache_size = -256000')
+    run_migrations(conn, JOURNAL_MIGRATIONS)
+    activity_ids = {name: activity_id for activity_id, name in conn.execute('SELECT id, name FROM activities')}
+
+    c = conn.cursor()
+    entry_rows = []
+    activity_rows = []
+
+    def write_batch():
+        with conn:
+            c.executemany('''INSERT INTO entries
+                             (id, full_date, date, weekday, time, mood_id, note_title, note)
+                             VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', entry_rows)
+            c.executemany('INSERT INTO entry_activities (entry_id, activity_id) VALUES (?, ?)', activity_rows)
+        entry_rows.clear()
+        activity_rows.clear()
+
+    for entry_id, (row, activities) in enumerate(generate_entries(count, seed), start=1):
+        full_date, date, weekday, time_str, mood, note_title, note = row
+        entry_rows.append((entry_id, full_date, date, weekday, time_str, MOOD_IDS[mood], note_title, note))
+        activity_rows.extend((entry_id, activity_ids[activity]) for activity in activities)
+        if len(entry_rows) >= BATCH_SIZE:
+            write_batch()
+    if entry_rows:
+        write_batch()
+
+    with conn:
+        analyze_journal(conn.cursor())
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.close()
+
+def write_csv(csv_path, count, seed=DEFAULT_SEED):
+    # Same entries in the CSV layout read by helper-scripts/csv_to_sqlite.py
+    with open(csv_path, 'w', encoding='utf-8', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['full_date', 'date', 'weekday', 'time', 'mood', 'activities', 'note_title', 'note'])
+        for (full_date, date, weekday, time_str, mood, note_title, note), activities in generate_entries(count, seed):
+            writer.writerow([full_date, date, weekday, time_str, mood, ' | '.join(activities), note_title or '', note])
+
+def journal_path(out_dir, size):
+    return os.path.join(out_dir, size, 'my_journal.db')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate seeded synthetic journals for the benchmarks.")
+    parser.add_argument('sizes', nargs='*', default=DEFAULT_SIZES,
+                        help="journal sizes to build, such as 1k, 100k or 1M (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="random seed")
+    parser.add_argument('--out-dir', default=DEFAULT_OUT_DIR,
+                        help="directory for the journals, one <size>/my_journal.db each")
+    args = parser.parse_args()
+    try:
+        args.counts = [parse_size(size) for size in args.sizes]
+    except ValueError as error:
+        parser.error(str(error))
+    return args
+
+def main():
+    args = parse_args()
+    for size, count in zip(args.sizes, args.counts):
+        db_path = journal_path(args.out_dir, size)
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        started = time.perf_counter()
+        build_database(db_path, count, args.seed)
+        elapsed = time.perf_counter() - started
+        print(f"{db_path}: {count:,} entries in {elapsed:.1f}s")
+
+if __name__ == '__main__':
+    main()
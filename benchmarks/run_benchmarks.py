@@ -0,0 +1,285 @@
+import argparse
+import contextlib
+import datetime
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from generate_journal import DEFAULT_OUT_DIR, DEFAULT_SEED, DEFAULT_SIZES, journal_path, parse_size, write_csv
+from journal_core import (
+    JOURNAL_MIGRATIONS,
+    MOOD_IDS,
+    ConnectionPool,
+    add_entry,
+    delete_entry,
+    load_activity_bits,
+    load_activity_ids,
+    load_writing_streaks,
+    run_migrations,
+    search_entries,
+)
+from journal_core.analytics import load_activity_pairs, load_mood_counts, summarise_moods
+
+# Times the code paths behind each page of the app against the generated
+# journals. Every benchmark runs on a copy of the journal, so the generated
+# files are never changed. The app's query cache is not used: these are the
+# timings of a cache miss.
+
+DEFAULT_REPEAT = 5
+CSV_ROW_LIMIT = 100000
+# A benchmark is flagged as slower when its median grows by more than 10%
+# and by at least 1 ms, so timer noise on sub-millisecond queries is ignored
+REGRESSION_THRESHOLD = 0.10
+REGRESSION_MIN_MS = 1.0
+
+def load_csv_importer():
+    # helper-scripts is not a package, so load the script by path
+    path = os.path.join(REPO_DIR, 'helper-scripts', 'csv_to_sqlite.py')
+    spec = importlib.util.spec_from_file_location('csv_to_sqlite', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def measure(run, repeat, setup=None):
+    # One untimed warm-up run, then `repeat` timed runs
+    timings = []
+    for attempt in range(repeat + 1):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        if attempt:
+            timings.append(elapsed)
+    return {
+        'runs': repeat,
+        'min_ms': round(min(timings) * 1000, 3),
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+    }
+
+def read_page_benchmarks(pool, repeat):
+    with pool.connection() as conn:
+        first_day, last_day = conn.execute('SELECT MIN(full_date), MAX(full_date) FROM entries').fetchone()
+        activity_ids = load_activity_ids(conn)
+        activity_bits = load_activity_bits(conn)
+    first_day = datetime.date.fromisoformat(first_day)
+    last_day = datetime.date.fromisoformat(last_day)
+    use_activity_mask = len(activity_bits) == len(activity_ids)
+    last_week = (last_day - datetime.timedelta(days=6), last_day)
+    all_time = (first_day, last_day)
+
+    cases = {
+        'read.last_week': dict(dates=last_week),
+        'read.all_time': dict(dates=all_time),
+        'read.mood': dict(dates=all_time, moods=['Bad', 'Terrible']),
+        'read.activity_any': dict(dates=all_time, activities=['date', 'travel']),
+        'read.activity_all': dict(dates=all_time, activities=['work', 'friends'], match_all=True),
+        'read.search': dict(dates=all_time, search='coffee'),
+        'read.search_phrase': dict(dates=all_time, search='"long day" holiday'),
+        'read.page_10': dict(dates=all_time, pages=10),
+    }
+
+    results = {}
+    for name, case in cases.items():
+        def run(case=case):
+            # Build and fetch every page up to the one being measured, the
+            # way Next is pressed on the Read page
+            page_start = None
+            for _ in range(case.get('pages', 1)):
+                with pool.connection() as conn:
+                    _, page_start = search_entries(
+                        conn,
+                        case.get('search', ''),
+                        *case['dates'],
+                        page_start=page_start,
+                        page_size=20,
+                        mood_ids=[MOOD_IDS[mood] for mood in case.get('moods', ())],
+                        activity_ids=[activity_ids.get(activity) for activity in case.get('activities', ())],
+                        match_all=case.get('match_all', False),
+                        activity_bits=activity_bits,
+                        use_activity_mask=use_activity_mask
+                    )
+                if page_start is None:
+                    break
+        results[name] = measure(run, repeat)
+    return results
+
+def analytics_benchmarks(pool, repeat):
+    with pool.connection() as conn:
+        activity_names = {activity_id: name for name, activity_id in load_activity_ids(conn).items()}
+        mood_counts = load_mood_counts(conn)
+    start_date = mood_counts['day'].min().date()
+    end_date = mood_counts['day'].max().date()
+
+    def run_load():
+        with pool.connection() as conn:
+            load_mood_counts(conn)
+
+    def run_pairs():
+        with pool.connection() as conn:
+            load_activity_pairs(conn, start_date, end_date, activity_names)
+
+    def run_streaks():
+        with pool.connection() as conn:
+            load_writing_streaks(conn, end_date)
+
+    return {
+        'analytics.load_mood_counts': measure(run_load, repeat),
+        'analytics.summarise_moods': measure(lambda: summarise_moods(mood_counts, start_date, end_date), repeat),
+        'analytics.activity_pairs': measure(run_pairs, repeat),
+        'analytics.writing_streaks': measure(run_streaks, repeat),
+    }
+
+def write_benchmarks(pool, repeat):
+    rng = random.Random(DEFAULT_SEED)
+    today = datetime.date.today()
+
+    def run_add():
+        with pool.connection() as conn:
+            add_entry(conn, today, datetime.time(12, 0), MOOD_IDS['Great'], ['work', 'friends'],
+                      "Benchmark", "A short benchmark note about a long day at work.")
+
+    with pool.connection() as conn:
+        entry_ids = [row[0] for row in conn.execute('SELECT id FROM entries')]
+    # Delete random existing entries, each one only once
+    targets = iter(rng.sample(entry_ids, min(len(entry_ids), repeat + 1)))
+
+    def run_delete():
+        with pool.connection() as conn:
+            delete_entry(conn, next(targets))
+
+    results = {'write.add_entry': measure(run_add, repeat)}
+    # Deleting needs an entry for the warm-up run and one for each timed run
+    if len(entry_ids) > 1:
+        results['write.delete_entry'] = measure(run_delete, min(repeat, len(entry_ids) - 1))
+    return results
+
+def csv_import_benchmark(work_dir, count, repeat):
+    csv_to_sqlite = load_csv_importer()
+    csv_path = os.path.join(work_dir, 'journal_entries.csv')
+    write_csv(csv_path, count)
+    db_paths = iter(os.path.join(work_dir, f'import_{attempt}.db') for attempt in range(repeat + 1))
+    state = {}
+
+    def setup():
+        state['conn'] = csv_to_sqlite.create_database(next(db_paths))
+
+    def run():
+        # Keep the progress output out of the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            csv_to_sqlite.process_csv(state['conn'], csv_path)
+        state['conn'].close()
+
+    result = measure(run, repeat, setup)
+    result['rows'] = count
+    result['rows_per_s'] = round(count / (result['median_ms'] / 1000))
+    return {'import.csv_to_sqlite': result}
+
+def run_size(size, data_dir, repeat):
+    # Every benchmark needs at least one timed run
+    repeat = max(repeat, 1)
+    source = journal_path(data_dir, size)
+    if not os.path.exists(source):
+        raise SystemExit(f"{source} not found. Run benchmarks/generate_journal.py {size} first.")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        db_path = os.path.join(work_dir, 'my_journal.db')
+        shutil.copyfile(source, db_path)
+        pool = ConnectionPool(db_path)
+        # Journals generated by an older version are upgraded first, as the app would
+        with pool.connection() as conn:
+            run_migrations(conn, JOURNAL_MIGRATIONS)
+
+        with pool.connection() as conn:
+            has_entries = conn.execute('SELECT EXISTS (SELECT 1 FROM entries)').fetchone()[0]
+
+        results = {}
+        if has_entries:
+            results.update(read_page_benchmarks(pool, repeat))
+            results.update(analytics_benchmarks(pool, repeat))
+        else:
+            print("  No entries: skipping the read and analytics benchmarks")
+        results.update(write_benchmarks(pool, repeat))
+        # Importing is measured with at most CSV_ROW_LIMIT rows and fewer runs
+        csv_rows = min(parse_size(size), CSV_ROW_LIMIT)
+        if csv_rows:
+            results.update(csv_import_benchmark(work_dir, csv_rows, min(repeat, 3)))
+        return results
+
+def environment():
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], cwd=REPO_DIR, capture_output=True, text=True).stdout.strip()
+        except OSError:
+            return ''
+
+    return {
+        'commit': git('rev-parse', '--short', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+    }
+
+def compare(old_path, new_results):
+    # Print the change in median time for every benchmark found in both runs
+    with open(old_path, encoding='utf-8') as f:
+        old_results = json.load(f)
+    print(f"\nCompared with {old_results['environment']['commit']} ({old_path}):")
+    for size, benchmarks in new_results['results'].items():
+        for name, result in benchmarks.items():
+            old = old_results['results'].get(size, {}).get(name)
+            if not old:
+                continue
+            change = result['median_ms'] / old['median_ms'] - 1 if old['median_ms'] else 0
+            slower = result['median_ms'] - old['median_ms'] >= REGRESSION_MIN_MS
+            flag = '  <-- slower' if change > REGRESSION_THRESHOLD and slower else ''
+            print(f"  {size:>5} {name:<28} {old['median_ms']:>10.2f} -> {result['median_ms']:>10.2f} ms "
+                  f"({change:+.0%}){flag}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Time the journal's read, analytics, write and import paths.")
+    parser.add_argument('sizes', nargs='*', default=DEFAULT_SIZES,
+                        help="generated journal sizes to benchmark (default: %(default)s)")
+    parser.add_argument('--data-dir', default=DEFAULT_OUT_DIR, help="directory the journals were generated into")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="timed runs per benchmark")
+    parser.add_argument('--output', help="JSON file to write (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', metavar='JSON', help="earlier results file to compare against")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    results = {'environment': environment(), 'repeat': args.repeat, 'results': {}}
+    for size in args.sizes:
+        print(f"Benchmarking {size}...")
+        results['results'][size] = run_size(size, args.data_dir, args.repeat)
+        for name, result in results['results'][size].items():
+            print(f"  {name:<28} median {result['median_ms']:>10.2f} ms  min {result['min_ms']:>10.2f} ms")
+
+    output = args.output or os.path.join(BENCHMARK_DIR, 'results', f"{results['environment']['commit'] or 'results'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+if __name__ == '__main__':
+    main()
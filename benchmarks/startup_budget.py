@@ -0,0 +1,134 @@
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Checks that each front end's cold start stays within its import budget. The
+# modules an app imports at the top of its file are imported in a fresh
+# interpreter with `python -X importtime`, and the total is compared with the
+# budget. Modules that should only load on first use must not appear at all.
+# The desktop app is also started for real, when there is a display, and its
+# time to first paint is checked too.
+
+APPS = {
+    'streamlit': {
+        'path': 'STjournal_app[ST2.0.0].py',
+        'budget_ms': 1500,
+        # Only the Analytics page needs these
+        'lazy': {'pandas', 'numpy'},
+    },
+    'ttkbootstrap': {
+        'path': 'TBjournal_app[TB0.1.1].py',
+        'budget_ms': 1000,
+        'lazy': set(),
+        'first_paint_budget_ms': 2000,
+    },
+}
+FIRST_PAINT_ENV = 'JOURNAL_STARTUP_REPORT'
+FIRST_PAINT_LINE = re.compile(r'first paint: (\d+) ms')
+
+DEFAULT_RUNS = 3
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+def startup_imports(path):
+    # Import statements at the top level of the app file, in order. Imports
+    # inside functions or page branches only run when they are needed.
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+def measure_imports(statements):
+    # Returns (total ms, {top-level module: cumulative ms}, set of every module imported)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', '\n'.join(statements)],
+        cwd=REPO_DIR, capture_output=True, text=True
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    top_level = {}
+    modules = set()
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        cumulative_us, indent, module = int(match.group(2)), match.group(3), match.group(4)
+        modules.add(module.split('.')[0])
+        # Nested imports are indented under the module that triggered them
+        if len(indent) == 1:
+            top_level[module] = cumulative_us / 1000
+    return sum(top_level.values()), top_level, modules
+
+def measure_first_paint(path):
+    # Starts the app, which prints its time to first paint and closes. Returns
+    # the time in ms, or raises RuntimeError if the app could not start (for
+    # example without a display).
+    env = dict(os.environ, **{FIRST_PAINT_ENV: '1'})
+    try:
+        result = subprocess.run([sys.executable, path], cwd=REPO_DIR, env=env,
+                                capture_output=True, text=True, timeout=60)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError("the app did not close")
+    match = FIRST_PAINT_LINE.search(result.stdout)
+    if not match:
+        lines = result.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else "no time reported")
+    return int(match.group(1))
+
+def check_first_paint(name, app, runs):
+    try:
+        first_paint_ms = min(measure_first_paint(os.path.join(REPO_DIR, app['path'])) for _ in range(runs))
+    except RuntimeError as e:
+        # Not counted as a failure: headless machines can still check imports
+        print(f"{name}: time to first paint not measured ({e})")
+        return True
+    within_budget = first_paint_ms <= app['first_paint_budget_ms']
+    print(f"{name}: first paint after {first_paint_ms} ms (budget {app['first_paint_budget_ms']} ms) "
+          f"{'OK' if within_budget else 'OVER BUDGET'}")
+    return within_budget
+
+def check_app(name, app, runs, budget_ms=None):
+    budget_ms = budget_ms or app['budget_ms']
+    statements = startup_imports(os.path.join(REPO_DIR, app['path']))
+    try:
+        # Best of several runs, so a busy machine does not fail the check
+        measurements = [measure_imports(statements) for _ in range(runs)]
+    except RuntimeError as e:
+        print(f"{name}: could not import the app's modules ({e})")
+        return False
+    total_ms, top_level, modules = min(measurements, key=lambda measurement: measurement[0])
+
+    eager = sorted(app['lazy'] & modules)
+    within_budget = total_ms <= budget_ms and not eager
+    print(f"{name}: {total_ms:.0f} ms of imports at startup (budget {budget_ms} ms) "
+          f"{'OK' if within_budget else 'OVER BUDGET'}")
+    for module, ms in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:5]:
+        print(f"  {ms:8.1f} ms  {module}")
+    if eager:
+        print(f"  imported at startup but should load on first use: {', '.join(eager)}")
+    if 'first_paint_budget_ms' in app:
+        within_budget = check_first_paint(name, app, runs) and within_budget
+    return within_budget
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check the apps' cold-start time against a budget.")
+    parser.add_argument('apps', nargs='*', metavar='app',
+                        help=f"apps to check: {', '.join(APPS)} (default: all)")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help="runs per app; the fastest counts")
+    parser.add_argument('--budget-ms', type=int, help="override the budget of every app checked")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    unknown = [name for name in args.apps if name not in APPS]
+    if unknown:
+        sys.exit(f"Unknown app: {', '.join(unknown)}")
+    results = [check_app(name, APPS[name], args.runs, args.budget_ms) for name in args.apps or APPS]
+    sys.exit(0 if all(results) else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+import argparse
+import base64
+import codecs
+import datetime
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal_core import insert_entries, open_journal
+
+# Imports the full backup export described in LOGBOOK.md [LOG: 1]: a zip holding
+# one base64 file that decodes to a single JSON document. The zip is streamed
+# through a chunked base64 decoder into an incremental JSON reader, so memory
+# use stays flat no matter how big the backup is and nothing is written to disk
+# except the database itself.
+
+DEFAULT_DB_PATH = 'journal_backup.db'
+DEFAULT_BATCH_SIZE = 1000
+CHUNK_SIZE = 1024 * 1024
+
+# Names of the built-in moods, used when a mood was never renamed in the app
+PREDEFINED_MOOD_NAMES = {1: 'Rad', 2: 'Good', 3: 'meh', 4: 'Bad', 5: 'Awful'}
+
+def iter_base64_chunks(backup_path, chunk_size=CHUNK_SIZE):
+    # Decode base64 in pieces whose length is a multiple of 4 characters
+    if zipfile.is_zipfile(backup_path):
+        archive = zipfile.ZipFile(backup_path)
+        member = next(info for info in archive.infolist() if not info.is_dir())
+        source = archive.open(member)
+    else:
+        archive = None
+        source = open(backup_path, 'rb')
+
+    try:
+        pending = b''
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            pending += chunk.translate(None, b' \t\r\n')
+            usable = len(pending) - len(pending) % 4
+            yield base64.b64decode(pending[:usable])
+            pending = pending[usable:]
+        if pending:
+            yield base64.b64decode(pending)
+    finally:
+        source.close()
+        if archive:
+            archive.close()
+
+def iter_text(byte_chunks):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in byte_chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+class JsonStream:
+    # Just enough of a streaming JSON reader to walk the top-level object,
+    # parse the items of the arrays we need and skip everything else
+    WHITESPACE = re.compile(r'\s*')
+    STRUCTURE = re.compile(r'["{}\[\]]')
+    STRING_END = re.compile(r'["\\]')
+
+    def __init__(self, text_chunks):
+        self.chunks = iter(text_chunks)
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        # Drop what has been consumed and append the next chunk
+        chunk = next(self.chunks, None)
+        self.buffer = self.buffer[self.pos:] + (chunk or '')
+        self.pos = 0
+        if chunk is None:
+            self.eof = True
+        return chunk is not None
+
+    def peek(self):
+        while True:
+            self.pos = self.WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of backup data")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in backup data, found {self.buffer[self.pos]!r}")
+        self.pos += 1
+
+    def read_value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number cut off at the end of the buffer would still parse
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def skip_value(self):
+        if self.peek() not in '{["':
+            self.read_value()
+            return
+        depth = 0
+        while True:
+            match = self.STRUCTURE.search(self.buffer, self.pos)
+            if not match:
+                self.pos = len(self.buffer)
+                if not self._fill():
+                    raise ValueError("Unexpected end of backup data")
+                continue
+            self.pos = match.end()
+            char = match.group()
+            if char == '"':
+                self._skip_string_body()
+            elif char in '{[':
+                depth += 1
+            else:
+                depth -= 1
+            if depth == 0:
+                return
+
+    def _skip_string_body(self):
+        while True:
+            match = self.STRING_END.search(self.buffer, self.pos)
+            if not match or (match.group() == '\\' and match.end() == len(self.buffer)):
+                # Keep a trailing backslash so the escaped character is not lost
+                self.pos = match.start() if match else len(self.buffer)
+                if not self._fill():
+                    raise ValueError("Unexpected end of backup data")
+                continue
+            if match.group() == '"':
+                self.pos = match.end()
+                return
+            self.pos = match.end() + 1
+
+def iter_array_items(text_chunks, keys):
+    # Yield (key, item) for each item of the named top-level arrays and stop
+    # as soon as all of them have been read
+    stream = JsonStream(text_chunks)
+    remaining = set(keys)
+    stream.expect('{')
+    if stream.peek() == '}':
+        return
+    while remaining:
+        key = stream.read_value()
+        stream.expect(':')
+        if key in remaining and stream.peek() == '[':
+            stream.expect('[')
+            if stream.peek() == ']':
+                stream.expect(']')
+            else:
+                while True:
+                    yield key, stream.read_value()
+                    if stream.peek() == ',':
+                        stream.expect(',')
+                    else:
+                        stream.expect(']')
+                        break
+            remaining.discard(key)
+        else:
+            stream.skip_value()
+        if stream.peek() == ',':
+            stream.expect(',')
+        else:
+            stream.expect('}')
+            return
+
+def read_backup(backup_path, keys):
+    return iter_array_items(iter_text(iter_base64_chunks(backup_path)), keys)
+
+def load_lookups(backup_path):
+    # First pass: mood and activity names. They sit near the start of the
+    # backup, so this pass stops long before the entries have been decoded.
+    moods = {}
+    tags = {}
+    for key, item in read_backup(backup_path, ('customMoods', 'tags')):
+        if key == 'customMoods':
+            name = item.get('custom_name') or PREDEFINED_MOOD_NAMES.get(item.get('predefined_name_id'))
+            moods[item['id']] = name or f"Mood {item['id']}"
+        else:
+            tags[item['id']] = item['name']
+    return moods, tags
+
+def backup_entry(item, moods, tags):
+    # Months are stored 0-based in the backup
+    entry_date = datetime.date(item['year'], item['month'] + 1, item['day'])
+    return {
+        'full_date': entry_date.isoformat(),
+        'date': entry_date.strftime("%B %d").replace(" 0", " "),
+        'weekday': entry_date.strftime("%A"),
+        'time': f"{item.get('hour', 0):02d}:{item.get('minute', 0):02d}",
+        'mood': moods.get(item['mood'], f"Mood {item['mood']}"),
+        'activities': [tags[tag_id] for tag_id in item.get('tags') or [] if tag_id in tags],
+        'note_title': item.get('note_title') or None,
+        'note': (item.get('note') or '').replace('<br>', '\n'),
+    }
+
+def is_imported(cursor, entry, last_id):
+    # Whether the journal already held this entry before the import started,
+    # so running the same import again adds nothing twice. The lookup uses the
+    # (full_date, time) index.
+    cursor.execute('''
+        SELECT 1 FROM entries
+        WHERE full_date = ? AND time = ? AND note IS ? AND id <= ?
+        LIMIT 1
+    ''', (entry['full_date'], entry['time'], entry['note'], last_id))
+    return cursor.fetchone() is not None
+
+def import_backup(conn, backup_path, batch_size=DEFAULT_BATCH_SIZE):
+    moods, tags = load_lookups(backup_path)
+    progress = {'imported': 0, 'skipped': 0}
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    cursor.execute('SELECT COALESCE(MAX(id), 0) FROM entries')
+    last_id = cursor.fetchone()[0]
+
+    def report_batch(c, count):
+        progress['imported'] += count
+        elapsed = time.perf_counter() - started
+        print(f"\r{progress['imported']} entries imported ({progress['imported'] / elapsed:,.0f} entries/s)",
+              end='', flush=True)
+
+    # Second pass: stream the new entries straight into the database
+    def new_entries():
+        for _, item in read_backup(backup_path, ('dayEntries',)):
+            entry = backup_entry(item, moods, tags)
+            if last_id and is_imported(cursor, entry, last_id):
+                progress['skipped'] += 1
+            else:
+                yield entry
+
+    imported = insert_entries(conn, new_entries(), batch_size, report_batch)
+    print(f"\r{imported} entries imported, {progress['skipped']} already in the journal")
+    return imported
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Import a zipped base64 JSON journal backup into a SQLite database.")
+    parser.add_argument('backup', help="backup file (the zip, or the base64 file inside it)")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite database to write to")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help="number of entries written per transaction")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    conn = open_journal(args.db)
+    try:
+        import_backup(conn, args.backup, args.batch_size)
+        print("Successfully imported backup into SQLite database!")
+    except Exception as e:
+        print(f"\nError processing backup: {str(e)}")
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -1,98 +1,125 @@
+import argparse
 import csv
-import sqlite3
-from datetime import datetime
+import hashlib
+import json
+import os
+import sys
+import time
+from itertools import islice
 
-def create_database():
-    conn = sqlite3.connect('journalDEEP.db')
-    c = conn.cursor()
-    
-    # Create main entries table
-    c.execute('''CREATE TABLE IF NOT EXISTS entries
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  full_date DATE NOT NULL,
-                  date TEXT NOT NULL,
-                  weekday TEXT NOT NULL,
-                  time TIME NOT NULL,
-                  mood TEXT NOT NULL,
-                  note_title TEXT,
-                  note TEXT)''')
-    
-    # Create activities lookup table
-    c.execute('''CREATE TABLE IF NOT EXISTS activities
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  name TEXT UNIQUE)''')
-    
-    # Create entry-activity relationship table
-    c.execute('''CREATE TABLE IF NOT EXISTS entry_activities
-                 (entry_id INTEGER,
-                  activity_id INTEGER,
-                  FOREIGN KEY(entry_id) REFERENCES entries(id),
-                  FOREIGN KEY(activity_id) REFERENCES activities(id))''')
-    
-    # Predefined activities and moods
-    predefined_activities = {
-        'work', 'relax', 'friends', 'date', 'sport', 'celebration',
-        'watching', 'reading', 'gaming', 'shopping', 'travel',
-        'good meal', 'cleaning', 'thinking', 'beaten up', 'art',
-        'sleeping', 'adrenaline', 'IDEA'
-    }
-    
-    predefined_moods = {
-        'Rad', 'Great', 'meh', 'Bad', 'Pissed',
-        'Depressed', 'Terrible', 'Hurt'
-    }
-    
-    # Insert predefined activities
-    for activity in predefined_activities:
-        c.execute('INSERT OR IGNORE INTO activities (name) VALUES (?)', (activity,))
-    
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal_core import insert_entries, open_journal
+
+DEFAULT_CSV_PATH = 'journal_entries.csv'
+DEFAULT_DB_PATH = 'journalDEEP.db'
+DEFAULT_BATCH_SIZE = 1000
+REQUIRED_FIELDS = ('full_date', 'date', 'weekday', 'time', 'mood')
+
+def create_database(db_path):
+    conn = open_journal(db_path)
+
+    # Create import checkpoint table (rows of each CSV already committed, and
+    # a hash of those rows to tell whether the file changed since)
+    conn.execute('''CREATE TABLE IF NOT EXISTS import_progress
+                    (source TEXT PRIMARY KEY,
+                     rows_done INTEGER NOT NULL,
+                     rows_hash TEXT)''')
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(import_progress)')]
+    if 'rows_hash' not in columns:
+        conn.execute('ALTER TABLE import_progress ADD COLUMN rows_hash TEXT')
     conn.commit()
     return conn
 
-def process_csv(conn):
-    c = conn.cursor()
-    
-    with open('journal_entries.csv', 'r', encoding='utf-8-sig') as csvfile:
-        reader = csv.DictReader(csvfile)
-        
-        for row in reader:
+def read_rows(csv_path, skip_rows):
+    # Stream the CSV so memory use does not grow with the file
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as csvfile:
+        yield from islice(csv.DictReader(csvfile), skip_rows, None)
+
+def hash_row(rows_hash, row):
+    rows_hash.update(json.dumps(row, ensure_ascii=False).encode('utf-8') + b'\n')
+
+def hash_rows(csv_path, count):
+    rows_hash = hashlib.sha256()
+    for row in islice(read_rows(csv_path, 0), count):
+        hash_row(rows_hash, row)
+    return rows_hash
+
+def read_entries(csv_path, skip_rows, rows_hash):
+    # rows_hash is updated with each row as it is handed out, so it always
+    # covers exactly the rows read so far
+    for row_number, row in enumerate(read_rows(csv_path, skip_rows), start=skip_rows + 1):
+        missing = [field for field in REQUIRED_FIELDS if not row.get(field)]
+        if missing:
+            raise ValueError(f"Row {row_number} is missing {', '.join(missing)}")
+        hash_row(rows_hash, row)
+        yield {
+            'full_date': row['full_date'],
+            'date': row['date'],
+            'weekday': row['weekday'],
+            'time': row['time'],
+            'mood': row['mood'],
+            'activities': [a.strip() for a in (row.get('activities') or '').split(' | ') if a.strip()],
+            'note_title': row.get('note_title'),
             # Clean note content
-            note = row['note'].replace('<br><br>', '\n\n')
-            
-            # Insert main entry
-            c.execute('''INSERT INTO entries
-                         (full_date, date, weekday, time, mood, note_title, note)
-                         VALUES (?, ?, ?, ?, ?, ?, ?)''',
-                     (row['full_date'],
-                      row['date'],
-                      row['weekday'],
-                      row['time'],
-                      row['mood'],
-                      row['note_title'],
-                      note))
-            
-            entry_id = c.lastrowid
-            
-            # Process activities
-            if row['activities']:
-                activities = [a.strip() for a in row['activities'].split(' | ')]
-                for activity in activities:
-                    # Insert activity relationship
-                    c.execute('''INSERT INTO entry_activities (entry_id, activity_id)
-                                 SELECT ?, id FROM activities WHERE name = ?''',
-                              (entry_id, activity))
-    
-    conn.commit()
+            'note': (row.get('note') or '').replace('<br><br>', '\n\n'),
+        }
+
+def process_csv(conn, csv_path, batch_size=DEFAULT_BATCH_SIZE):
+    source = os.path.abspath(csv_path)
+    checkpoint = conn.execute('SELECT rows_done, rows_hash FROM import_progress WHERE source = ?',
+                              (source,)).fetchone()
+    rows_done, saved_hash = checkpoint if checkpoint else (0, None)
+    rows_hash = hashlib.sha256()
+    if rows_done:
+        # Only resume if the rows already imported are still the same.
+        # Checkpoints written before the hash was kept have none to compare.
+        rows_hash = hash_rows(csv_path, rows_done)
+        if saved_hash is not None and rows_hash.hexdigest() != saved_hash:
+            print(f"{csv_path} has changed since it was last imported, importing it from the start")
+            rows_done = 0
+            rows_hash = hashlib.sha256()
+        else:
+            print(f"Resuming import of {csv_path} after row {rows_done}")
+    progress = {'rows_done': rows_done, 'imported': 0}
+    started = time.perf_counter()
+
+    def record_batch(c, count):
+        # Each batch and its checkpoint are committed together, so a failed
+        # import can be re-run and continues after the last committed batch
+        progress['rows_done'] += count
+        progress['imported'] += count
+        c.execute('''INSERT INTO import_progress (source, rows_done, rows_hash) VALUES (?, ?, ?)
+                     ON CONFLICT (source) DO UPDATE SET rows_done = excluded.rows_done,
+                                                        rows_hash = excluded.rows_hash''',
+                  (source, progress['rows_done'], rows_hash.hexdigest()))
+        elapsed = time.perf_counter() - started
+        print(f"\r{progress['rows_done']} rows imported ({progress['imported'] / elapsed:,.0f} rows/s)", end='', flush=True)
+
+    imported = insert_entries(conn, read_entries(csv_path, progress['rows_done'], rows_hash), batch_size, record_batch)
+    if imported:
+        print()
+    return imported
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert a journal CSV export into a SQLite database.")
+    parser.add_argument('--csv', default=DEFAULT_CSV_PATH, help="CSV file to import")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite database to write to")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help="number of rows written per transaction")
+    return parser.parse_args()
 
 def main():
-    conn = create_database()
+    args = parse_args()
+    conn = create_database(args.db)
     try:
-        process_csv(conn)
-        print("Successfully converted CSV to SQLite database!")
+        imported = process_csv(conn, args.csv, args.batch_size)
+        print(f"Successfully converted CSV to SQLite database! ({imported} new rows)")
     except Exception as e:
-        print(f"Error processing data: {str(e)}")
+        print(f"\nError processing data: {str(e)}")
+        print("Fix the problem and run the script again to continue where it stopped.")
     finally:
         conn.close()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal_core import EXPORT_FORMATS, connect, load_moods, write_export
+from journal_core.pdf_export import PDF_FORMAT, export_pdf_book, missing_pdf_dependencies
+
+DEFAULT_DB_PATH = 'my_journal.db'
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export journal entries to CSV, NDJSON, JSON or a PDF book.")
+    parser.add_argument('output', help="file to write; the format is taken from its extension unless --format is given")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite journal database to export")
+    parser.add_argument('--format', choices=[*EXPORT_FORMATS, 'PDF'], help="export format")
+    parser.add_argument('--start', type=datetime.date.fromisoformat, help="first day to export (YYYY-MM-DD)")
+    parser.add_argument('--end', type=datetime.date.fromisoformat, help="last day to export (YYYY-MM-DD)")
+    parser.add_argument('--mood', action='append', default=[],
+                        help="only export entries with this mood (can be given more than once)")
+    parser.add_argument('--time-format', choices=['24-hour', '12-hour'], default='24-hour',
+                        help="how entry times are shown in a PDF book")
+    parser.add_argument('--workers', type=int, help="processes used to lay out a PDF book (default: one per core)")
+    return parser.parse_args()
+
+def export_format_for(path):
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    for export_format, (format_extension, _) in {**EXPORT_FORMATS, 'PDF': PDF_FORMAT}.items():
+        if extension == format_extension:
+            return export_format
+    sys.exit(f"Cannot tell the format of {path}; use --format")
+
+def main():
+    args = parse_args()
+    export_format = args.format or export_format_for(args.output)
+    if not os.path.exists(args.db):
+        sys.exit(f"{args.db} not found")
+    conn = connect(args.db, read_only=True)
+    try:
+        mood_ids = {name: mood_id for mood_id, name in load_moods(conn).items()}
+        unknown = [mood for mood in args.mood if mood not in mood_ids]
+        if unknown:
+            sys.exit(f"Unknown mood: {', '.join(unknown)}")
+        selected_mood_ids = [mood_ids[mood] for mood in args.mood]
+        if export_format == 'PDF':
+            missing = missing_pdf_dependencies()
+            if missing:
+                sys.exit(f"PDF export needs {' and '.join(missing)}: pip install {' '.join(missing)}")
+            exported = export_pdf_book(args.db, args.output, args.start, args.end, selected_mood_ids,
+                                       args.time_format, args.workers)
+        else:
+            with open(args.output, 'w', encoding='utf-8', newline='') as f:
+                exported = write_export(conn, f, export_format, args.start, args.end, selected_mood_ids)
+        print(f"Exported {exported} entries to {args.output}")
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
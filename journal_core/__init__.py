@@ -0,0 +1,61 @@
+# Database and query code shared by the journal front ends, helper scripts
+# and benchmarks. Nothing in here depends on a UI toolkit.
+from .attachments import (
+    ATTACHMENT_TYPES,
+    THUMBNAIL_SIZE,
+    AttachmentStore,
+    add_attachments,
+    load_attachments,
+)
+from .connection import ConnectionPool, QueryCache, connect
+from .drafts import (
+    DRAFT_SAVE_INTERVAL,
+    DraftAutosaver,
+    delete_draft,
+    is_empty_draft,
+    latest_draft_id,
+    load_draft,
+    new_draft_id,
+    save_draft,
+)
+from .entries import (
+    ACTIVITY_MASK_BITS,
+    ACTIVITY_MATCH_ALL,
+    ACTIVITY_MATCH_ANY,
+    DEFAULT_PAGE_SIZE,
+    IMPORT_BATCH_SIZE,
+    activities_from_mask,
+    activity_mask,
+    add_entry,
+    build_activity_filter,
+    build_entry_list_query,
+    build_fts_query,
+    delete_entry,
+    fetch_entry_page,
+    get_activity_id,
+    get_entry,
+    get_mood_id,
+    insert_entries,
+    list_entries,
+    load_activity_bits,
+    load_activity_ids,
+    load_moods,
+    load_note,
+    load_page_anchors,
+    search_entries,
+)
+from .export import EXPORT_FORMATS, iter_export_rows, write_export
+from .formatting import format_entry_time, format_full_date, get_ordinal_suffix
+from .mappings import (
+    ACTIVITY_MAPPING,
+    ACTIVITY_NAMES_BY_LABEL,
+    MOOD_IDS,
+    MOOD_IDS_BY_LABEL,
+    MOOD_LABELS,
+    MOOD_MAPPING,
+)
+from .schema import JOURNAL_MIGRATIONS, SETTINGS_MIGRATIONS, open_journal, run_migrations
+from .settings import load_settings, save_settings
+from .streaks import load_writing_streaks
+from .tracing import SqlTracer
+from .worker import DatabaseWorker
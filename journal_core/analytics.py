@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+from .entries import ACTIVITY_MASK_BITS, load_activity_bits
+from .mappings import ACTIVITY_MAPPING, MOOD_MAPPING
+
+def load_mood_counts(conn):
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT daily_mood_counts.day, moods.name, daily_mood_counts.n
+        FROM daily_mood_counts
+        JOIN moods ON moods.id = daily_mood_counts.mood_id
+        ORDER BY daily_mood_counts.day
+    ''')
+    mood_counts = pd.DataFrame([tuple(row) for row in cursor.fetchall()], columns=['day', 'mood', 'n'])
+    mood_counts['day'] = pd.to_datetime(mood_counts['day'], format='%Y-%m-%d')
+    # Moods without an emoji label (custom moods from imports) keep their name
+    mood_counts['mood'] = mood_counts['mood'].map(lambda mood: MOOD_MAPPING.get(mood, mood))
+    return mood_counts
+
+def summarise_moods(mood_counts, start_date, end_date):
+    mask = (mood_counts['day'].dt.date >= start_date) & (mood_counts['day'].dt.date <= end_date)
+    filtered_df = mood_counts[mask]
+    mood_totals = filtered_df.groupby('mood')['n'].sum().sort_values(ascending=False)
+    timeline_df = filtered_df.pivot_table(
+        index='day', columns='mood', values='n', aggfunc='sum', fill_value=0
+    )
+    date_range = pd.date_range(start=start_date, end=end_date)
+    timeline_df = timeline_df.reindex(date_range, fill_value=0)
+    return {
+        'mood_totals': mood_totals,
+        'timeline': timeline_df,
+        'total_entries': int(filtered_df['n'].sum()),
+        'days_with_entries': filtered_df['day'].nunique(),
+    }
+
+def activity_cooccurrence(masks):
+    # Pairwise counts of activities appearing in the same entry. Masks are
+    # unpacked to one byte per bit in chunks, so the matrix product counts
+    # every pair at once while memory stays bounded. The product is done in
+    # float32 so it runs on BLAS; per-chunk counts stay far below 2**24, where
+    # float32 stops being exact. The diagonal holds how often each activity
+    # appears.
+    counts = np.zeros((64, 64), dtype=np.int64)
+    for start in range(0, len(masks), 65536):
+        chunk = np.ascontiguousarray(masks[start:start + 65536], dtype='<i8')
+        bits = np.unpackbits(chunk.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+        bits = bits.astype(np.float32)
+        counts += np.rint(bits.T @ bits).astype(np.int64)
+    return counts[:ACTIVITY_MASK_BITS, :ACTIVITY_MASK_BITS]
+
+def activity_label(activity_names, activity_id):
+    name = activity_names.get(activity_id, f"#{activity_id}")
+    return ACTIVITY_MAPPING.get(name, name)
+
+def load_activity_pairs(conn, start_date, end_date, activity_names):
+    # activity_names: activity names by id. Counted from the activity masks,
+    # unless some activity has no mask slot.
+    activity_bits = load_activity_bits(conn)
+    if any(activity_id not in activity_bits for activity_id in activity_names):
+        return load_activity_pairs_joined(conn, start_date, end_date, activity_names)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT activity_mask FROM entries
+        WHERE full_date BETWEEN ? AND ? AND activity_mask != 0
+    ''', (start_date.isoformat(), end_date.isoformat()))
+    masks = np.fromiter((row[0] for row in cursor), dtype=np.int64)
+    counts = activity_cooccurrence(masks)
+    used = np.flatnonzero(counts.diagonal())
+    activity_ids = {bit: activity_id for activity_id, bit in activity_bits.items()}
+    labels = [activity_label(activity_names, activity_ids.get(bit)) for bit in used]
+    return pd.DataFrame(counts[np.ix_(used, used)], index=labels, columns=labels)
+
+def load_activity_pairs_joined(conn, start_date, end_date, activity_names):
+    # The same table from a self-join on entry_activities, which covers every
+    # activity but reads each entry's activities once per activity
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT first.activity_id, second.activity_id, COUNT(*)
+        FROM entries
+        JOIN entry_activities AS first ON first.entry_id = entries.id
+        JOIN entry_activities AS second ON second.entry_id = entries.id
+        WHERE entries.full_date BETWEEN ? AND ?
+        GROUP BY first.activity_id, second.activity_id
+    ''', (start_date.isoformat(), end_date.isoformat()))
+    pairs = cursor.fetchall()
+    used = sorted({first for first, _, _ in pairs})
+    index = {activity_id: i for i, activity_id in enumerate(used)}
+    counts = np.zeros((len(used), len(used)), dtype=np.int64)
+    for first, second, n in pairs:
+        counts[index[first], index[second]] = n
+    labels = [activity_label(activity_names, activity_id) for activity_id in used]
+    return pd.DataFrame(counts, index=labels, columns=labels)
@@ -0,0 +1,148 @@
+import concurrent.futures
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+# Photo attachments
+# Files are stored on disk under the SHA-256 of their contents, so a photo
+# attached twice is only kept once and my_journal.db holds a small row per
+# attachment instead of the image. Thumbnails are made on a pool of threads
+# (Pillow releases the GIL while it decodes and resizes) and cached on disk, so
+# each one is only ever made once.
+ATTACHMENT_DIR = 'attachments'
+ATTACHMENT_TYPES = ['png', 'jpg', 'jpeg', 'gif', 'webp', 'bmp']
+THUMBNAIL_SIZE = 256
+CHUNK_SIZE = 1 << 20
+# Files are saved before the entry that uses them is committed, so a file this
+# recently saved is never removed as unused: its entry may still be on its way
+UNUSED_GRACE_PERIOD = 10 * 60
+
+_thumbnail_pool = None
+_thumbnail_pool_lock = threading.Lock()
+
+def thumbnail_pool():
+    # One pool shared by every store and session, started on first use
+    global _thumbnail_pool
+    with _thumbnail_pool_lock:
+        if _thumbnail_pool is None:
+            _thumbnail_pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(4, os.cpu_count() or 1), thread_name_prefix='thumbnails'
+            )
+        return _thumbnail_pool
+
+class AttachmentStore:
+    def __init__(self, root=ATTACHMENT_DIR):
+        self.root = root
+
+    def file_path(self, sha256):
+        return os.path.join(self.root, 'files', sha256[:2], sha256)
+
+    def thumbnail_path(self, sha256, size=THUMBNAIL_SIZE):
+        return os.path.join(self.root, 'thumbnails', str(size), sha256[:2], sha256 + '.jpg')
+
+    def _write_atomically(self, path, write):
+        # Written to a temporary file first and renamed into place, so readers
+        # never see half a file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), delete=False) as tmp:
+            try:
+                write(tmp)
+            except BaseException:
+                tmp.close()
+                os.remove(tmp.name)
+                raise
+        os.replace(tmp.name, path)
+
+    def save(self, file):
+        # Streams a binary file into the store and returns (sha256, size in bytes)
+        staging_dir = os.path.join(self.root, 'files')
+        os.makedirs(staging_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=staging_dir, delete=False) as tmp:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                tmp.write(chunk)
+                size += len(chunk)
+        sha256 = digest.hexdigest()
+        path = self.file_path(sha256)
+        try:
+            # Already stored; saving it again restarts its grace period
+            os.utime(path)
+            os.remove(tmp.name)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp.name, path)
+        return sha256, size
+
+    def make_thumbnail(self, sha256, size=THUMBNAIL_SIZE):
+        # Returns the path of the cached thumbnail, or None if the file is not
+        # an image Pillow can read
+        path = self.thumbnail_path(sha256, size)
+        if os.path.exists(path):
+            return path
+        from PIL import Image, ImageOps
+        try:
+            with Image.open(self.file_path(sha256)) as image:
+                # JPEGs are decoded straight at a fraction of their size
+                image.draft('RGB', (size, size))
+                image = ImageOps.exif_transpose(image)
+                image.thumbnail((size, size))
+                image = image.convert('RGB')
+        except OSError:
+            return None
+        self._write_atomically(path, lambda f: image.save(f, 'JPEG', quality=85))
+        return path
+
+    def thumbnails(self, sha256s, size=THUMBNAIL_SIZE):
+        # Thumbnails for several files, made in parallel, in the same order
+        return list(thumbnail_pool().map(lambda sha256: self.make_thumbnail(sha256, size), sha256s))
+
+    def prefetch_thumbnails(self, sha256s, size=THUMBNAIL_SIZE):
+        # Starts making thumbnails without waiting for them
+        for sha256 in sha256s:
+            thumbnail_pool().submit(self.make_thumbnail, sha256, size)
+
+    def remove_unused(self, conn, sha256s, grace_period=UNUSED_GRACE_PERIOD, now=None):
+        # Deletes the files (and their thumbnails) that no attachment uses any
+        # more, unless they were saved within the grace period
+        now = time.time() if now is None else now
+        cursor = conn.cursor()
+        for sha256 in set(sha256s):
+            cursor.execute('SELECT 1 FROM attachments WHERE sha256 = ? LIMIT 1', (sha256,))
+            if cursor.fetchone():
+                continue
+            try:
+                if now - os.path.getmtime(self.file_path(sha256)) < grace_period:
+                    continue
+            except FileNotFoundError:
+                pass
+            paths = [self.file_path(sha256)]
+            thumbnail_dir = os.path.join(self.root, 'thumbnails')
+            if os.path.isdir(thumbnail_dir):
+                paths += [self.thumbnail_path(sha256, int(size)) for size in os.listdir(thumbnail_dir)
+                          if size.isdigit()]
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+ATTACHMENT_FIELDS = ['sha256', 'file_name', 'mime_type', 'size']
+
+def add_attachments(conn, entry_id, attachments):
+    # attachments: (sha256, file name, MIME type, size) for each file
+    cursor = conn.cursor()
+    cursor.executemany('''
+        INSERT INTO attachments (entry_id, sha256, file_name, mime_type, size)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(entry_id, *attachment) for attachment in attachments])
+
+def load_attachments(conn, entry_id):
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT sha256, file_name, mime_type, size FROM attachments
+        WHERE entry_id = ?
+        ORDER BY id
+    ''', (entry_id,))
+    return [dict(zip(ATTACHMENT_FIELDS, row)) for row in cursor.fetchall()]
@@ -0,0 +1,95 @@
+import collections
+import contextlib
+import queue
+import sqlite3
+import threading
+
+# Database connections
+# Every connection to a journal or settings database is opened by connect(),
+# so the apps, the worker thread and the helper scripts all run with the same
+# settings. Statements are compiled once per connection and then reused from
+# its statement cache, which is keyed on the SQL text: the queries in
+# journal_core are constants, or built the same way for the same filters, so
+# they hit the cache.
+STATEMENT_CACHE_SIZE = 256
+
+def connect(path, read_only=False):
+    if read_only:
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True, timeout=10, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+    else:
+        conn = sqlite3.connect(path, timeout=10, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        # WAL lets sessions keep reading while another one writes
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA mmap_size = 268435456')
+    conn.execute('PRAGMA cache_size = -32000')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    return conn
+
+# A pool of connections to one database file. The Streamlit app shares one pool
+# per file between every session and rerun. Scripts run on several threads, so
+# a connection is handed to one thread at a time and returned to the pool when
+# the block ends.
+class ConnectionPool:
+    def __init__(self, path, max_idle=8):
+        self.path = path
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+
+    def _connect(self):
+        return connect(self.path)
+
+    @contextlib.contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+# Query result cache
+# Results are shared by every session and reused across reruns until the
+# database changes. PRAGMA data_version on a connection that never writes moves
+# whenever any other connection, in this process or another, commits.
+class QueryCache:
+    def __init__(self, path, max_entries=64):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._watcher = connect(path, read_only=True)
+        self._lock = threading.Lock()
+        self._results = collections.OrderedDict()
+        self._data_version = None
+
+    def get(self, key, compute):
+        with self._lock:
+            data_version = self._watcher.execute('PRAGMA data_version').fetchone()[0]
+            if data_version != self._data_version:
+                self._results.clear()
+                self._data_version = data_version
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return self._results[key]
+            self.misses += 1
+
+        result = compute()
+
+        with self._lock:
+            if data_version == self._data_version:
+                self._results[key] = result
+                if len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+        return result
@@ -0,0 +1,129 @@
+import datetime
+import json
+import time
+import uuid
+
+# Draft autosave
+# The Write page's fields are saved as a draft while an entry is written, so
+# it survives a browser refresh or an expired session. Saving is debounced: a
+# DraftAutosaver keeps only the latest state of the fields and writes it at
+# most once per interval, as one UPSERT.
+DRAFT_SAVE_INTERVAL = 5
+DRAFT_FIELDS = ['entry_date', 'entry_time', 'mood_id', 'activities', 'note_title', 'note']
+
+def new_draft_id():
+    return uuid.uuid4().hex
+
+def is_empty_draft(draft):
+    # The date, time and mood always have a value, so a draft only counts once
+    # something has been written or picked
+    return not (draft['activities'] or draft['note_title'] or draft['note'])
+
+def save_draft(conn, draft_id, draft):
+    # draft: entry_date (a date), entry_time (a time), mood_id, activities (a
+    # list of names), note_title and note
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO drafts (id, entry_date, entry_time, mood_id, activities, note_title, note, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (id) DO UPDATE SET
+            entry_date = excluded.entry_date,
+            entry_time = excluded.entry_time,
+            mood_id = excluded.mood_id,
+            activities = excluded.activities,
+            note_title = excluded.note_title,
+            note = excluded.note,
+            updated_at = excluded.updated_at
+    ''', (draft_id, draft['entry_date'].isoformat(), draft['entry_time'].strftime("%H:%M"), draft['mood_id'],
+          json.dumps(draft['activities']), draft['note_title'], draft['note'],
+          datetime.datetime.now().isoformat(timespec='seconds')))
+
+def load_draft(conn, draft_id):
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT entry_date, entry_time, mood_id, activities, note_title, note
+        FROM drafts WHERE id = ?
+    ''', (draft_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    draft = dict(zip(DRAFT_FIELDS, row))
+    draft['entry_date'] = datetime.date.fromisoformat(draft['entry_date'])
+    draft['entry_time'] = datetime.datetime.strptime(draft['entry_time'], "%H:%M").time()
+    draft['activities'] = json.loads(draft['activities'])
+    return draft
+
+def latest_draft_id(conn, exclude_ids=()):
+    # The most recently saved draft, other than exclude_ids
+    cursor = conn.cursor()
+    placeholders = ', '.join(['?'] * len(exclude_ids))
+    cursor.execute(f'''
+        SELECT id FROM drafts
+        WHERE id NOT IN ({placeholders})
+        ORDER BY updated_at DESC
+        LIMIT 1
+    ''', list(exclude_ids))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def delete_draft(conn, draft_id):
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM drafts WHERE id = ?', (draft_id,))
+
+class DraftAutosaver:
+    def __init__(self, draft_id, interval=DRAFT_SAVE_INTERVAL, saved=None):
+        # saved: the draft as it is in the database, if it was restored
+        self.draft_id = draft_id
+        self.interval = interval
+        self.writes = 0
+        self._saved = saved
+        self._pending = None
+        self._saved_at = None
+
+    @property
+    def draft(self):
+        # The latest fields, saved or not
+        return self._saved if self._pending is None else self._pending
+
+    def update(self, draft):
+        # Records the current fields. Returns True if they differ from what
+        # is saved, so a write is waiting.
+        if draft == self._saved or (self._saved is None and is_empty_draft(draft)):
+            self._pending = None
+        else:
+            self._pending = draft
+        return self._pending is not None
+
+    def due(self, now=None):
+        if self._pending is None:
+            return False
+        now = time.monotonic() if now is None else now
+        return self._saved_at is None or now - self._saved_at >= self.interval
+
+    def flush(self, conn, now=None):
+        # Writes and commits the latest fields if a write is due. Returns True
+        # if it wrote. Nothing counts as saved until the commit has succeeded,
+        # so a failed write (a locked journal, say) is tried again next time.
+        if not self.due(now):
+            return False
+        draft = self._pending
+        if is_empty_draft(draft):
+            delete_draft(conn, self.draft_id)
+            draft = None
+        else:
+            save_draft(conn, self.draft_id, draft)
+        conn.commit()
+        self._saved = draft
+        self._pending = None
+        self._saved_at = time.monotonic() if now is None else now
+        self.writes += 1
+        return True
+
+    def discard(self, conn):
+        # Call in the transaction that saves the entry, so the draft goes with
+        # it, then call reset once that transaction has committed
+        delete_draft(conn, self.draft_id)
+
+    def reset(self):
+        self._saved = None
+        self._pending = None
@@ -0,0 +1,341 @@
+import re
+from itertools import islice
+
+DEFAULT_PAGE_SIZE = 20
+
+def build_fts_query(search_text):
+    # Turn the search box text into a safe FTS5 query: "quoted text" is a phrase,
+    # a trailing * makes a prefix search and every other word must appear
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', search_text):
+        term = phrase or word
+        is_prefix = term.endswith('*')
+        term = term.rstrip('*').replace('"', '').strip()
+        if term:
+            terms.append(f'"{term}"' + ('*' if is_prefix else ''))
+    return ' '.join(terms)
+
+# Activity bitmasks
+# Every entry carries an activity_mask with one bit set for each of its
+# activities. Each activity's bit is its slot in activities.bit, handed out
+# densely by triggers (see assign_activity_bits), so 63 activities fit. Any
+# further activities get no slot, and anything that involves them falls back
+# to entry_activities.
+ACTIVITY_MASK_BITS = 63
+
+def activity_mask(bits):
+    mask = 0
+    for bit in bits:
+        mask |= 1 << bit
+    return mask
+
+def activities_from_mask(mask, activity_names):
+    # activity_names: activity names by bit
+    return [activity_names[bit] for bit in range(ACTIVITY_MASK_BITS)
+            if mask >> bit & 1 and bit in activity_names]
+
+# Activity filter for the Read page. Entries are checked with a bitwise test
+# on activity_mask, or with semi-joins that probe the (entry_id, activity_id)
+# index when an activity has no bit. Either way the entry list can still be
+# read in date order and stop after one page.
+ACTIVITY_MATCH_ANY = "Any"
+ACTIVITY_MATCH_ALL = "All"
+
+def build_activity_filter(activity_ids, match_all, activity_bits):
+    # activity_bits: bits by activity id, from load_activity_bits
+    probe = 'SELECT 1 FROM entry_activities WHERE entry_id = entries.id AND activity_id'
+    known_ids = [activity_id for activity_id in activity_ids if activity_id is not None]
+    if not known_ids or (match_all and len(known_ids) < len(activity_ids)):
+        return '0', []
+    if all(activity_id in activity_bits for activity_id in known_ids):
+        mask = activity_mask(activity_bits[activity_id] for activity_id in known_ids)
+        if match_all:
+            return 'entries.activity_mask & ? = ?', [mask, mask]
+        return 'entries.activity_mask & ? != 0', [mask]
+    if match_all:
+        return ' AND '.join([f'EXISTS ({probe} = ?)'] * len(known_ids)), known_ids
+    placeholders = ', '.join(['?'] * len(known_ids))
+    return f'EXISTS ({probe} IN ({placeholders}))', known_ids
+
+def build_entry_list_query(start_date, end_date, mood_ids=(), activity_ids=(), match_all=False,
+                           activity_bits=None, fts_query='', use_activity_mask=True, page_start=None,
+                           page_size=DEFAULT_PAGE_SIZE):
+    # Returns the SQL and parameters for one page of the Read page list, and
+    # the row keys that make up the sort key of a page's last row
+    params = []
+    query_parts = []
+    if fts_query:
+        # Search hits are ranked with bm25 (title matches weigh more than the note)
+        query_parts.append('''
+            WITH hits AS (
+                SELECT rowid, bm25(entries_fts, 10.0, 1.0) AS rank
+                FROM entries_fts
+                WHERE entries_fts MATCH ?
+            )
+        ''')
+        params.append(fts_query)
+        # Highlighted excerpts for the expander headers are only made for the
+        # rows of the page, once the page has been picked
+        query_parts.append('''
+            SELECT page.*, (
+                SELECT snippet(entries_fts, -1, '**', '**', '…', 12)
+                FROM entries_fts
+                WHERE entries_fts MATCH ? AND rowid = page.id
+            ) AS excerpt
+            FROM (
+        ''')
+        params.append(fts_query)
+
+    # The list only needs what the collapsed expanders show. Note bodies are
+    # loaded one at a time when an entry is opened (see load_note). Activities
+    # come from the activity bitmask, or are looked up per entry once the
+    # journal has activities outside the mask. Neither needs grouping, so the
+    # list can be read straight off the date index.
+    query_parts.append('''
+        SELECT
+            entries.id,
+            entries.full_date,
+            entries.date,
+            entries.time,
+            entries.mood_id,
+            entries.note_title,
+            entries.activity_mask
+    ''')
+    if not use_activity_mask:
+        query_parts.append('''
+            , (
+                SELECT GROUP_CONCAT(activities.name, ' | ')
+                FROM entry_activities
+                JOIN activities ON entry_activities.activity_id = activities.id
+                WHERE entry_activities.entry_id = entries.id
+            ) AS activities
+        ''')
+    if fts_query:
+        query_parts.append(", hits.rank FROM entries JOIN hits ON hits.rowid = entries.id")
+    else:
+        query_parts.append("FROM entries")
+    query_parts.append(" WHERE entries.full_date BETWEEN ? AND ?")
+    params += [start_date.isoformat(), end_date.isoformat()]
+
+    if mood_ids:
+        placeholders = ','.join(['?'] * len(mood_ids))
+        query_parts.append(f" AND entries.mood_id IN ({placeholders})")
+        params += list(mood_ids)
+
+    if activity_ids:
+        activity_clause, activity_params = build_activity_filter(list(activity_ids), match_all,
+                                                                 activity_bits or {})
+        query_parts.append(f" AND {activity_clause}")
+        params += activity_params
+
+    # Keyset pagination: newest entries first, or best matches first when
+    # searching. Each page starts right after the sort key of the last row shown.
+    if fts_query:
+        sort_columns = ['hits.rank', 'entries.id']
+        sort_keys = ['rank', 'id']
+        direction, comparison = 'ASC', '>'
+    else:
+        sort_columns = ['entries.full_date', 'entries.time', 'entries.id']
+        sort_keys = ['full_date', 'time', 'id']
+        direction, comparison = 'DESC', '<'
+
+    if page_start is not None:
+        placeholders = ', '.join(['?'] * len(sort_columns))
+        query_parts.append(f" AND ({', '.join(sort_columns)}) {comparison} ({placeholders})")
+        params += list(page_start)
+    query_parts.append(" ORDER BY " + ', '.join(f"{column} {direction}" for column in sort_columns))
+    query_parts.append(" LIMIT ?")
+    params.append(page_size + 1)
+    if fts_query:
+        query_parts.append(") AS page ORDER BY page.rank ASC, page.id ASC")
+    return ' '.join(query_parts), params, sort_keys
+
+def load_page_anchors(conn, start_date, end_date, page_size):
+    # For lists that can jump to any position (the desktop Read page): the
+    # number of entries, and the sort key of the last row of every page in
+    # newest-first order. Page k is then read with page_start=anchors[k - 1],
+    # so any page is one keyset query. The window runs over the date index
+    # alone, without touching the entries themselves.
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT full_date, time, id, rn, total FROM (
+            SELECT full_date, time, id,
+                   ROW_NUMBER() OVER (ORDER BY full_date DESC, time DESC, id DESC) AS rn,
+                   COUNT(*) OVER () AS total
+            FROM entries
+            WHERE full_date BETWEEN ? AND ?
+        )
+        WHERE rn % ? = 0 OR rn = total
+        ORDER BY rn
+    ''', (start_date.isoformat(), end_date.isoformat(), page_size))
+    rows = cursor.fetchall()
+    total = rows[-1][4] if rows else 0
+    anchors = [tuple(row[:3]) for row in rows if row[3] % page_size == 0]
+    return total, anchors
+
+def fetch_entry_page(conn, query, params, page_size):
+    # One page, plus one row to know whether another page follows
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    return cursor.fetchmany(page_size + 1)
+
+def list_entries(conn, start_date, end_date, page_start=None, page_size=DEFAULT_PAGE_SIZE, **filters):
+    # One page of the entry list and the page_start of the page after it
+    # (None on the last page). filters are those of build_entry_list_query.
+    query, params, sort_keys = build_entry_list_query(
+        start_date, end_date, page_start=page_start, page_size=page_size, **filters
+    )
+    rows = fetch_entry_page(conn, query, params, page_size)
+    next_page_start = tuple(rows[page_size - 1][key] for key in sort_keys) if len(rows) > page_size else None
+    return rows[:page_size], next_page_start
+
+def search_entries(conn, search_text, start_date, end_date, page_start=None, page_size=DEFAULT_PAGE_SIZE,
+                   **filters):
+    # Best matches first. Search text without any words lists entries by date.
+    return list_entries(conn, start_date, end_date, page_start, page_size,
+                        fts_query=build_fts_query(search_text), **filters)
+
+# Writing entries
+# The statements are kept as constants so every connection compiles each one
+# once and then reuses it from its statement cache.
+INSERT_ENTRY_SQL = '''
+    INSERT INTO entries
+    (full_date, date, weekday, time, mood_id, note_title, note)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+INSERT_ENTRY_WITH_ID_SQL = '''
+    INSERT INTO entries
+    (id, full_date, date, weekday, time, mood_id, note_title, note)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+INSERT_ACTIVITY_BY_NAME_SQL = '''
+    INSERT OR IGNORE INTO entry_activities (entry_id, activity_id)
+    SELECT ?, id FROM activities WHERE name = ?
+'''
+INSERT_ACTIVITY_SQL = 'INSERT OR IGNORE INTO entry_activities (entry_id, activity_id) VALUES (?, ?)'
+IMPORT_BATCH_SIZE = 1000
+
+def add_entry(conn, entry_date, entry_time, mood_id, activities, note_title, note):
+    full_date = entry_date.isoformat()
+    date_str = entry_date.strftime("%B %d").lstrip("0").replace(" 0", " ")
+    weekday = entry_date.strftime("%A")
+    time_str = entry_time.strftime("%H:%M")
+
+    cursor = conn.cursor()
+    cursor.execute(INSERT_ENTRY_SQL, (full_date, date_str, weekday, time_str, mood_id, note_title, note))
+    entry_id = cursor.lastrowid
+    cursor.executemany(INSERT_ACTIVITY_BY_NAME_SQL, [(entry_id, activity) for activity in activities])
+    return entry_id
+
+def next_entry_id(cursor):
+    # Entry ids are assigned by insert_entries so a whole batch can go through
+    # executemany. Ids of deleted entries are never handed out again.
+    cursor.execute('''
+        SELECT MAX(COALESCE((SELECT MAX(id) FROM entries), 0),
+                   COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'entries'), 0))
+    ''')
+    return cursor.fetchone()[0] + 1
+
+def insert_entries(conn, entries, batch_size=IMPORT_BATCH_SIZE, on_batch=None):
+    # Bulk insert for imports. entries yields dicts shaped like the rows of
+    # iter_export_rows: full_date, date, weekday, time, mood (a name),
+    # activities (a list of names), note_title and note. Moods and activities
+    # the journal does not have yet are added. Each batch is written with
+    # executemany in a transaction of its own; on_batch(cursor, count) runs
+    # inside that transaction, so a caller can record its progress atomically
+    # with the batch. Returns the number of entries inserted.
+    cursor = conn.cursor()
+    mood_ids = {name: mood_id for mood_id, name in load_moods(conn).items()}
+    activity_ids = load_activity_ids(conn)
+    entry_id = next_entry_id(cursor)
+    inserted = 0
+    entries = iter(entries)
+    while True:
+        batch = list(islice(entries, batch_size))
+        if not batch:
+            return inserted
+        with conn:
+            entry_rows = []
+            activity_rows = []
+            for entry in batch:
+                entry_rows.append((entry_id, entry['full_date'], entry['date'], entry['weekday'], entry['time'],
+                                   get_mood_id(cursor, mood_ids, entry['mood']),
+                                   entry.get('note_title'), entry.get('note')))
+                for activity in dict.fromkeys(entry.get('activities') or ()):
+                    activity_rows.append((entry_id, get_activity_id(cursor, activity_ids, activity)))
+                entry_id += 1
+            cursor.executemany(INSERT_ENTRY_WITH_ID_SQL, entry_rows)
+            cursor.executemany(INSERT_ACTIVITY_SQL, activity_rows)
+            if on_batch:
+                on_batch(cursor, len(batch))
+        inserted += len(batch)
+
+def delete_entry(conn, entry_id):
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM entries WHERE id = ?', (entry_id,))
+    cursor.execute('DELETE FROM entry_activities WHERE entry_id = ?', (entry_id,))
+    cursor.execute('DELETE FROM attachments WHERE entry_id = ?', (entry_id,))
+
+# Reading single entries
+ENTRY_FIELDS = ['id', 'full_date', 'date', 'weekday', 'time', 'mood_id', 'mood', 'activities', 'note_title', 'note']
+
+def get_entry(conn, entry_id):
+    # The whole entry as a dict, with its activities as a list, or None
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT entries.id, entries.full_date, entries.date, entries.weekday, entries.time,
+               entries.mood_id, moods.name,
+               (SELECT GROUP_CONCAT(activities.name, ' | ')
+                FROM entry_activities
+                JOIN activities ON activities.id = entry_activities.activity_id
+                WHERE entry_activities.entry_id = entries.id) AS activities,
+               entries.note_title, entries.note
+        FROM entries
+        JOIN moods ON moods.id = entries.mood_id
+        WHERE entries.id = ?
+    ''', (entry_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    entry = dict(zip(ENTRY_FIELDS, row))
+    entry['activities'] = entry['activities'].split(' | ') if entry['activities'] else []
+    return entry
+
+def load_note(conn, entry_id):
+    cursor = conn.cursor()
+    cursor.execute('SELECT note FROM entries WHERE id = ?', (entry_id,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def load_activity_ids(conn):
+    cursor = conn.cursor()
+    cursor.execute('SELECT name, id FROM activities')
+    return {name: activity_id for name, activity_id in cursor.fetchall()}
+
+def load_activity_bits(conn):
+    # Mask bits by activity id, for the activities that have one
+    cursor = conn.cursor()
+    cursor.execute('SELECT id, bit FROM activities WHERE bit IS NOT NULL')
+    return {activity_id: bit for activity_id, bit in cursor.fetchall()}
+
+def load_moods(conn):
+    cursor = conn.cursor()
+    cursor.execute('SELECT id, name FROM moods')
+    return {mood_id: name for mood_id, name in cursor.fetchall()}
+
+def get_mood_id(cursor, mood_ids, name):
+    # Moods missing from the moods table (custom moods in imported journals)
+    # are added the first time they appear
+    if name not in mood_ids:
+        cursor.execute('INSERT OR IGNORE INTO moods (name) VALUES (?)', (name,))
+        cursor.execute('SELECT id FROM moods WHERE name = ?', (name,))
+        mood_ids[name] = cursor.fetchone()[0]
+    return mood_ids[name]
+
+def get_activity_id(cursor, activity_ids, name):
+    # Activities missing from the predefined list are added the first time they appear
+    if name not in activity_ids:
+        cursor.execute('INSERT OR IGNORE INTO activities (name) VALUES (?)', (name,))
+        cursor.execute('SELECT id FROM activities WHERE name = ?', (name,))
+        activity_ids[name] = cursor.fetchone()[0]
+    return activity_ids[name]
@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+
+# Journal export
+# Entries are read from the database in batches and written out one at a
+# time, so the memory an export needs does not grow with the journal. The CSV
+# layout is the one helper-scripts/csv_to_sqlite.py reads, so an export can be
+# imported into another journal.
+EXPORT_FIELDS = ['full_date', 'date', 'weekday', 'time', 'mood', 'activities', 'note_title', 'note']
+
+# Format name: (file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'NDJSON': ('ndjson', 'application/x-ndjson'),
+    'JSON': ('json', 'application/json'),
+}
+
+EXPORT_BATCH_SIZE = 500
+
+def build_export_query(start_date=None, end_date=None, mood_ids=()):
+    conditions = []
+    params = []
+    if start_date:
+        conditions.append('entries.full_date >= ?')
+        params.append(str(start_date))
+    if end_date:
+        conditions.append('entries.full_date <= ?')
+        params.append(str(end_date))
+    if mood_ids:
+        conditions.append(f"entries.mood_id IN ({', '.join(['?'] * len(mood_ids))})")
+        params.extend(mood_ids)
+    where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+    # Oldest first, so an exported CSV is imported in the order it was written
+    query = f'''
+        SELECT entries.full_date, entries.date, entries.weekday, entries.time,
+               moods.name AS mood,
+               (SELECT GROUP_CONCAT(activities.name, ' | ')
+                FROM entry_activities
+                JOIN activities ON activities.id = entry_activities.activity_id
+                WHERE entry_activities.entry_id = entries.id) AS activities,
+               entries.note_title, entries.note
+        FROM entries
+        JOIN moods ON moods.id = entries.mood_id
+        {where}
+        ORDER BY entries.full_date, entries.time, entries.id
+    '''
+    return query, params
+
+def iter_export_rows(conn, start_date=None, end_date=None, mood_ids=(), batch_size=EXPORT_BATCH_SIZE):
+    # Yields one dict per entry, with its activities as a list
+    query, params = build_export_query(start_date, end_date, mood_ids)
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        for row in rows:
+            entry = dict(zip(EXPORT_FIELDS, row))
+            entry['activities'] = entry['activities'].split(' | ') if entry['activities'] else []
+            yield entry
+
+def iter_csv(entries):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for entry in entries:
+        writer.writerow([' | '.join(entry['activities']) if field == 'activities' else entry[field] or ''
+                         for field in EXPORT_FIELDS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def iter_ndjson(entries):
+    for entry in entries:
+        yield json.dumps(entry, ensure_ascii=False) + '\n'
+
+def iter_json(entries):
+    # A JSON array, written an element at a time
+    separator = '[\n'
+    for entry in entries:
+        yield separator + json.dumps(entry, ensure_ascii=False)
+        separator = ',\n'
+    yield '[]\n' if separator == '[\n' else '\n]\n'
+
+EXPORT_WRITERS = {
+    'CSV': iter_csv,
+    'NDJSON': iter_ndjson,
+    'JSON': iter_json,
+}
+
+def write_export(conn, file, export_format, start_date=None, end_date=None, mood_ids=()):
+    # Writes the export to a text file (opened with newline='' for CSV) and
+    # returns the number of entries written
+    count = 0
+
+    def counted(entries):
+        nonlocal count
+        for entry in entries:
+            count += 1
+            yield entry
+
+    entries = counted(iter_export_rows(conn, start_date, end_date, mood_ids))
+    for chunk in EXPORT_WRITERS[export_format](entries):
+        file.write(chunk)
+    return count
@@ -0,0 +1,20 @@
+import datetime
+
+# Date and time display, shared by the front ends and the PDF export
+def format_full_date(date_obj):
+    day_name = date_obj.strftime("%A")
+    day = date_obj.day
+    suffix = get_ordinal_suffix(day)
+    month_year = date_obj.strftime("%B %Y")
+    return f"{day_name}, {day}{suffix} {month_year}"
+
+def get_ordinal_suffix(day):
+    if 11 <= (day % 100) <= 13:
+        return 'th'
+    return {1: 'st', 2: 'nd', 3: 'rd'}.get(day % 10, 'th')
+
+def format_entry_time(time_str, time_format='24-hour'):
+    # Entry times are stored as HH:MM
+    if time_format == '12-hour':
+        return datetime.datetime.strptime(time_str, "%H:%M").strftime("%I:%M %p")
+    return time_str
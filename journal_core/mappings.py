@@ -0,0 +1,42 @@
+# Mappings for UI display
+MOOD_MAPPING = {
+    'Rad': '😊 Rad',
+    'Great': '🎉 Great',
+    'meh': '😐 meh',
+    'Bad': '😞 Bad',
+    'Pissed': '😠 Pissed',
+    'Depressed': '😔 Depressed',
+    'Terrible': '😖 Terrible',
+    'Hurt': '💔 Hurt'
+}
+
+ACTIVITY_MAPPING = {
+    'work': '💼 Work',
+    'relax': '🛋️ Relax',
+    'friends': '👥 Friends',
+    'date': '💑 Date',
+    'sport': '🏋️ Sport',
+    'celebration': '🎉 Celebration',
+    'watching': '📺 Watching',
+    'reading': '📚 Reading',
+    'gaming': '🎮 Gaming',
+    'shopping': '🛍️ Shopping',
+    'travel': '✈️ Travel',
+    'good meal': '🍲 Good Meal',
+    'cleaning': '🧹 Cleaning',
+    'thinking': '🤔 Thinking',
+    'beaten up': '😵 Beaten Up',
+    'art': '🎨 Art',
+    'sleeping': '😴 Sleeping',
+    'adrenaline': '🎢 Adrenaline',
+    'IDEA': '💡 IDEA'
+}
+
+# Moods are stored as ids into the moods table. The predefined moods have fixed
+# ids, in MOOD_MAPPING order; moods added by imports come after them.
+MOOD_IDS = {mood: mood_id for mood_id, mood in enumerate(MOOD_MAPPING, start=1)}
+MOOD_LABELS = {MOOD_IDS[mood]: label for mood, label in MOOD_MAPPING.items()}
+
+# Reverse lookups for turning the labels picked in the UI back into database values
+MOOD_IDS_BY_LABEL = {label: mood_id for mood_id, label in MOOD_LABELS.items()}
+ACTIVITY_NAMES_BY_LABEL = {label: activity for activity, label in ACTIVITY_MAPPING.items()}
@@ -0,0 +1,230 @@
+import concurrent.futures
+import datetime
+import functools
+import importlib.util
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+
+from .connection import connect
+from .export import iter_export_rows
+from .formatting import format_entry_time, format_full_date
+from .mappings import ACTIVITY_MAPPING, MOOD_MAPPING
+
+# PDF "book" export
+# Each month with entries is laid out as its own PDF in a separate process, and
+# the months are then merged in order into one book with a bookmark per month.
+# The worker processes are started from a `python -m journal_core.pdf_export`
+# subprocess (see render_months_in_subprocess).
+# fpdf2 and pypdf are optional dependencies, only imported by the processes
+# that need them.
+PDF_DEPENDENCIES = {'fpdf': 'fpdf2', 'pypdf': 'pypdf'}
+PDF_FORMAT = ('pdf', 'application/pdf')
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_FONT_DIR = os.path.join(REPO_DIR, 'fonts')
+FONT_DIRS = [
+    REPO_FONT_DIR,
+    '/usr/share/fonts',
+    '/usr/local/share/fonts',
+    os.path.expanduser('~/.fonts'),
+    os.path.expanduser('~/.local/share/fonts'),
+    '/Library/Fonts',
+    '/System/Library/Fonts',
+    'C:/Windows/Fonts',
+]
+# (regular, bold) Unicode text fonts, most preferred first
+TEXT_FONTS = [
+    ('DejaVuSans.ttf', 'DejaVuSans-Bold.ttf'),
+    ('NotoSans-Regular.ttf', 'NotoSans-Bold.ttf'),
+    ('arial.ttf', 'arialbd.ttf'),
+]
+EMOJI_FONTS = ['seguiemj.ttf', 'NotoEmoji-Regular.ttf', 'NotoColorEmoji.ttf']
+
+def missing_pdf_dependencies():
+    return [package for module, package in PDF_DEPENDENCIES.items() if importlib.util.find_spec(module) is None]
+
+@functools.lru_cache(maxsize=None)
+def find_fonts():
+    # Returns (regular, bold, emoji) font paths, any of which may be None. Without
+    # a Unicode text font the PDF falls back to Helvetica, and without an emoji
+    # font moods and activities are written without their emoji. Fonts can also
+    # be put in the repo's fonts/ folder. The font folders are only searched on
+    # the first export; restart the app after installing a font.
+    found = {}
+    for font_dir in FONT_DIRS:
+        for root, _, files in os.walk(font_dir):
+            for name in files:
+                found.setdefault(name.lower(), os.path.join(root, name))
+    regular = bold = emoji = None
+    for regular_name, bold_name in TEXT_FONTS:
+        if regular_name.lower() in found:
+            regular = found[regular_name.lower()]
+            bold = found.get(bold_name.lower(), regular)
+            break
+    for emoji_name in EMOJI_FONTS:
+        if emoji_name.lower() in found:
+            emoji = found[emoji_name.lower()]
+            break
+    return regular, bold, emoji
+
+def month_label(month):
+    return datetime.date.fromisoformat(month + '-01').strftime("%B %Y")
+
+def count_entries_by_month(conn, start_date=None, end_date=None, mood_ids=()):
+    conditions = []
+    params = []
+    if start_date:
+        conditions.append('full_date >= ?')
+        params.append(str(start_date))
+    if end_date:
+        conditions.append('full_date <= ?')
+        params.append(str(end_date))
+    if mood_ids:
+        conditions.append(f"mood_id IN ({', '.join(['?'] * len(mood_ids))})")
+        params.extend(mood_ids)
+    where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+    return conn.execute(f'''
+        SELECT substr(full_date, 1, 7) AS month, COUNT(*)
+        FROM entries
+        {where}
+        GROUP BY month
+        ORDER BY month
+    ''', params).fetchall()
+
+def render_month(db_path, month, start_date, end_date, mood_ids, time_format, fonts, out_path):
+    # Runs in a worker process: lays out one month's entries and writes them to
+    # out_path. The date range is clipped to the month so partial months at
+    # either end of the export only include the requested days.
+    from fpdf import FPDF
+
+    first_day = max(month + '-01', str(start_date)) if start_date else month + '-01'
+    last_day = min(month + '-31', str(end_date)) if end_date else month + '-31'
+    regular, bold, emoji = fonts
+
+    pdf = FPDF(format='A4')
+    pdf.set_auto_page_break(True, margin=15)
+    if regular:
+        pdf.add_font('Journal', '', regular)
+        pdf.add_font('Journal', 'B', bold)
+        if emoji:
+            pdf.add_font('Emoji', '', emoji)
+            pdf.set_fallback_fonts(['Emoji'])
+        font = 'Journal'
+
+        def text(value):
+            return value
+    else:
+        font = 'Helvetica'
+
+        def text(value):
+            # The core fonts only cover Latin-1
+            return value.encode('latin-1', 'replace').decode('latin-1')
+
+    def label(mapping, name):
+        # Mood and activity emoji need an emoji font
+        return mapping.get(name, name) if regular and emoji else name
+
+    pdf.add_page()
+    pdf.set_font(font, 'B', 20)
+    pdf.cell(0, 12, month_label(month), new_x='LMARGIN', new_y='NEXT')
+    pdf.ln(4)
+
+    conn = connect(db_path, read_only=True)
+    count = 0
+    try:
+        for entry in iter_export_rows(conn, first_day, last_day, mood_ids):
+            count += 1
+            date_obj = datetime.date.fromisoformat(entry['full_date'])
+            pdf.set_font(font, 'B', 13)
+            heading = f"{format_full_date(date_obj)}, {format_entry_time(entry['time'], time_format)}"
+            pdf.multi_cell(0, 7, text(heading), new_x='LMARGIN', new_y='NEXT')
+
+            pdf.set_font(font, '', 10)
+            details = label(MOOD_MAPPING, entry['mood'])
+            if entry['activities']:
+                details += '  |  ' + ', '.join(label(ACTIVITY_MAPPING, activity) for activity in entry['activities'])
+            pdf.multi_cell(0, 6, text(details), new_x='LMARGIN', new_y='NEXT')
+
+            if entry['note_title']:
+                pdf.set_font(font, 'B', 11)
+                pdf.multi_cell(0, 7, text(entry['note_title']), new_x='LMARGIN', new_y='NEXT')
+            if entry['note']:
+                pdf.set_font(font, '', 11)
+                pdf.multi_cell(0, 6, text(entry['note']), new_x='LMARGIN', new_y='NEXT')
+
+            pdf.ln(3)
+            pdf.line(pdf.l_margin, pdf.get_y(), pdf.w - pdf.r_margin, pdf.get_y())
+            pdf.ln(4)
+    finally:
+        conn.close()
+
+    pdf.output(out_path)
+    return count
+
+def render_months(jobs, max_workers=None):
+    # Lays out the months in parallel and returns their entry counts in order.
+    # Worker processes are spawned rather than forked, as forking a process
+    # that is running other threads is not safe.
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+    ) as executor:
+        return list(executor.map(render_month, *zip(*jobs)))
+
+def render_months_in_subprocess(jobs, max_workers=None):
+    # Spawned workers re-run the parent's __main__ module before doing any work.
+    # In the Streamlit app that is the app script, which Streamlit swaps on every
+    # rerun of any session, so the workers are started from a separate process
+    # whose __main__ is this module instead. Jobs and counts go over stdin and
+    # stdout as JSON.
+    result = subprocess.run(
+        [sys.executable, '-m', 'journal_core.pdf_export'],
+        input=json.dumps({'jobs': jobs, 'max_workers': max_workers}),
+        stdout=subprocess.PIPE, text=True, check=True, cwd=REPO_DIR
+    )
+    return json.loads(result.stdout)
+
+def export_pdf_book(db_path, output, start_date=None, end_date=None, mood_ids=(), time_format='24-hour',
+                    max_workers=None):
+    # Writes the book to output (a path or a binary file) and returns the
+    # number of entries in it
+    from pypdf import PdfWriter
+
+    conn = connect(db_path, read_only=True)
+    try:
+        months = [month for month, _ in count_entries_by_month(conn, start_date, end_date, mood_ids)]
+    finally:
+        conn.close()
+
+    fonts = find_fonts()
+    writer = PdfWriter()
+    count = 0
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Jobs are plain JSON values: the subprocess runs from the repo folder
+        jobs = [(os.path.abspath(db_path), month, start_date and str(start_date), end_date and str(end_date),
+                 list(mood_ids), time_format, fonts, os.path.join(work_dir, f'{month}.pdf'))
+                for month in months]
+        if len(jobs) > 1:
+            counts = render_months_in_subprocess(jobs, max_workers)
+        else:
+            counts = [render_month(*job) for job in jobs]
+
+        for job, month_count in zip(jobs, counts):
+            month, out_path = job[1], job[-1]
+            writer.append(out_path, outline_item=month_label(month))
+            count += month_count
+        if not jobs:
+            writer.add_blank_page(width=595, height=842)
+        writer.write(output)
+    return count
+
+def main():
+    request = json.load(sys.stdin)
+    json.dump(render_months(request['jobs'], request['max_workers']), sys.stdout)
+
+if __name__ == '__main__':
+    main()
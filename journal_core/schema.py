@@ -0,0 +1,575 @@
+import datetime
+
+from .connection import connect
+from .entries import ACTIVITY_MASK_BITS, add_entry, get_activity_id, get_mood_id, load_activity_ids, load_moods
+from .mappings import ACTIVITY_NAMES_BY_LABEL, MOOD_IDS, MOOD_IDS_BY_LABEL
+
+# Schema migrations
+# Each migration runs exactly once, in order. The number of migrations applied
+# so far is stored in the database file itself with PRAGMA user_version, so old
+# journal.db files and CSV-converted journalDEEP.db files upgrade in place. The
+# journal_entries table of the app's first version is moved over by
+# import_legacy_entries.
+def create_journal_tables(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            full_date DATE NOT NULL,
+            date TEXT NOT NULL,
+            weekday TEXT NOT NULL,
+            time TIME NOT NULL,
+            mood TEXT NOT NULL,
+            note_title TEXT,
+            note TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS activities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS entry_activities (
+            entry_id INTEGER,
+            activity_id INTEGER,
+            FOREIGN KEY(entry_id) REFERENCES entries(id),
+            FOREIGN KEY(activity_id) REFERENCES activities(id)
+        )
+    ''')
+    predefined_activities = [
+        'work', 'relax', 'friends', 'date', 'sport', 'celebration',
+        'watching', 'reading', 'gaming', 'shopping', 'travel',
+        'good meal', 'cleaning', 'thinking', 'beaten up', 'art',
+        'sleeping', 'adrenaline', 'IDEA'
+    ]
+    for activity in predefined_activities:
+        cursor.execute('INSERT OR IGNORE INTO activities (name) VALUES (?)', (activity,))
+
+def create_full_text_index(cursor):
+    # Full-text index over entry titles and notes, kept in sync by triggers
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+            note_title,
+            note,
+            content='entries',
+            content_rowid='id'
+        )
+    ''')
+    create_full_text_triggers(cursor)
+    # Backfill journals written before the index existed
+    cursor.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+
+def create_full_text_triggers(cursor):
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+            INSERT INTO entries_fts (rowid, note_title, note)
+            VALUES (new.id, new.note_title, new.note);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, note_title, note)
+            VALUES ('delete', old.id, old.note_title, old.note);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS entries_fts_update AFTER UPDATE OF note_title, note ON entries BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, note_title, note)
+            VALUES ('delete', old.id, old.note_title, old.note);
+            INSERT INTO entries_fts (rowid, note_title, note)
+            VALUES (new.id, new.note_title, new.note);
+        END
+    ''')
+def create_lookup_indexes(cursor):
+    # Older databases can hold the same activity twice for one entry, which
+    # would break the unique index below, so keep only the first copy
+    cursor.execute('''
+        DELETE FROM entry_activities
+        WHERE rowid NOT IN (
+            SELECT MIN(rowid) FROM entry_activities GROUP BY entry_id, activity_id
+        )
+    ''')
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_entry_activities_entry
+        ON entry_activities (entry_id, activity_id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_entry_activities_activity
+        ON entry_activities (activity_id, entry_id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_entries_full_date
+        ON entries (full_date, time)
+    ''')
+    analyze_journal(cursor)
+
+def analyze_journal(cursor):
+    # Statistics for the query planner. Only the journal's own tables are
+    # analyzed, and only once they hold entries: statistics gathered on empty
+    # tables (or on the full-text index's internal tables) lead SQLite to
+    # plans that get slower with every entry added.
+    cursor.execute('SELECT EXISTS (SELECT 1 FROM entries)')
+    if cursor.fetchone()[0]:
+        cursor.execute('ANALYZE entries')
+        cursor.execute('ANALYZE entry_activities')
+
+def create_daily_mood_counts(cursor):
+    # Number of entries per day and mood, kept up to date by triggers so the
+    # Analytics page reads one row per day and mood instead of every entry
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_mood_counts (
+            day DATE NOT NULL,
+            mood TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (day, mood)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS daily_mood_counts_insert AFTER INSERT ON entries BEGIN
+            INSERT INTO daily_mood_counts (day, mood, n)
+            VALUES (new.full_date, new.mood, 1)
+            ON CONFLICT (day, mood) DO UPDATE SET n = n + 1;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS daily_mood_counts_delete AFTER DELETE ON entries BEGIN
+            UPDATE daily_mood_counts SET n = n - 1
+            WHERE day = old.full_date AND mood = old.mood;
+            DELETE FROM daily_mood_counts
+            WHERE day = old.full_date AND mood = old.mood AND n <= 0;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS daily_mood_counts_update AFTER UPDATE OF full_date, mood ON entries BEGIN
+            UPDATE daily_mood_counts SET n = n - 1
+            WHERE day = old.full_date AND mood = old.mood;
+            DELETE FROM daily_mood_counts
+            WHERE day = old.full_date AND mood = old.mood AND n <= 0;
+            INSERT INTO daily_mood_counts (day, mood, n)
+            VALUES (new.full_date, new.mood, 1)
+            ON CONFLICT (day, mood) DO UPDATE SET n = n + 1;
+        END
+    ''')
+    cursor.execute('DELETE FROM daily_mood_counts')
+    cursor.execute('''
+        INSERT INTO daily_mood_counts (day, mood, n)
+        SELECT full_date, mood, COUNT(*) FROM entries GROUP BY full_date, mood
+    ''')
+
+def create_activity_mask_triggers(cursor):
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS activity_mask_insert AFTER INSERT ON entry_activities
+        WHEN new.activity_id BETWEEN 1 AND {ACTIVITY_MASK_BITS} BEGIN
+            UPDATE entries SET activity_mask = activity_mask | (1 << (new.activity_id - 1))
+            WHERE id = new.entry_id;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS activity_mask_delete AFTER DELETE ON entry_activities
+        WHEN old.activity_id BETWEEN 1 AND {ACTIVITY_MASK_BITS} BEGIN
+            UPDATE entries SET activity_mask = activity_mask & ~(1 << (old.activity_id - 1))
+            WHERE id = old.entry_id;
+        END
+    ''')
+def create_activity_masks(cursor):
+    cursor.execute('ALTER TABLE entries ADD COLUMN activity_mask INTEGER NOT NULL DEFAULT 0')
+    create_activity_mask_triggers(cursor)
+    # Pairs are unique, so summing the bits is the same as OR-ing them
+    cursor.execute(f'''
+        UPDATE entries SET activity_mask = (
+            SELECT COALESCE(SUM(1 << (activity_id - 1)), 0)
+            FROM entry_activities
+            WHERE entry_id = entries.id AND activity_id BETWEEN 1 AND {ACTIVITY_MASK_BITS}
+        )
+    ''')
+
+def drop_stale_statistics(cursor):
+    # Journals created empty were analyzed before they had any entries, which
+    # made every insert into the full-text index slower as the journal grew
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+    if cursor.fetchone():
+        cursor.execute("DELETE FROM sqlite_stat1 WHERE tbl LIKE 'entries_fts%'")
+        cursor.execute("DELETE FROM sqlite_stat1 WHERE stat = '0' OR stat LIKE '0 %'")
+    analyze_journal(cursor)
+
+def use_mood_ids(cursor):
+    # Moods are stored as small integer ids into a moods table instead of
+    # their names. The predefined moods get the ids in MOOD_IDS; moods only
+    # found in imported journals are added after them.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS moods (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    ''')
+    cursor.executemany('INSERT OR IGNORE INTO moods (id, name) VALUES (?, ?)',
+                       [(mood_id, mood) for mood, mood_id in MOOD_IDS.items()])
+    cursor.execute('INSERT OR IGNORE INTO moods (name) SELECT DISTINCT mood FROM entries ORDER BY mood')
+
+    # SQLite cannot change a column's type in place, so entries is copied into
+    # a new table. Keep the id sequence so deleted ids are never handed out again.
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'entries'")
+    row = cursor.fetchone()
+    sequence = row[0] if row else 0
+    cursor.execute('DROP TRIGGER IF EXISTS activity_mask_insert')
+    cursor.execute('DROP TRIGGER IF EXISTS activity_mask_delete')
+    cursor.execute('''
+        CREATE TABLE entries_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            full_date DATE NOT NULL,
+            date TEXT NOT NULL,
+            weekday TEXT NOT NULL,
+            time TIME NOT NULL,
+            mood_id INTEGER NOT NULL REFERENCES moods(id),
+            note_title TEXT,
+            note TEXT,
+            activity_mask INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO entries_new
+        (id, full_date, date, weekday, time, mood_id, note_title, note, activity_mask)
+        SELECT entries.id, full_date, date, weekday, time, moods.id, note_title, note, activity_mask
+        FROM entries JOIN moods ON moods.name = entries.mood
+    ''')
+    # Dropping entries also drops its indexes and triggers
+    cursor.execute('DROP TABLE entries')
+    cursor.execute('ALTER TABLE entries_new RENAME TO entries')
+    cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'entries'", (sequence,))
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_entries_full_date
+        ON entries (full_date, time)
+    ''')
+    create_full_text_triggers(cursor)
+    create_activity_mask_triggers(cursor)
+
+    # The daily rollup is rebuilt keyed by mood id
+    cursor.execute('DROP TABLE daily_mood_counts')
+    cursor.execute('''
+        CREATE TABLE daily_mood_counts (
+            day DATE NOT NULL,
+            mood_id INTEGER NOT NULL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (day, mood_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER daily_mood_counts_insert AFTER INSERT ON entries BEGIN
+            INSERT INTO daily_mood_counts (day, mood_id, n)
+            VALUES (new.full_date, new.mood_id, 1)
+            ON CONFLICT (day, mood_id) DO UPDATE SET n = n + 1;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER daily_mood_counts_delete AFTER DELETE ON entries BEGIN
+            UPDATE daily_mood_counts SET n = n - 1
+            WHERE day = old.full_date AND mood_id = old.mood_id;
+            DELETE FROM daily_mood_counts
+            WHERE day = old.full_date AND mood_id = old.mood_id AND n <= 0;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER daily_mood_counts_update AFTER UPDATE OF full_date, mood_id ON entries BEGIN
+            UPDATE daily_mood_counts SET n = n - 1
+            WHERE day = old.full_date AND mood_id = old.mood_id;
+            DELETE FROM daily_mood_counts
+            WHERE day = old.full_date AND mood_id = old.mood_id AND n <= 0;
+            INSERT INTO daily_mood_counts (day, mood_id, n)
+            VALUES (new.full_date, new.mood_id, 1)
+            ON CONFLICT (day, mood_id) DO UPDATE SET n = n + 1;
+        END
+    ''')
+    cursor.execute('''
+        INSERT INTO daily_mood_counts (day, mood_id, n)
+        SELECT full_date, mood_id, COUNT(*) FROM entries GROUP BY full_date, mood_id
+    ''')
+    analyze_journal(cursor)
+
+# Writing streaks
+# Runs of consecutive days with at least one entry, one row per run. Triggers
+# only act when a day gains its first entry or loses its last one: a new day
+# joins the streaks ending the day before and starting the day after, and an
+# emptied day splits its streak in two. Days that are not YYYY-MM-DD dates are
+# left out.
+def add_streak_day_sql(day):
+    return f"""
+        INSERT OR REPLACE INTO writing_streaks (start_day, end_day, days)
+        SELECT start_day, end_day, CAST(julianday(end_day) - julianday(start_day) AS INTEGER) + 1
+        FROM (
+            SELECT COALESCE((SELECT start_day FROM writing_streaks WHERE end_day = date({day}, '-1 day')),
+                            {day}) AS start_day,
+                   COALESCE((SELECT end_day FROM writing_streaks WHERE start_day = date({day}, '+1 day')),
+                            {day}) AS end_day
+        );
+        DELETE FROM writing_streaks WHERE start_day = date({day}, '+1 day');
+    """
+
+def remove_streak_day_sql(day):
+    return f"""
+        INSERT INTO writing_streaks (start_day, end_day, days)
+        SELECT date({day}, '+1 day'), end_day, CAST(julianday(end_day) - julianday({day}) AS INTEGER)
+        FROM writing_streaks
+        WHERE start_day = (SELECT MAX(start_day) FROM writing_streaks WHERE start_day <= {day})
+          AND end_day > {day};
+        UPDATE writing_streaks
+        SET end_day = date({day}, '-1 day'), days = CAST(julianday({day}) - julianday(start_day) AS INTEGER)
+        WHERE start_day = (SELECT MAX(start_day) FROM writing_streaks WHERE start_day < {day})
+          AND end_day >= {day};
+        DELETE FROM writing_streaks WHERE start_day = {day};
+    """
+
+def first_entry_of_day_sql(day):
+    return f"date({day}) = {day} AND NOT EXISTS (SELECT 1 FROM entries WHERE full_date = {day} AND id != new.id)"
+
+def no_entries_on_day_sql(day):
+    return f"date({day}) = {day} AND NOT EXISTS (SELECT 1 FROM entries WHERE full_date = {day})"
+
+def create_writing_streaks(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS writing_streaks (
+            start_day DATE PRIMARY KEY,
+            end_day DATE NOT NULL,
+            days INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_writing_streaks_end_day ON writing_streaks(end_day)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_writing_streaks_days ON writing_streaks(days)')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS writing_streaks_insert AFTER INSERT ON entries
+        WHEN {first_entry_of_day_sql('new.full_date')} BEGIN
+            {add_streak_day_sql('new.full_date')}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS writing_streaks_delete AFTER DELETE ON entries
+        WHEN {no_entries_on_day_sql('old.full_date')} BEGIN
+            {remove_streak_day_sql('old.full_date')}
+        END
+    ''')
+    # An entry moved to another day leaves one day and joins another
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS writing_streaks_update_from AFTER UPDATE OF full_date ON entries
+        WHEN old.full_date IS NOT new.full_date AND {no_entries_on_day_sql('old.full_date')} BEGIN
+            {remove_streak_day_sql('old.full_date')}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS writing_streaks_update_to AFTER UPDATE OF full_date ON entries
+        WHEN old.full_date IS NOT new.full_date AND {first_entry_of_day_sql('new.full_date')} BEGIN
+            {add_streak_day_sql('new.full_date')}
+        END
+    ''')
+    # Existing journals: consecutive days share the same day number minus
+    # their position, which groups them into streaks
+    cursor.execute('DELETE FROM writing_streaks')
+    cursor.execute('''
+        INSERT INTO writing_streaks (start_day, end_day, days)
+        SELECT MIN(day), MAX(day), COUNT(*)
+        FROM (
+            SELECT day, julianday(day) - ROW_NUMBER() OVER (ORDER BY day) AS streak
+            FROM (SELECT DISTINCT full_date AS day FROM entries WHERE date(full_date) = full_date)
+        )
+        GROUP BY streak
+    ''')
+
+def create_attachments(cursor):
+    # Only the hash of each attached file is stored here; the files themselves
+    # live in the attachment store on disk (see journal_core.attachments)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS attachments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entry_id INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            file_name TEXT,
+            mime_type TEXT,
+            size INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_attachments_entry ON attachments(entry_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_attachments_sha256 ON attachments(sha256)')
+
+def create_drafts(cursor):
+    # Unsaved Write page entries, one row per draft. Kept in the journal so a
+    # draft can be deleted in the same transaction that saves its entry.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS drafts (
+            id TEXT PRIMARY KEY,
+            entry_date DATE,
+            entry_time TIME,
+            mood_id INTEGER,
+            activities TEXT,
+            note_title TEXT,
+            note TEXT,
+            updated_at TEXT NOT NULL
+        )
+    ''')
+
+def create_activity_bit_triggers(cursor):
+    # A new activity takes the lowest free mask slot: 0, or one past a slot in
+    # use, that no activity holds. Once all slots are taken its bit is NULL.
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS activity_bit_assign AFTER INSERT ON activities
+        WHEN new.bit IS NULL BEGIN
+            UPDATE activities SET bit = (
+                SELECT MIN(slot) FROM (
+                    SELECT 0 AS slot
+                    UNION ALL SELECT bit + 1 FROM activities WHERE bit IS NOT NULL
+                )
+                WHERE slot < {ACTIVITY_MASK_BITS}
+                AND slot NOT IN (SELECT bit FROM activities WHERE bit IS NOT NULL)
+            )
+            WHERE id = new.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS activity_bit_release AFTER DELETE ON activities
+        WHEN old.bit IS NOT NULL BEGIN
+            UPDATE entries SET activity_mask = activity_mask & ~(1 << old.bit)
+            WHERE activity_mask & (1 << old.bit);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS activity_mask_insert AFTER INSERT ON entry_activities
+        WHEN (SELECT bit FROM activities WHERE id = new.activity_id) IS NOT NULL BEGIN
+            UPDATE entries
+            SET activity_mask = activity_mask | (1 << (SELECT bit FROM activities WHERE id = new.activity_id))
+            WHERE id = new.entry_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS activity_mask_delete AFTER DELETE ON entry_activities
+        WHEN (SELECT bit FROM activities WHERE id = old.activity_id) IS NOT NULL BEGIN
+            UPDATE entries
+            SET activity_mask = activity_mask & ~(1 << (SELECT bit FROM activities WHERE id = old.activity_id))
+            WHERE id = old.entry_id;
+        END
+    ''')
+
+def assign_activity_bits(cursor):
+    # Mask bits were (activity id - 1), but activity ids have gaps (every
+    # INSERT OR IGNORE of an existing name uses up an id), so long-used
+    # journals ran out of bits long before they had 63 activities. Each
+    # activity now holds a dense slot in a bit column instead, numbered in id
+    # order.
+    cursor.execute('ALTER TABLE activities ADD COLUMN bit INTEGER')
+    cursor.execute('''
+        UPDATE activities SET bit = (
+            SELECT COUNT(*) FROM activities AS earlier WHERE earlier.id < activities.id
+        )
+    ''')
+    cursor.execute(f'UPDATE activities SET bit = NULL WHERE bit >= {ACTIVITY_MASK_BITS}')
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_activities_bit ON activities (bit)')
+    cursor.execute('DROP TRIGGER IF EXISTS activity_mask_insert')
+    cursor.execute('DROP TRIGGER IF EXISTS activity_mask_delete')
+    create_activity_bit_triggers(cursor)
+    # Masks only change where an activity's bit moved, which never happens
+    # in a journal whose activity ids have no gaps
+    cursor.execute(f'''
+        SELECT EXISTS (
+            SELECT 1 FROM activities
+            WHERE bit IS NOT (CASE WHEN id BETWEEN 1 AND {ACTIVITY_MASK_BITS} THEN id - 1 END)
+        )
+    ''')
+    if cursor.fetchone()[0]:
+        cursor.execute('''
+            UPDATE entries SET activity_mask = (
+                SELECT COALESCE(SUM(1 << activities.bit), 0)
+                FROM entry_activities
+                JOIN activities ON activities.id = entry_activities.activity_id
+                WHERE entry_activities.entry_id = entries.id AND activities.bit IS NOT NULL
+            )
+        ''')
+
+def legacy_name(label):
+    # "😊 Happy" -> "Happy"; labels without an emoji are kept as they are
+    return label.split(' ', 1)[-1].strip()
+
+def import_legacy_entries(cursor):
+    # The first version of the app kept every entry in one journal_entries
+    # table, with the mood and activities stored as their labels ("😊 Happy",
+    # "💼 Work, 📚 Study"). Its rows are copied into entries and
+    # entry_activities, then the table is dropped. Labels the app still has
+    # map to their mood or activity; the others are added under the label's text.
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'journal_entries'")
+    if not cursor.fetchone():
+        return
+    conn = cursor.connection
+    mood_ids = {name: mood_id for mood_id, name in load_moods(conn).items()}
+    activity_ids = load_activity_ids(conn)
+    cursor.execute('''
+        SELECT entry_date, entry_time, mood, activities, entry_title, entry_text
+        FROM journal_entries ORDER BY id
+    ''')
+    for entry_date, entry_time, mood, activities, entry_title, entry_text in cursor.fetchall():
+        mood_id = MOOD_IDS_BY_LABEL.get(mood) or get_mood_id(cursor, mood_ids, legacy_name(mood))
+        activity_names = []
+        for label in (activities or '').split(', '):
+            if label.strip():
+                name = ACTIVITY_NAMES_BY_LABEL.get(label) or legacy_name(label)
+                get_activity_id(cursor, activity_ids, name)
+                activity_names.append(name)
+        add_entry(conn, datetime.date.fromisoformat(entry_date),
+                  datetime.datetime.strptime(entry_time, "%H:%M").time(),
+                  mood_id, activity_names, entry_title or None, entry_text or None)
+    cursor.execute('DROP TABLE journal_entries')
+    analyze_journal(cursor)
+
+def create_settings_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            setting_name TEXT UNIQUE,
+            setting_value TEXT
+        )
+    ''')
+
+JOURNAL_MIGRATIONS = [
+    create_journal_tables,
+    create_full_text_index,
+    create_lookup_indexes,
+    create_daily_mood_counts,
+    create_activity_masks,
+    drop_stale_statistics,
+    use_mood_ids,
+    create_writing_streaks,
+    create_attachments,
+    create_drafts,
+    assign_activity_bits,
+    import_legacy_entries,
+]
+
+SETTINGS_MIGRATIONS = [
+    create_settings_table,
+]
+
+def run_migrations(conn, migrations):
+    # Returns the schema version. An up-to-date database costs one PRAGMA read
+    # and no write transaction.
+    cursor = conn.cursor()
+    cursor.execute('PRAGMA user_version')
+    version = cursor.fetchone()[0]
+    while version < len(migrations):
+        # The migration and its version bump commit together or not at all
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            # Another process may have migrated while this one waited for the lock
+            cursor.execute('PRAGMA user_version')
+            version = cursor.fetchone()[0]
+            if version < len(migrations):
+                migrations[version](cursor)
+                version += 1
+                cursor.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return version
+
+def open_journal(path):
+    # Opens the journal at path for writing, creating it or bringing its schema
+    # up to date first, so the app can open it straight away (or it can be the
+    # app's my_journal.db)
+    conn = connect(path)
+    run_migrations(conn, JOURNAL_MIGRATIONS)
+    return conn
@@ -0,0 +1,12 @@
+# The settings database holds one row per setting, with the value as text
+def load_settings(conn):
+    cursor = conn.cursor()
+    cursor.execute('SELECT setting_name, setting_value FROM settings')
+    return {name: value for name, value in cursor.fetchall()}
+
+def save_settings(conn, settings):
+    cursor = conn.cursor()
+    cursor.executemany('''
+        INSERT OR REPLACE INTO settings (setting_name, setting_value)
+        VALUES (?, ?)
+    ''', settings.items())
@@ -0,0 +1,24 @@
+import datetime
+
+# Writing streaks are kept up to date by triggers (see create_writing_streaks),
+# so reading them is two index lookups however long the journal is.
+def load_writing_streaks(conn, today=None):
+    # The current streak is still alive if the last entry was yesterday; days
+    # after today (entries dated in the future) do not count towards it
+    today = today or datetime.date.today()
+    yesterday = today - datetime.timedelta(days=1)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT start_day, end_day FROM writing_streaks
+        WHERE start_day <= ?
+        ORDER BY start_day DESC
+        LIMIT 1
+    ''', (today.isoformat(),))
+    row = cursor.fetchone()
+    current = 0
+    if row and row[1] >= yesterday.isoformat():
+        last_day = min(datetime.date.fromisoformat(row[1]), today)
+        current = (last_day - datetime.date.fromisoformat(row[0])).days + 1
+    cursor.execute('SELECT MAX(days) FROM writing_streaks')
+    longest = cursor.fetchone()[0] or 0
+    return {'current': current, 'longest': longest}
@@ -0,0 +1,177 @@
+import collections
+import json
+import re
+import time
+
+# SQL tracing
+# Wraps connections so every statement run through them is recorded with its
+# text, the shape of its parameters (never their values, which can be journal
+# text), the number of rows it returned or changed and its wall time. Time
+# spent fetching rows counts towards the statement, since SQLite does most of
+# a query's work while the rows are being stepped through.
+class SqlTracer:
+    def __init__(self, explain=False, max_records=2000):
+        self.explain = explain
+        self.records = collections.deque(maxlen=max_records)
+        self.sections = collections.deque(maxlen=max_records)
+        self.rerun = 0
+        self.section = None
+        self._section_started = None
+
+    def wrap(self, conn, database):
+        return TracedConnection(conn, self, database)
+
+    def start_rerun(self):
+        self.rerun += 1
+        self.section = None
+
+    def begin_section(self, name):
+        self.section = name
+        self._section_started = time.perf_counter()
+
+    def end_section(self):
+        if self.section is None:
+            return
+        elapsed = time.perf_counter() - self._section_started
+        self.sections.append({
+            'rerun': self.rerun,
+            'section': self.section,
+            'ms': round(elapsed * 1000, 3),
+        })
+        self.section = None
+
+    def record_statement(self, database, sql, param_shape):
+        record = {
+            'rerun': self.rerun,
+            'section': self.section,
+            'database': database,
+            'statement': ' '.join(sql.split()),
+            'params': param_shape,
+            'rows': 0,
+            'ms': 0.0,
+            'plan': None,
+            'at': time.time(),
+        }
+        self.records.append(record)
+        return record
+
+    def rerun_records(self, rerun=None):
+        rerun = self.rerun if rerun is None else rerun
+        return [record for record in self.records if record['rerun'] == rerun]
+
+    def slowest(self, limit=10, rerun=None):
+        return sorted(self.rerun_records(rerun), key=lambda record: record['ms'], reverse=True)[:limit]
+
+    def rerun_sections(self, rerun=None):
+        rerun = self.rerun if rerun is None else rerun
+        return [section for section in self.sections if section['rerun'] == rerun]
+
+    def to_jsonl(self):
+        lines = [json.dumps(dict(record, type='statement')) for record in self.records]
+        lines += [json.dumps(dict(section, type='section')) for section in self.sections]
+        return '\n'.join(lines) + '\n' if lines else ''
+
+def param_shape(params):
+    # "(str, int)" for positional parameters, "{name: str}" for named ones
+    if not params:
+        return '()'
+    if isinstance(params, dict):
+        return '{' + ', '.join(f'{name}: {type(value).__name__}' for name, value in params.items()) + '}'
+    return '(' + ', '.join(type(value).__name__ for value in params) + ')'
+
+EXPLAINABLE = re.compile(r'\s*(SELECT|WITH)\b', re.IGNORECASE)
+
+class TracedConnection:
+    def __init__(self, conn, tracer, database):
+        self._conn = conn
+        self._tracer = tracer
+        self._database = database
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._conn.__exit__(*exc_info)
+
+    def cursor(self):
+        return TracedCursor(self._conn.cursor(), self._tracer, self._database)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+class TracedCursor:
+    def __init__(self, cursor, tracer, database):
+        self._cursor = cursor
+        self._tracer = tracer
+        self._database = database
+        self._record = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, sql, params=()):
+        self._record = self._tracer.record_statement(self._database, sql, param_shape(params))
+        if self._tracer.explain and EXPLAINABLE.match(sql):
+            # Planned on a separate cursor so the statement itself is not disturbed
+            plan = self._cursor.connection.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+            self._record['plan'] = [row[-1] for row in plan]
+        started = time.perf_counter()
+        try:
+            self._cursor.execute(sql, params)
+        finally:
+            self._record['ms'] += (time.perf_counter() - started) * 1000
+        if self._cursor.rowcount > 0:
+            self._record['rows'] = self._cursor.rowcount
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        shape = param_shape(seq_of_params[0]) if seq_of_params else '()'
+        self._record = self._tracer.record_statement(self._database, sql, f'{len(seq_of_params)} × {shape}')
+        started = time.perf_counter()
+        try:
+            self._cursor.executemany(sql, seq_of_params)
+        finally:
+            self._record['ms'] += (time.perf_counter() - started) * 1000
+        self._record['rows'] = max(self._cursor.rowcount, 0)
+        return self
+
+    def _timed(self, fetch, *args):
+        started = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            if self._record:
+                self._record['ms'] += (time.perf_counter() - started) * 1000
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None and self._record:
+            self._record['rows'] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(self._cursor.fetchmany, size or self._cursor.arraysize)
+        if self._record:
+            self._record['rows'] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        if self._record:
+            self._record['rows'] += len(rows)
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
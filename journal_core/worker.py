@@ -0,0 +1,64 @@
+import queue
+import threading
+
+from .connection import ConnectionPool
+from .schema import JOURNAL_MIGRATIONS, run_migrations
+
+# Background database worker
+# Runs a UI's database calls on one thread of their own, in the order they were
+# submitted, so a slow query or disk never blocks the UI's event loop. Each
+# call runs in its own transaction. Finished calls wait in a queue until the UI
+# thread calls deliver_results(), which runs their callbacks there (the
+# ttkbootstrap app polls it with after()), so callbacks can update widgets.
+class DatabaseWorker:
+    def __init__(self, path, migrations=JOURNAL_MIGRATIONS):
+        self.pool = ConnectionPool(path, max_idle=1)
+        self._migrations = migrations
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='database-worker', daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args, on_done=None, on_error=None):
+        # func(conn, *args) runs on the worker thread. on_done gets its result
+        # and on_error the exception it raised; without on_error the exception
+        # is raised again from deliver_results().
+        self._requests.put((func, args, on_done, on_error))
+
+    def _run(self):
+        try:
+            with self.pool.connection() as conn:
+                run_migrations(conn, self._migrations)
+        except Exception as e:
+            self._results.put((None, e, True))
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            func, args, on_done, on_error = request
+            try:
+                with self.pool.connection() as conn:
+                    result = func(conn, *args)
+            except Exception as e:
+                self._results.put((on_error, e, True))
+            else:
+                self._results.put((on_done, result, False))
+
+    def deliver_results(self):
+        # Call from the UI thread. Returns the number of results delivered.
+        delivered = 0
+        while True:
+            try:
+                callback, value, failed = self._results.get_nowait()
+            except queue.Empty:
+                return delivered
+            delivered += 1
+            if failed and callback is None:
+                raise value
+            if callback:
+                callback(value)
+
+    def close(self, timeout=5):
+        # Finishes the calls already submitted, then stops the thread
+        self._requests.put(None)
+        self._thread.join(timeout)
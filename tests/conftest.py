@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal_core import open_journal
+
+@pytest.fixture
+def journal(tmp_path):
+    conn = open_journal(str(tmp_path / 'journal.db'))
+    yield conn
+    conn.close()
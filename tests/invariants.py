@@ -0,0 +1,44 @@
+import datetime
+
+# The tables kept up to date by triggers, recomputed from entries and
+# entry_activities, so tests can compare them with what the triggers left
+def expected_daily_mood_counts(conn):
+    rows = conn.execute('''
+        SELECT full_date, mood_id, COUNT(*) FROM entries
+        GROUP BY full_date, mood_id ORDER BY full_date, mood_id
+    ''')
+    return [tuple(row) for row in rows]
+
+def expected_activity_masks(conn):
+    masks = {row[0]: 0 for row in conn.execute('SELECT id FROM entries')}
+    for entry_id, bit in conn.execute('''
+        SELECT entry_activities.entry_id, activities.bit
+        FROM entry_activities JOIN activities ON activities.id = entry_activities.activity_id
+        WHERE activities.bit IS NOT NULL
+    '''):
+        if entry_id in masks:
+            masks[entry_id] |= 1 << bit
+    return masks
+
+def expected_writing_streaks(conn):
+    days = []
+    for (day,) in conn.execute('SELECT DISTINCT full_date FROM entries ORDER BY full_date'):
+        try:
+            days.append(datetime.date.fromisoformat(day))
+        except ValueError:
+            pass
+    streaks = []
+    for day in days:
+        if streaks and day - streaks[-1][1] == datetime.timedelta(days=1):
+            streaks[-1][1] = day
+        else:
+            streaks.append([day, day])
+    return [(start.isoformat(), end.isoformat(), (end - start).days + 1) for start, end in streaks]
+
+def assert_rollups_match(conn):
+    daily_mood_counts = conn.execute('SELECT day, mood_id, n FROM daily_mood_counts ORDER BY day, mood_id')
+    assert [tuple(row) for row in daily_mood_counts] == expected_daily_mood_counts(conn)
+    masks = conn.execute('SELECT id, activity_mask FROM entries')
+    assert {row[0]: row[1] for row in masks} == expected_activity_masks(conn)
+    streaks = conn.execute('SELECT start_day, end_day, days FROM writing_streaks ORDER BY start_day')
+    assert [tuple(row) for row in streaks] == expected_writing_streaks(conn)
@@ -0,0 +1,14 @@
+import importlib
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HELPER_SCRIPTS = os.path.join(ROOT, 'helper-scripts')
+BENCHMARKS = os.path.join(ROOT, 'benchmarks')
+
+# The helper scripts and benchmarks are not packages. They are imported from
+# their folder, the same way they import each other.
+def load_script(name, folder=HELPER_SCRIPTS):
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
+    return importlib.import_module(name)
@@ -0,0 +1,94 @@
+import datetime
+import hashlib
+import io
+import os
+import time
+
+import pytest
+from PIL import Image
+
+from journal_core import MOOD_IDS, AttachmentStore, add_attachments, add_entry, delete_entry, load_attachments
+from journal_core.attachments import UNUSED_GRACE_PERIOD
+
+def image_bytes(size=(800, 600), color='red', image_format='PNG'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, image_format)
+    return buffer.getvalue()
+
+@pytest.fixture
+def store(tmp_path):
+    return AttachmentStore(str(tmp_path / 'attachments'))
+
+def stored_files(store):
+    return sorted(name for _, _, names in os.walk(os.path.join(store.root, 'files')) for name in names)
+
+def add_photo_entry(conn, store, photos):
+    attachments = []
+    for name, data in photos:
+        sha256, size = store.save(io.BytesIO(data))
+        attachments.append((sha256, name, 'image/png', size))
+    entry_id = add_entry(conn, datetime.date(2024, 5, 1), datetime.time(12), MOOD_IDS['Rad'], [], None, None)
+    add_attachments(conn, entry_id, attachments)
+    conn.commit()
+    return entry_id
+
+def test_files_are_stored_once(store):
+    data = image_bytes()
+    sha256, size = store.save(io.BytesIO(data))
+    assert (sha256, size) == (hashlib.sha256(data).hexdigest(), len(data))
+    assert store.save(io.BytesIO(data)) == (sha256, size)
+    # Nothing is left behind in the staging folder
+    assert stored_files(store) == [sha256]
+    with open(store.file_path(sha256), 'rb') as f:
+        assert f.read() == data
+
+def test_thumbnails(store):
+    photos = [store.save(io.BytesIO(image_bytes((800, 600), 'red')))[0],
+              store.save(io.BytesIO(b'not an image'))[0],
+              store.save(io.BytesIO(image_bytes((100, 2000), 'blue', 'JPEG')))[0]]
+    wide, broken, tall = store.thumbnails(photos)
+    assert broken is None
+    with Image.open(wide) as image:
+        assert image.format == 'JPEG' and image.size == (256, 192)
+    with Image.open(tall) as image:
+        assert image.size[1] == 256
+    # Cached thumbnails are not made again
+    modified = os.path.getmtime(wide)
+    assert store.make_thumbnail(photos[0]) == wide
+    assert os.path.getmtime(wide) == modified
+    assert store.make_thumbnail(photos[0], size=64) != wide
+
+def test_attachments_follow_their_entry(journal, store):
+    shared = image_bytes(color='green')
+    first = add_photo_entry(journal, store, [('a.png', image_bytes()), ('shared.png', shared)])
+    second = add_photo_entry(journal, store, [('also shared.png', shared)])
+    assert [attachment['file_name'] for attachment in load_attachments(journal, first)] == ['a.png', 'shared.png']
+    sha256s = [attachment['sha256'] for attachment in load_attachments(journal, first)]
+    store.thumbnails(sha256s)
+
+    delete_entry(journal, first)
+    journal.commit()
+    assert load_attachments(journal, first) == []
+    store.remove_unused(journal, sha256s, now=time.time() + UNUSED_GRACE_PERIOD)
+    # The photo still attached to the second entry is kept with its thumbnail
+    assert stored_files(store) == [sha256s[1]]
+    assert not os.path.exists(store.thumbnail_path(sha256s[0]))
+    assert os.path.exists(store.thumbnail_path(sha256s[1]))
+    assert load_attachments(journal, second)[0]['sha256'] == sha256s[1]
+
+def test_recently_saved_files_are_kept(journal, store):
+    old, recent = image_bytes(color='red'), image_bytes(color='blue')
+    sha256s = [store.save(io.BytesIO(data))[0] for data in (old, recent)]
+    saved_at = time.time()
+    later = saved_at + UNUSED_GRACE_PERIOD
+    for sha256 in sha256s:
+        os.utime(store.file_path(sha256), (saved_at - UNUSED_GRACE_PERIOD,) * 2)
+
+    # The second file is saved again for an entry that is not committed yet
+    assert store.save(io.BytesIO(recent))[0] == sha256s[1]
+    store.remove_unused(journal, sha256s, now=saved_at)
+    assert stored_files(store) == [sha256s[1]]
+
+    # Once its grace period is over, an unused file goes too
+    store.remove_unused(journal, sha256s, now=later + 1)
+    assert stored_files(store) == []
@@ -0,0 +1,85 @@
+import base64
+import json
+import zipfile
+
+import pytest
+
+from journal_core import open_journal
+from scripts import load_script
+
+backup_to_sqlite = load_script('backup_to_sqlite')
+
+BACKUP = {
+    'version': 15,
+    'customMoods': [
+        {'id': 1, 'custom_name': '', 'predefined_name_id': 1},
+        {'id': 6, 'custom_name': 'Sleepy', 'predefined_name_id': None},
+    ],
+    # Skipped: strings with quotes, brackets and escapes, and nested values
+    'prefs': {'theme': 'dark "night" {mode}', 'list': [1, [2, {'a': '\\]'}]], 'x': -1.5e3},
+    'tags': [{'id': 10, 'name': 'work'}, {'id': 11, 'name': 'birdwatching 🐦'}],
+    'dayEntries': [
+        {'year': 2024, 'month': 0, 'day': 5, 'hour': 8, 'minute': 3, 'mood': 1,
+         'note_title': 'First', 'note': 'Ünïcode line<br>second line', 'tags': [10, 11, 10]},
+        {'year': 2024, 'month': 11, 'day': 31, 'mood': 6, 'note': '', 'tags': []},
+    ],
+    'goals': [],
+}
+
+def write_backup(path, document=BACKUP, zipped=True):
+    encoded = base64.encodebytes(json.dumps(document, ensure_ascii=False).encode('utf-8'))
+    if zipped:
+        with zipfile.ZipFile(path, 'w') as archive:
+            archive.writestr('backup.daylio', encoded)
+    else:
+        path.write_bytes(encoded)
+    return str(path)
+
+def split(text, size):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+@pytest.mark.parametrize('zipped', [True, False])
+@pytest.mark.parametrize('chunk_size', [1, 3, 5, 77, 1024 * 1024])
+def test_iter_base64_chunks(tmp_path, zipped, chunk_size):
+    path = write_backup(tmp_path / 'backup.zip', zipped=zipped)
+    decoded = b''.join(backup_to_sqlite.iter_base64_chunks(path, chunk_size))
+    assert json.loads(decoded) == BACKUP
+
+def test_iter_text_joins_split_characters():
+    encoded = 'Ünïcode 🐦'.encode('utf-8')
+    assert ''.join(backup_to_sqlite.iter_text(split(encoded, 1))) == 'Ünïcode 🐦'
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64])
+def test_json_stream_reads_arrays_across_chunks(chunk_size):
+    text = json.dumps(BACKUP, ensure_ascii=False, indent=1)
+    items = list(backup_to_sqlite.iter_array_items(split(text, chunk_size), ('tags', 'dayEntries')))
+    assert items == [('tags', tag) for tag in BACKUP['tags']] + [('dayEntries', entry) for entry in BACKUP['dayEntries']]
+
+def test_json_stream_stops_after_the_arrays_it_needs():
+    text = json.dumps({'tags': [{'id': 1, 'name': 'work'}], 'rest': 'unterminated'})[:-4]
+    items = list(backup_to_sqlite.iter_array_items(split(text, 4), ('tags',)))
+    assert items == [('tags', {'id': 1, 'name': 'work'})]
+
+def test_json_stream_rejects_truncated_data():
+    text = json.dumps(BACKUP)[:-20]
+    with pytest.raises(ValueError):
+        list(backup_to_sqlite.iter_array_items(split(text, 16), ('goals',)))
+
+def test_import_backup(tmp_path):
+    path = write_backup(tmp_path / 'backup.zip')
+    conn = open_journal(str(tmp_path / 'journal.db'))
+    assert backup_to_sqlite.import_backup(conn, path, batch_size=1) == 2
+    rows = conn.execute('SELECT full_date, time, note_title, note FROM entries ORDER BY id')
+    assert [tuple(row) for row in rows] == [('2024-01-05', '08:03', 'First', 'Ünïcode line\nsecond line'),
+                                            ('2024-12-31', '00:00', None, '')]
+    activities = conn.execute('''
+        SELECT activities.name FROM entry_activities
+        JOIN activities ON activities.id = entry_activities.activity_id
+        ORDER BY activities.name
+    ''').fetchall()
+    assert [row[0] for row in activities] == ['birdwatching 🐦', 'work']
+
+    # Importing the same backup again adds nothing
+    assert backup_to_sqlite.import_backup(conn, path, batch_size=1) == 0
+    assert conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0] == 2
+    conn.close()
@@ -0,0 +1,64 @@
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from journal_core import QueryCache
+
+@pytest.fixture
+def journal_path(journal, tmp_path):
+    return str(tmp_path / 'journal.db')
+
+def count_entries(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+    finally:
+        conn.close()
+
+def add_note(conn, note):
+    conn.execute('''
+        INSERT INTO entries (full_date, date, weekday, time, mood_id, note)
+        VALUES ('2024-05-01', 'May 1', 'Wednesday', '12:00', 1, ?)
+    ''', (note,))
+    conn.commit()
+
+def test_results_are_reused_until_the_journal_changes(journal, journal_path):
+    cache = QueryCache(journal_path)
+    assert cache.get('count', lambda: count_entries(journal_path)) == 0
+    assert cache.get('count', lambda: pytest.fail('computed twice')) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    add_note(journal, 'New entry')
+    assert cache.get('count', lambda: count_entries(journal_path)) == 1
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def test_writes_from_another_process_clear_the_cache(journal, journal_path):
+    cache = QueryCache(journal_path)
+    assert cache.get('count', lambda: count_entries(journal_path)) == 0
+    subprocess.run([sys.executable, '-c', f'''
+import sqlite3
+conn = sqlite3.connect({journal_path!r})
+conn.execute("""INSERT INTO entries (full_date, date, weekday, time, mood_id)
+                VALUES ('2024-05-01', 'May 1', 'Wednesday', '12:00', 1)""")
+conn.commit()
+'''], check=True)
+    assert cache.get('count', lambda: count_entries(journal_path)) == 1
+
+def test_uncommitted_and_read_only_work_keeps_the_cache(journal, journal_path):
+    cache = QueryCache(journal_path)
+    cache.get('count', lambda: count_entries(journal_path))
+    journal.execute('SELECT COUNT(*) FROM entries').fetchone()
+    journal.execute("INSERT INTO entries (full_date, date, weekday, time, mood_id) VALUES ('x', '', '', '', 1)")
+    journal.rollback()
+    assert cache.get('count', lambda: pytest.fail('cache was cleared')) == 0
+
+def test_least_recently_used_results_are_dropped(journal, journal_path):
+    cache = QueryCache(journal_path, max_entries=2)
+    cache.get('a', lambda: 'a')
+    cache.get('b', lambda: 'b')
+    cache.get('a', lambda: pytest.fail('a was dropped'))
+    cache.get('c', lambda: 'c')
+    assert cache.get('b', lambda: 'computed again') == 'computed again'
+    assert cache.get('c', lambda: pytest.fail('c was dropped')) == 'c'
@@ -0,0 +1,86 @@
+import csv
+
+import pytest
+
+from scripts import load_script
+
+csv_to_sqlite = load_script('csv_to_sqlite')
+
+FIELDS = ['full_date', 'date', 'weekday', 'time', 'mood', 'activities', 'note_title', 'note']
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def make_rows(count):
+    return [{
+        'full_date': f'2024-01-{number + 1:02d}', 'date': f'January {number + 1}', 'weekday': 'Monday',
+        'time': '09:00', 'mood': 'Rad',
+        'activities': 'work | birdwatching | work' if number % 2 else '',
+        'note_title': f'Day {number}', 'note': f'Line one<br><br>line {number}',
+    } for number in range(count)]
+
+def imported_notes(conn):
+    return [row[0] for row in conn.execute('SELECT note FROM entries ORDER BY id')]
+
+def test_import_resumes_after_a_bad_row(tmp_path):
+    csv_path = tmp_path / 'journal.csv'
+    rows = make_rows(7)
+    rows[4]['mood'] = ''
+    write_csv(csv_path, rows)
+    conn = csv_to_sqlite.create_database(str(tmp_path / 'journal.db'))
+
+    with pytest.raises(ValueError, match='Row 5 is missing mood'):
+        csv_to_sqlite.process_csv(conn, str(csv_path), batch_size=2)
+    assert imported_notes(conn) == [f'Line one\n\nline {number}' for number in range(4)]
+
+    rows[4]['mood'] = 'meh'
+    write_csv(csv_path, rows)
+    assert csv_to_sqlite.process_csv(conn, str(csv_path), batch_size=2) == 3
+    assert imported_notes(conn) == [f'Line one\n\nline {number}' for number in range(7)]
+    assert conn.execute('SELECT COUNT(*) FROM entry_activities').fetchone()[0] == 6
+    assert conn.execute("SELECT COUNT(*) FROM activities WHERE name = 'birdwatching'").fetchone()[0] == 1
+
+    # Everything is imported, so running it again adds nothing
+    assert csv_to_sqlite.process_csv(conn, str(csv_path), batch_size=2) == 0
+    conn.close()
+
+def test_changed_file_is_imported_from_the_start(tmp_path):
+    csv_path = tmp_path / 'journal.csv'
+    rows = make_rows(4)
+    write_csv(csv_path, rows)
+    conn = csv_to_sqlite.create_database(str(tmp_path / 'journal.db'))
+    assert csv_to_sqlite.process_csv(conn, str(csv_path), batch_size=3) == 4
+
+    # Rows added at the end are imported on their own
+    rows += make_rows(6)[4:]
+    write_csv(csv_path, rows)
+    assert csv_to_sqlite.process_csv(conn, str(csv_path), batch_size=3) == 2
+
+    # A changed row that was already imported starts the import over
+    rows[1]['note'] = 'Rewritten'
+    write_csv(csv_path, rows)
+    assert csv_to_sqlite.process_csv(conn, str(csv_path), batch_size=3) == 6
+    assert imported_notes(conn)[6:] == [rows[number]['note'].replace('<br><br>', '\n\n') for number in range(6)]
+
+    # So does a file with fewer rows than were imported
+    write_csv(csv_path, rows[:3])
+    assert csv_to_sqlite.process_csv(conn, str(csv_path), batch_size=3) == 3
+    conn.close()
+
+def test_checkpoints_without_a_hash_are_resumed(tmp_path):
+    db_path = str(tmp_path / 'journal.db')
+    csv_path = tmp_path / 'journal.csv'
+    write_csv(csv_path, make_rows(5))
+    conn = csv_to_sqlite.open_journal(db_path)
+    conn.execute('CREATE TABLE import_progress (source TEXT PRIMARY KEY, rows_done INTEGER NOT NULL)')
+    conn.execute('INSERT INTO import_progress VALUES (?, 2)', (str(csv_path),))
+    conn.commit()
+    conn.close()
+
+    conn = csv_to_sqlite.create_database(db_path)
+    assert csv_to_sqlite.process_csv(conn, str(csv_path), batch_size=2) == 3
+    assert imported_notes(conn) == [f'Line one\n\nline {number}' for number in range(2, 5)]
+    conn.close()
@@ -0,0 +1,103 @@
+import datetime
+import sqlite3
+
+from journal_core import MOOD_IDS, DraftAutosaver, latest_draft_id, load_draft, save_draft
+
+def make_draft(note='', activities=()):
+    return {
+        'entry_date': datetime.date(2024, 5, 1),
+        'entry_time': datetime.time(20, 30),
+        'mood_id': MOOD_IDS['Rad'],
+        'activities': list(activities),
+        'note_title': '',
+        'note': note,
+    }
+
+def draft_count(conn):
+    return conn.execute('SELECT COUNT(*) FROM drafts').fetchone()[0]
+
+# Stands in for a journal whose commit fails, e.g. while another session
+# holds the write lock
+class FailingCommit:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def cursor(self):
+        return self.conn.cursor()
+
+    def commit(self):
+        raise sqlite3.OperationalError('database is locked')
+
+def test_empty_draft_is_not_saved(journal):
+    autosaver = DraftAutosaver('a')
+    assert not autosaver.update(make_draft())
+    assert not autosaver.flush(journal, now=0)
+    assert draft_count(journal) == 0
+
+def test_autosaver_writes_at_most_once_per_interval(journal):
+    autosaver = DraftAutosaver('a', interval=5)
+    assert autosaver.update(make_draft('Dear diary'))
+    assert autosaver.flush(journal, now=0)
+
+    autosaver.update(make_draft('Dear diary, today'))
+    assert not autosaver.flush(journal, now=2)
+    assert load_draft(journal, 'a') == make_draft('Dear diary')
+    autosaver.update(make_draft('Dear diary, today I'))
+    assert autosaver.flush(journal, now=5)
+    assert load_draft(journal, 'a') == make_draft('Dear diary, today I')
+    assert autosaver.writes == 2
+
+    # Fields that match the saved draft need no write
+    assert not autosaver.update(make_draft('Dear diary, today I'))
+    assert not autosaver.due(now=20)
+
+def test_restored_draft_counts_as_saved(journal):
+    draft = make_draft(activities=['work'])
+    save_draft(journal, 'a', draft)
+    journal.commit()
+    autosaver = DraftAutosaver('a', saved=load_draft(journal, 'a'))
+    assert autosaver.draft == draft
+    assert not autosaver.update(draft)
+
+def test_cleared_fields_delete_the_draft(journal):
+    autosaver = DraftAutosaver('a')
+    autosaver.update(make_draft('Dear diary'))
+    autosaver.flush(journal, now=0)
+    assert autosaver.update(make_draft())
+    assert autosaver.flush(journal, now=10)
+    assert load_draft(journal, 'a') is None
+
+def test_failed_commit_is_tried_again(journal):
+    autosaver = DraftAutosaver('a')
+    autosaver.update(make_draft('Dear diary'))
+    try:
+        autosaver.flush(FailingCommit(journal), now=0)
+    except sqlite3.OperationalError:
+        journal.rollback()
+    assert autosaver.writes == 0
+    assert autosaver.due(now=0)
+    assert draft_count(journal) == 0
+
+    assert autosaver.flush(journal, now=0)
+    assert load_draft(journal, 'a') == make_draft('Dear diary')
+
+def test_discard_goes_with_the_saved_entry(journal):
+    autosaver = DraftAutosaver('a')
+    autosaver.update(make_draft('Dear diary'))
+    autosaver.flush(journal, now=0)
+    with journal:
+        autosaver.discard(journal)
+    autosaver.reset()
+    assert draft_count(journal) == 0
+    assert autosaver.draft is None
+    assert not autosaver.update(make_draft())
+
+def test_latest_draft_id_skips_open_drafts(journal):
+    assert latest_draft_id(journal) is None
+    for draft_id, updated_at in [('a', '2024-05-01T20:00:00'), ('b', '2024-05-01T21:00:00')]:
+        save_draft(journal, draft_id, make_draft(draft_id))
+        journal.execute('UPDATE drafts SET updated_at = ? WHERE id = ?', (updated_at, draft_id))
+    journal.commit()
+    assert latest_draft_id(journal) == 'b'
+    assert latest_draft_id(journal, exclude_ids=['b']) == 'a'
+    assert latest_draft_id(journal, exclude_ids=['a', 'b']) is None
@@ -0,0 +1,248 @@
+import datetime
+import random
+import sqlite3
+
+import numpy as np
+import pytest
+
+from invariants import assert_rollups_match
+from journal_core import (
+    ACTIVITY_MAPPING,
+    ACTIVITY_MASK_BITS,
+    MOOD_IDS,
+    activities_from_mask,
+    add_entry,
+    get_entry,
+    insert_entries,
+    list_entries,
+    load_activity_bits,
+    load_activity_ids,
+    load_page_anchors,
+)
+from journal_core.analytics import activity_cooccurrence, load_activity_pairs
+
+START = datetime.date(2024, 1, 1)
+END = datetime.date(2024, 12, 31)
+MOODS = [MOOD_IDS['Rad'], MOOD_IDS['meh'], MOOD_IDS['Bad']]
+
+@pytest.fixture
+def entries(journal):
+    # Several entries share a day and a time, so the id has to break ties
+    for number in range(47):
+        entry_date = START + datetime.timedelta(days=number // 4)
+        entry_time = datetime.time(8 + number % 3)
+        activities = ['work'] if number % 2 else ['friends', 'sport']
+        add_entry(journal, entry_date, entry_time, MOODS[number % 3], activities, None, f'Entry {number}')
+    journal.commit()
+    return journal
+
+def newest_first(conn, where='1', params=()):
+    rows = conn.execute(f'SELECT id FROM entries WHERE {where} ORDER BY full_date DESC, time DESC, id DESC',
+                        params)
+    return [row[0] for row in rows]
+
+def list_page(conn, page_start=None, page_size=5, start_date=START, end_date=END, **filters):
+    filters.setdefault('activity_bits', load_activity_bits(conn))
+    return list_entries(conn, start_date, end_date, page_start, page_size, **filters)
+
+def list_all(conn, **filters):
+    ids = []
+    page_start = None
+    while True:
+        rows, page_start = list_page(conn, page_start, **filters)
+        ids += [row['id'] for row in rows]
+        if page_start is None:
+            return ids
+
+def test_pages_follow_date_order(entries):
+    assert list_all(entries) == newest_first(entries)
+
+@pytest.mark.parametrize('page_size', [1, 46, 47, 48])
+def test_page_sizes(entries, page_size):
+    rows, page_start = list_page(entries, page_size=page_size)
+    assert [row['id'] for row in rows] == newest_first(entries)[:page_size]
+    assert (page_start is None) == (page_size >= 47)
+    assert list_all(entries, page_size=page_size) == newest_first(entries)
+
+def test_pages_with_filters(entries):
+    start_date = START + datetime.timedelta(days=2)
+    end_date = START + datetime.timedelta(days=8)
+    assert list_all(entries, start_date=start_date, end_date=end_date, mood_ids=MOODS[::2]) == newest_first(
+        entries, 'full_date BETWEEN ? AND ? AND mood_id IN (?, ?)', (start_date.isoformat(), end_date.isoformat(), *MOODS[::2]))
+
+def test_entries_added_while_paging_are_not_repeated(entries):
+    rows, page_start = list_page(entries)
+    seen = [row['id'] for row in rows]
+    add_entry(entries, END, datetime.time(23), MOOD_IDS['Rad'], [], None, 'Newest')
+    entries.commit()
+    while page_start is not None:
+        rows, page_start = list_page(entries, page_start)
+        seen += [row['id'] for row in rows]
+    assert seen == newest_first(entries, 'id <= 47')
+
+@pytest.mark.parametrize('page_size', [1, 5, 47, 50])
+def test_page_anchors_start_every_page(entries, page_size):
+    total, anchors = load_page_anchors(entries, START, END, page_size)
+    assert total == 47
+    assert len(anchors) == 47 // page_size
+    pages = [list_page(entries, page_start, page_size)[0] for page_start in [None] + anchors]
+    assert [row['id'] for page in pages for row in page] == newest_first(entries)
+    assert all(len(page) == page_size for page in pages[:-1])
+
+def test_page_anchors_of_an_empty_range(entries):
+    assert load_page_anchors(entries, END, END, 5) == (0, [])
+
+@pytest.mark.parametrize('activities, match_all, where', [
+    (['work', 'sport'], False, '1'),
+    (['friends', 'sport'], True, 'id % 2 = 1'),
+    (['work', 'sport'], True, '0'),
+    (['friends'], False, 'id % 2 = 1'),
+    (['work', 'never used'], False, 'id % 2 = 0'),
+    (['work', 'never used'], True, '0'),
+])
+def test_activity_filter(entries, activities, match_all, where):
+    activity_ids = load_activity_ids(entries)
+    filters = {'activity_ids': [activity_ids.get(activity) for activity in activities], 'match_all': match_all}
+    assert list_all(entries, **filters) == newest_first(entries, where)
+    # Without bits the same filter goes through entry_activities
+    assert list_all(entries, activity_bits={}, **filters) == newest_first(entries, where)
+
+def test_activity_filter_outside_the_mask(entries):
+    # Activities past the mask are matched through entry_activities
+    for number in range(ACTIVITY_MASK_BITS):
+        entries.execute('INSERT INTO activities (name) VALUES (?)', (f'activity {number}',))
+    for entry_id in newest_first(entries, 'id % 3 = 0'):
+        add_entry_activity(entries, entry_id, 'activity 62')
+    entries.commit()
+    activity_ids = load_activity_ids(entries)
+    assert activity_ids['activity 62'] not in load_activity_bits(entries)
+
+    picked = [activity_ids['activity 62'], activity_ids['work']]
+    assert list_all(entries, activity_ids=picked, match_all=True) == newest_first(entries, 'id % 6 = 0')
+    assert list_all(entries, activity_ids=picked) == newest_first(entries, 'id % 3 = 0 OR id % 2 = 0')
+
+    rows, _ = list_page(entries, use_activity_mask=False, page_size=47)
+    activities = {row['id']: set(row['activities'].split(' | ')) for row in rows}
+    assert activities[6] == {'work', 'activity 62'}
+    assert activities[7] == {'friends', 'sport'}
+
+def add_entry_activity(conn, entry_id, activity):
+    conn.execute('INSERT INTO entry_activities (entry_id, activity_id) SELECT ?, id FROM activities WHERE name = ?',
+                 (entry_id, activity))
+
+def test_activities_from_mask(entries):
+    activity_names = {bit: name for name, bit in entries.execute('SELECT name, bit FROM activities')}
+    mask = entries.execute('SELECT activity_mask FROM entries WHERE id = 1').fetchone()[0]
+    assert activities_from_mask(mask, activity_names) == ['friends', 'sport']
+
+def test_activity_cooccurrence_counts_every_pair():
+    rng = random.Random(3)
+    masks = np.array([rng.getrandbits(ACTIVITY_MASK_BITS) for _ in range(500)] + [1 << 62, 1], dtype=np.int64)
+    expected = np.zeros((ACTIVITY_MASK_BITS, ACTIVITY_MASK_BITS), dtype=np.int64)
+    for mask in masks.tolist():
+        bits = [bit for bit in range(ACTIVITY_MASK_BITS) if mask >> bit & 1]
+        for first in bits:
+            for second in bits:
+                expected[first, second] += 1
+    assert (activity_cooccurrence(masks) == expected).all()
+
+def test_load_activity_pairs(entries):
+    activity_names = {activity_id: name for name, activity_id in load_activity_ids(entries).items()}
+    pairs = load_activity_pairs(entries, START, END, activity_names)
+    work, friends, sport = (ACTIVITY_MAPPING[name] for name in ['work', 'friends', 'sport'])
+    assert list(pairs.index) == [work, friends, sport]
+    assert pairs.loc[work, work] == 23
+    assert pairs.loc[friends, sport] == pairs.loc[sport, sport] == 24
+    assert pairs.loc[work, sport] == 0
+
+def test_load_activity_pairs_without_a_mask_slot(entries):
+    masked = load_activity_pairs(entries, START, END, {activity_id: name for name, activity_id
+                                                       in load_activity_ids(entries).items()})
+    for number in range(ACTIVITY_MASK_BITS):
+        entries.execute('INSERT INTO activities (name) VALUES (?)', (f'activity {number}',))
+    for entry_id in newest_first(entries, 'id % 3 = 0'):
+        add_entry_activity(entries, entry_id, 'activity 62')
+    entries.commit()
+    activity_names = {activity_id: name for name, activity_id in load_activity_ids(entries).items()}
+
+    pairs = load_activity_pairs(entries, START, END, activity_names)
+    assert pairs.loc[masked.index, masked.columns].equals(masked)
+    work = ACTIVITY_MAPPING['work']
+    assert pairs.loc['activity 62', 'activity 62'] == 15
+    assert pairs.loc['activity 62', work] == pairs.loc[work, 'activity 62'] == 7
+
+def test_get_entry(entries):
+    entry = get_entry(entries, 2)
+    assert entry['activities'] == ['work']
+    assert (entry['mood'], entry['note']) == ('meh', 'Entry 1')
+    assert get_entry(entries, 1)['activities'] == ['friends', 'sport']
+    assert get_entry(entries, 48) is None
+
+def import_rows(count):
+    for number in range(count):
+        yield {
+            'full_date': (START + datetime.timedelta(days=number)).isoformat(),
+            'date': '', 'weekday': '', 'time': '09:00',
+            'mood': 'Curious' if number % 4 == 0 else 'Rad',
+            'activities': ['work', 'birdwatching'] if number % 3 == 0 else ['work'],
+            'note_title': None, 'note': f'Imported {number}',
+        }
+
+def create_progress_table(conn):
+    conn.execute('CREATE TABLE import_progress (source TEXT PRIMARY KEY, rows_done INTEGER NOT NULL)')
+    conn.commit()
+
+def record_batch(cursor, count):
+    cursor.execute('''
+        INSERT INTO import_progress (source, rows_done) VALUES ('test', ?)
+        ON CONFLICT (source) DO UPDATE SET rows_done = rows_done + excluded.rows_done
+    ''', (count,))
+
+def rows_done(conn):
+    return conn.execute("SELECT rows_done FROM import_progress WHERE source = 'test'").fetchone()[0]
+
+def assert_imported(conn, count):
+    notes = [row[0] for row in conn.execute('SELECT note FROM entries ORDER BY id')]
+    assert notes == [f'Imported {number}' for number in range(count)]
+    assert conn.execute("SELECT COUNT(*) FROM moods WHERE name = 'Curious'").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM activities WHERE name = 'birdwatching'").fetchone()[0] == 1
+    assert_rollups_match(conn)
+
+def test_insert_entries_resumes_after_a_failed_read(journal):
+    create_progress_table(journal)
+
+    def failing_rows():
+        for number, row in enumerate(import_rows(25)):
+            if number == 12:
+                raise OSError('read error')
+            yield row
+
+    with pytest.raises(OSError):
+        insert_entries(journal, failing_rows(), 5, record_batch)
+    assert rows_done(journal) == 10
+    assert journal.execute('SELECT COUNT(*) FROM entries').fetchone()[0] == 10
+
+    remaining = list(import_rows(25))[rows_done(journal):]
+    assert insert_entries(journal, remaining, 5, record_batch) == 15
+    assert rows_done(journal) == 25
+    assert_imported(journal, 25)
+
+def test_insert_entries_rolls_back_a_failed_batch(journal):
+    create_progress_table(journal)
+    batches = []
+
+    def record_until_second_batch(cursor, count):
+        batches.append(count)
+        if len(batches) == 2:
+            raise sqlite3.OperationalError('database is locked')
+        record_batch(cursor, count)
+
+    with pytest.raises(sqlite3.OperationalError):
+        insert_entries(journal, import_rows(12), 5, record_until_second_batch)
+    assert rows_done(journal) == 5
+    assert journal.execute('SELECT COUNT(*) FROM entries').fetchone()[0] == 5
+    assert journal.execute('SELECT COUNT(*) FROM entry_activities WHERE entry_id > 5').fetchone()[0] == 0
+
+    remaining = list(import_rows(12))[rows_done(journal):]
+    assert insert_entries(journal, remaining, 5, record_batch) == 7
+    assert_imported(journal, 12)
@@ -0,0 +1,67 @@
+import datetime
+import io
+import json
+
+import pytest
+
+from journal_core import MOOD_IDS, add_entry, get_mood_id, iter_export_rows, load_moods, write_export
+from scripts import load_script
+
+csv_to_sqlite = load_script('csv_to_sqlite')
+
+NOTES = [
+    ('Commas, "quotes"', 'Line one\nline two, with a comma'),
+    (None, 'Ünïcödé ☕ and a trailing space '),
+    ('Empty note', None),
+    ('=SUM(A1)', '"'),
+]
+
+@pytest.fixture
+def exported(journal):
+    mood_ids = {name: mood_id for mood_id, name in load_moods(journal).items()}
+    moods = [MOOD_IDS['Rad'], get_mood_id(journal.cursor(), mood_ids, 'Sleepy'), MOOD_IDS['meh']]
+    for number, (note_title, note) in enumerate(NOTES * 3):
+        add_entry(journal, datetime.date(2024, 5, 1 + number), datetime.time(8 + number % 2, 30),
+                  moods[number % 3], [['work', 'sport'], [], ['birdwatching']][number % 3], note_title, note)
+    journal.commit()
+    return journal
+
+def export_text(conn, export_format, **filters):
+    output = io.StringIO(newline='')
+    count = write_export(conn, output, export_format, **filters)
+    return output.getvalue(), count
+
+def test_csv_export_imports_to_the_same_entries(exported, tmp_path):
+    text, count = export_text(exported, 'CSV')
+    assert count == 12
+    csv_path = tmp_path / 'export.csv'
+    csv_path.write_text(text, encoding='utf-8', newline='')
+
+    conn = csv_to_sqlite.create_database(str(tmp_path / 'imported.db'))
+    assert csv_to_sqlite.process_csv(conn, str(csv_path), batch_size=5) == 12
+    assert export_text(conn, 'CSV') == (text, 12)
+    conn.close()
+
+@pytest.mark.parametrize('export_format', ['NDJSON', 'JSON'])
+def test_json_exports(exported, export_format):
+    text, count = export_text(exported, export_format)
+    entries = ([json.loads(line) for line in text.splitlines()] if export_format == 'NDJSON'
+               else json.loads(text))
+    assert entries == list(iter_export_rows(exported))
+    assert len(entries) == count == 12
+    assert entries[0]['activities'] == ['work', 'sport']
+    assert entries[1]['mood'] == 'Sleepy'
+    assert entries[2]['note'] is None
+
+def test_export_filters(exported):
+    rows = list(iter_export_rows(exported, datetime.date(2024, 5, 2), datetime.date(2024, 5, 7),
+                                 [MOOD_IDS['Rad']], batch_size=1))
+    assert [row['full_date'] for row in rows] == ['2024-05-04', '2024-05-07']
+
+@pytest.mark.parametrize('export_format, empty', [
+    ('CSV', 'full_date,date,weekday,time,mood,activities,note_title,note\r\n'),
+    ('NDJSON', ''),
+    ('JSON', '[]\n'),
+])
+def test_empty_exports(journal, export_format, empty):
+    assert export_text(journal, export_format) == (empty, 0)
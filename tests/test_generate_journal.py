@@ -0,0 +1,24 @@
+import sqlite3
+
+import pytest
+
+from scripts import BENCHMARKS, load_script
+
+generate_journal = load_script('generate_journal', BENCHMARKS)
+
+@pytest.mark.parametrize('size, count', [('0', 0), ('12', 12), ('2k', 2000), ('1M', 1000000)])
+def test_parse_size(size, count):
+    assert generate_journal.parse_size(size) == count
+
+def test_parse_size_rejects_negative_sizes():
+    with pytest.raises(ValueError):
+        generate_journal.parse_size('-1k')
+
+@pytest.mark.parametrize('count', [0, 1, 5])
+def test_build_database(tmp_path, count):
+    assert len(list(generate_journal.generate_entries(count))) == count
+    db_path = str(tmp_path / 'journal.db')
+    generate_journal.build_database(db_path, count)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0] == count
+    conn.close()
@@ -0,0 +1,265 @@
+import collections
+import datetime
+import os
+import shutil
+import sqlite3
+import threading
+
+import pytest
+
+from invariants import assert_rollups_match
+from journal_core import (
+    ACTIVITY_MASK_BITS,
+    JOURNAL_MIGRATIONS,
+    MOOD_IDS,
+    ConnectionPool,
+    activities_from_mask,
+    build_entry_list_query,
+    fetch_entry_page,
+    get_entry,
+    load_activity_bits,
+    load_writing_streaks,
+    open_journal,
+    run_migrations,
+)
+
+LEGACY_JOURNAL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'old tests', 'journal.db')
+
+START = datetime.date(2024, 1, 1)
+END = datetime.date(2024, 12, 31)
+
+# The tables as the app created them before the schema was versioned
+BASELINE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        full_date DATE NOT NULL,
+        date TEXT NOT NULL,
+        weekday TEXT NOT NULL,
+        time TIME NOT NULL,
+        mood TEXT NOT NULL,
+        note_title TEXT,
+        note TEXT
+    );
+    CREATE TABLE IF NOT EXISTS activities (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS entry_activities (
+        entry_id INTEGER,
+        activity_id INTEGER,
+        FOREIGN KEY(entry_id) REFERENCES entries(id),
+        FOREIGN KEY(activity_id) REFERENCES activities(id)
+    );
+'''
+BASELINE_ACTIVITIES = [
+    'work', 'relax', 'friends', 'date', 'sport', 'celebration',
+    'watching', 'reading', 'gaming', 'shopping', 'travel',
+    'good meal', 'cleaning', 'thinking', 'beaten up', 'art',
+    'sleeping', 'adrenaline', 'IDEA'
+]
+BASELINE_ENTRIES = [
+    # full_date, time, mood, activities, note_title, note
+    ('2024-03-01', '08:15', 'Rad', ['work', 'sport'], 'Morning run', 'Ran along the river'),
+    ('2024-03-02', '21:40', 'meh', ['relax', 'relax'], None, 'Quiet evening'),
+    ('2024-03-02', '07:05', 'Sleepy', [], 'Early start', None),
+    ('2024-03-05', '12:00', 'Bad', ['work', 'hiking'], 'Rain', 'Walked home in the rain'),
+    ('2024-03-06', '18:30', 'Great', ['hiking', 'friends', 'good meal'], 'Summit', 'Dinner after the hike'),
+]
+
+def create_baseline_journal(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    for activity in BASELINE_ACTIVITIES:
+        conn.execute('INSERT OR IGNORE INTO activities (name) VALUES (?)', (activity,))
+    # An activity added and removed again leaves a gap in the activity ids
+    conn.execute("INSERT INTO activities (name) VALUES ('cooking')")
+    conn.execute("DELETE FROM activities WHERE name = 'cooking'")
+    conn.execute("INSERT INTO activities (name) VALUES ('hiking')")
+    for full_date, time, mood, activities, note_title, note in BASELINE_ENTRIES:
+        cursor = conn.execute('''
+            INSERT INTO entries (full_date, date, weekday, time, mood, note_title, note)
+            VALUES (?, '', '', ?, ?, ?, ?)
+        ''', (full_date, time, mood, note_title, note))
+        for activity in activities:
+            conn.execute('''
+                INSERT INTO entry_activities (entry_id, activity_id)
+                SELECT ?, id FROM activities WHERE name = ?
+            ''', (cursor.lastrowid, activity))
+    conn.commit()
+    return conn
+
+@pytest.fixture
+def baseline_journal(tmp_path):
+    path = str(tmp_path / 'baseline.db')
+    create_baseline_journal(path).close()
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+def user_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def schema(conn):
+    return conn.execute('SELECT type, name, sql FROM sqlite_master ORDER BY name').fetchall()
+
+def entry_moods(conn):
+    rows = conn.execute('SELECT entries.id, moods.name FROM entries JOIN moods ON moods.id = entries.mood_id')
+    return {row[0]: row[1] for row in rows}
+
+def test_migrates_baseline_journal(baseline_journal):
+    run_migrations(baseline_journal, JOURNAL_MIGRATIONS)
+
+    assert user_version(baseline_journal) == len(JOURNAL_MIGRATIONS)
+    assert entry_moods(baseline_journal) == {entry_id: entry[2] for entry_id, entry in
+                                             enumerate(BASELINE_ENTRIES, start=1)}
+    assert baseline_journal.execute("SELECT id FROM moods WHERE name = 'Sleepy'").fetchone()[0] > len(MOOD_IDS)
+    indexes = {row['name'] for row in baseline_journal.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {'idx_entries_full_date', 'idx_entry_activities_entry', 'idx_entry_activities_activity'} <= indexes
+    # The duplicate activity of the second entry is dropped for the unique index
+    assert baseline_journal.execute('SELECT COUNT(*) FROM entry_activities WHERE entry_id = 2').fetchone()[0] == 1
+    with pytest.raises(sqlite3.IntegrityError):
+        baseline_journal.execute('INSERT INTO entry_activities (entry_id, activity_id) VALUES (2, 2)')
+    assert_rollups_match(baseline_journal)
+
+    # Activity bits are dense despite the gap left by 'cooking'
+    bits = load_activity_bits(baseline_journal)
+    assert sorted(bits.values()) == list(range(len(BASELINE_ACTIVITIES) + 1))
+    activity_names = {bit: name for name, bit in baseline_journal.execute('SELECT name, bit FROM activities')}
+    mask = baseline_journal.execute('SELECT activity_mask FROM entries WHERE id = 5').fetchone()[0]
+    assert sorted(activities_from_mask(mask, activity_names)) == ['friends', 'good meal', 'hiking']
+
+    # Existing notes are searchable
+    query, params, _ = build_entry_list_query(START, END, fts_query='"rain"')
+    assert [row['id'] for row in fetch_entry_page(baseline_journal, query, params, 20)] == [4]
+    assert load_writing_streaks(baseline_journal, today=datetime.date(2024, 3, 7)) == {'current': 2, 'longest': 2}
+
+def test_use_mood_ids_rebuild(baseline_journal):
+    use_mood_ids_version = [migration.__name__ for migration in JOURNAL_MIGRATIONS].index('use_mood_ids')
+    run_migrations(baseline_journal, JOURNAL_MIGRATIONS[:use_mood_ids_version])
+    # The newest entry is deleted, so its id is only remembered by sqlite_sequence
+    baseline_journal.execute('DELETE FROM entry_activities WHERE entry_id = 5')
+    baseline_journal.execute('DELETE FROM entries WHERE id = 5')
+    baseline_journal.commit()
+
+    run_migrations(baseline_journal, JOURNAL_MIGRATIONS)
+
+    columns = [row['name'] for row in baseline_journal.execute('PRAGMA table_info(entries)')]
+    assert 'mood' not in columns and 'mood_id' in columns
+    assert {name: mood_id for mood_id, name in baseline_journal.execute('SELECT id, name FROM moods')
+            if name in MOOD_IDS} == MOOD_IDS
+    assert entry_moods(baseline_journal) == {entry_id: entry[2] for entry_id, entry in
+                                             enumerate(BASELINE_ENTRIES[:4], start=1)}
+    assert_rollups_match(baseline_journal)
+
+    # Deleted ids are not handed out again, and the rebuilt table's triggers fire
+    cursor = baseline_journal.execute('''
+        INSERT INTO entries (full_date, date, weekday, time, mood_id, note_title, note)
+        VALUES ('2024-03-03', '', '', '10:00', ?, 'Rebuilt', 'Written after the rebuild')
+    ''', (MOOD_IDS['Great'],))
+    baseline_journal.execute("INSERT INTO entry_activities (entry_id, activity_id) VALUES (?, 1)",
+                             (cursor.lastrowid,))
+    baseline_journal.commit()
+    assert cursor.lastrowid == 6
+    assert_rollups_match(baseline_journal)
+    query, params, _ = build_entry_list_query(START, END, fts_query='"rebuild"*')
+    assert [row['id'] for row in fetch_entry_page(baseline_journal, query, params, 20)] == [6]
+
+def test_activities_beyond_the_mask_get_no_bit(journal):
+    for number in range(ACTIVITY_MASK_BITS):
+        journal.execute('INSERT INTO activities (name) VALUES (?)', (f'activity {number}',))
+    journal.commit()
+    bits = load_activity_bits(journal)
+    assert sorted(bits.values()) == list(range(ACTIVITY_MASK_BITS))
+    assert journal.execute('SELECT COUNT(*) FROM activities WHERE bit IS NULL').fetchone()[0] == 19
+
+    # A deleted activity's slot goes to the next new activity
+    bit = journal.execute("SELECT bit FROM activities WHERE name = 'art'").fetchone()[0]
+    journal.execute("DELETE FROM activities WHERE name = 'art'")
+    journal.execute("INSERT INTO activities (name) VALUES ('pottery')")
+    journal.commit()
+    assert journal.execute("SELECT bit FROM activities WHERE name = 'pottery'").fetchone()[0] == bit
+
+def test_migrations_leave_an_up_to_date_journal_alone(baseline_journal):
+    assert run_migrations(baseline_journal, JOURNAL_MIGRATIONS) == len(JOURNAL_MIGRATIONS)
+    before = schema(baseline_journal)
+    changes = baseline_journal.total_changes
+    assert run_migrations(baseline_journal, JOURNAL_MIGRATIONS) == len(JOURNAL_MIGRATIONS)
+    assert baseline_journal.total_changes == changes
+    assert schema(baseline_journal) == before
+    assert user_version(baseline_journal) == len(JOURNAL_MIGRATIONS)
+
+def test_concurrent_migrations_run_each_migration_once(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'journal.db'))
+    calls = collections.Counter()
+
+    def counted(migration):
+        def run(cursor):
+            calls[migration.__name__] += 1
+            migration(cursor)
+        return run
+
+    migrations = [counted(migration) for migration in JOURNAL_MIGRATIONS]
+    barrier = threading.Barrier(4)
+    versions = []
+    errors = []
+
+    def migrate():
+        try:
+            with pool.connection() as conn:
+                barrier.wait()
+                versions.append(run_migrations(conn, migrations))
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=migrate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert versions == [len(JOURNAL_MIGRATIONS)] * 4
+    assert calls == {migration.__name__: 1 for migration in JOURNAL_MIGRATIONS}
+    with pool.connection() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM activities').fetchone()[0] == len(BASELINE_ACTIVITIES)
+
+def test_failed_migration_is_rolled_back(baseline_journal):
+    def broken_migration(cursor):
+        cursor.execute('CREATE TABLE half_done (id INTEGER)')
+        raise sqlite3.OperationalError('disk I/O error')
+
+    with pytest.raises(sqlite3.OperationalError):
+        run_migrations(baseline_journal, JOURNAL_MIGRATIONS[:2] + [broken_migration])
+    assert user_version(baseline_journal) == 2
+    assert 'half_done' not in {row['name'] for row in schema(baseline_journal)}
+
+    run_migrations(baseline_journal, JOURNAL_MIGRATIONS)
+    assert user_version(baseline_journal) == len(JOURNAL_MIGRATIONS)
+
+def test_only_populated_tables_are_analyzed(journal, baseline_journal):
+    # A journal created empty gets no planner statistics at all
+    assert journal.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()[0] == 0
+
+    run_migrations(baseline_journal, JOURNAL_MIGRATIONS)
+    analyzed = {row[0] for row in baseline_journal.execute('SELECT tbl FROM sqlite_stat1')}
+    assert analyzed == {'entries', 'entry_activities'}
+
+def test_migrates_legacy_journal(tmp_path):
+    # journal.db of the app's first version, with one journal_entries row
+    path = str(tmp_path / 'journal.db')
+    shutil.copy(LEGACY_JOURNAL, path)
+    conn = open_journal(path)
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'journal_entries'").fetchone()[0] == 0
+    entry = get_entry(conn, 1)
+    assert (entry['full_date'], entry['date'], entry['weekday'], entry['time']) == (
+        '2025-02-12', 'February 12', 'Wednesday', '20:42')
+    assert entry['mood'] == 'Happy'
+    assert entry['mood_id'] > len(MOOD_IDS)
+    assert sorted(entry['activities']) == ['Study', 'work']
+    assert (entry['note_title'], entry['note']) == ('Test Title', 'This is  a test entry text')
+    assert_rollups_match(conn)
+    query, params, _ = build_entry_list_query(datetime.date(2025, 1, 1), datetime.date(2025, 12, 31),
+                                              fts_query='"test"')
+    assert [row['id'] for row in fetch_entry_page(conn, query, params, 20)] == [1]
+    conn.close()
@@ -0,0 +1,72 @@
+import datetime
+
+import pytest
+
+from journal_core import MOOD_IDS, add_entry, build_fts_query, search_entries
+
+START = datetime.date(2024, 1, 1)
+END = datetime.date(2024, 12, 31)
+
+@pytest.mark.parametrize('search_text, fts_query', [
+    ('', ''),
+    ('   ', ''),
+    ('walk dog', '"walk" "dog"'),
+    ('"long walk" dog', '"long walk" "dog"'),
+    ('walk*', '"walk"*'),
+    ('"long wa"*', '"long wa"'),
+    ('*', ''),
+    ('""', ''),
+    ('"', ''),
+    ('"unfinished phrase', '"unfinished" "phrase"'),
+    ('it"s', '"its"'),
+    ('AND OR NOT', '"AND" "OR" "NOT"'),
+    ('NEAR(walk dog)', '"NEAR(walk" "dog)"'),
+    ('title:walk -dog ^x', '"title:walk" "-dog" "^x"'),
+    ('Ünïcode 🐦', '"Ünïcode" "🐦"'),
+])
+def test_build_fts_query(search_text, fts_query):
+    assert build_fts_query(search_text) == fts_query
+
+@pytest.fixture
+def notes(journal):
+    add_entry(journal, datetime.date(2024, 3, 1), datetime.time(9), MOOD_IDS['Rad'], [], 'Walk', 'Around the lake')
+    add_entry(journal, datetime.date(2024, 3, 2), datetime.time(9), MOOD_IDS['meh'], [], 'Rain', 'A short walk in the rain')
+    add_entry(journal, datetime.date(2024, 3, 3), datetime.time(9), MOOD_IDS['Great'], [], 'Walking', 'Walked to the walkway')
+    add_entry(journal, datetime.date(2024, 3, 4), datetime.time(9), MOOD_IDS['Bad'], [], 'Work', 'Nothing to see here')
+    journal.commit()
+    return journal
+
+def search(conn, search_text, page_start=None, page_size=10):
+    return search_entries(conn, search_text, START, END, page_start, page_size)
+
+@pytest.mark.parametrize('search_text', ['"', 'AND', 'NEAR(walk', 'title:walk', '-walk', '^walk', '*walk*'])
+def test_odd_search_text_does_not_raise(notes, search_text):
+    search(notes, search_text)
+
+def test_title_matches_rank_first(notes):
+    rows, _ = search(notes, 'walk')
+    assert [row['note_title'] for row in rows] == ['Walk', 'Rain']
+    assert '**walk**' in rows[1]['excerpt']
+
+def test_prefix_and_phrase_search(notes):
+    rows, _ = search(notes, 'walk*')
+    assert {row['note_title'] for row in rows} == {'Walk', 'Rain', 'Walking'}
+    rows, _ = search(notes, '"in the rain"')
+    assert [row['note_title'] for row in rows] == ['Rain']
+
+def test_search_pages(notes):
+    ids = []
+    page_start = None
+    while True:
+        rows, page_start = search(notes, 'walk*', page_start, page_size=1)
+        ids += [row['id'] for row in rows]
+        if page_start is None:
+            break
+    assert sorted(ids) == [1, 2, 3]
+
+def test_deleted_and_edited_notes_leave_the_index(notes):
+    notes.execute('DELETE FROM entries WHERE id = 1')
+    notes.execute("UPDATE entries SET note = 'A short stroll in the rain' WHERE id = 2")
+    notes.commit()
+    rows, _ = search(notes, 'walk')
+    assert rows == []
@@ -0,0 +1,91 @@
+import datetime
+import json
+import sqlite3
+
+import pytest
+
+from journal_core import MOOD_IDS, SqlTracer, add_entry, build_entry_list_query, fetch_entry_page
+from journal_core.analytics import load_mood_counts
+
+START = datetime.date(2024, 1, 1)
+END = datetime.date(2024, 12, 31)
+
+@pytest.fixture
+def tracer():
+    return SqlTracer()
+
+def test_statements_are_recorded_without_values(journal, tracer):
+    traced = tracer.wrap(journal, 'journal')
+    tracer.start_rerun()
+    tracer.begin_section('Read')
+    traced.execute("""
+        SELECT id
+        FROM entries WHERE note = ? AND time > ?
+    """, ('a private note', 3)).fetchall()
+    tracer.end_section()
+
+    record, = tracer.rerun_records()
+    assert record['statement'] == 'SELECT id FROM entries WHERE note = ? AND time > ?'
+    assert record['params'] == '(str, int)'
+    assert record['section'] == 'Read'
+    assert record['database'] == 'journal'
+    assert 'a private note' not in tracer.to_jsonl()
+    section, = tracer.rerun_sections()
+    assert section['section'] == 'Read'
+
+def test_rows_are_counted_as_they_are_fetched(journal, tracer):
+    traced = tracer.wrap(journal, 'journal')
+    with traced:
+        for day in range(1, 8):
+            add_entry(traced, datetime.date(2024, 5, day), datetime.time(8), MOOD_IDS['Rad'], ['work'], None, f'Day {day}')
+    inserts = [record for record in tracer.records if record['statement'].startswith('INSERT INTO entries')]
+    assert len(inserts) == 7
+    assert all(record['rows'] == 1 for record in inserts)
+
+    tracer.start_rerun()
+    query, params, _ = build_entry_list_query(START, END, page_size=5)
+    rows = fetch_entry_page(traced, query, params, 5)
+    assert len(rows) == 6
+    record, = tracer.rerun_records()
+    assert record['rows'] == 6
+
+    traced.executemany('UPDATE entries SET note_title = ? WHERE id = ?', [('x', 1), ('y', 2), ('z', 99)])
+    record = tracer.rerun_records()[-1]
+    assert record['params'] == '3 × (str, int)'
+    assert record['rows'] == 2
+
+def test_explain_records_query_plans(journal):
+    tracer = SqlTracer(explain=True)
+    traced = tracer.wrap(journal, 'journal')
+    traced.execute('SELECT id FROM entries WHERE full_date = ?', ('2024-05-01',)).fetchall()
+    traced.execute("UPDATE entries SET note = '' WHERE id = 1")
+    select, update = tracer.records
+    assert any('idx_entries_full_date' in step for step in select['plan'])
+    assert update['plan'] is None
+
+def test_traced_connection_works_with_analytics(journal, tracer):
+    add_entry(journal, START, datetime.time(8), MOOD_IDS['Rad'], [], None, None)
+    journal.commit()
+    traced = tracer.wrap(journal, 'journal')
+    counts = load_mood_counts(traced)
+    assert len(counts) == 1
+    assert tracer.records
+
+def test_slowest_and_export(journal, tracer):
+    traced = tracer.wrap(journal, 'journal')
+    tracer.start_rerun()
+    for _ in range(3):
+        traced.execute('SELECT COUNT(*) FROM entries').fetchone()
+    tracer.records[1]['ms'] = 1000.0
+    assert tracer.slowest(limit=1) == [tracer.records[1]]
+    assert tracer.slowest(rerun=0) == []
+
+    lines = [json.loads(line) for line in tracer.to_jsonl().splitlines()]
+    assert [line['type'] for line in lines] == ['statement'] * 3
+    assert SqlTracer().to_jsonl() == ''
+
+def test_failed_statements_are_still_recorded(journal, tracer):
+    traced = tracer.wrap(journal, 'journal')
+    with pytest.raises(sqlite3.OperationalError):
+        traced.execute('SELECT missing FROM entries')
+    assert tracer.records[-1]['statement'] == 'SELECT missing FROM entries'
@@ -0,0 +1,110 @@
+import datetime
+import random
+
+from invariants import assert_rollups_match
+from journal_core import MOOD_IDS, add_entry, delete_entry, load_writing_streaks
+
+def add(conn, day, activities=(), mood='Rad'):
+    entry_id = add_entry(conn, datetime.date.fromisoformat(day), datetime.time(12, 0), MOOD_IDS[mood], list(activities),
+                         None, None)
+    conn.commit()
+    return entry_id
+
+def daily_mood_counts(conn):
+    rows = conn.execute('''
+        SELECT day, moods.name, n FROM daily_mood_counts
+        JOIN moods ON moods.id = daily_mood_counts.mood_id
+        ORDER BY day, mood_id
+    ''')
+    return [tuple(row) for row in rows]
+
+def test_daily_mood_counts(journal):
+    first = add(journal, '2024-05-01')
+    add(journal, '2024-05-01')
+    add(journal, '2024-05-01', mood='meh')
+    assert daily_mood_counts(journal) == [('2024-05-01', 'Rad', 2), ('2024-05-01', 'meh', 1)]
+
+    # Rows that drop to zero are removed
+    journal.execute('UPDATE entries SET mood_id = ? WHERE mood_id = ?', (MOOD_IDS['Bad'], MOOD_IDS['meh']))
+    journal.execute("UPDATE entries SET full_date = '2024-05-02' WHERE id = ?", (first,))
+    journal.commit()
+    assert daily_mood_counts(journal) == [('2024-05-01', 'Rad', 1), ('2024-05-01', 'Bad', 1), ('2024-05-02', 'Rad', 1)]
+
+    delete_entry(journal, first)
+    journal.commit()
+    assert_rollups_match(journal)
+
+def streaks(conn):
+    return [tuple(row) for row in conn.execute('SELECT start_day, end_day, days FROM writing_streaks ORDER BY start_day')]
+
+def test_streaks_join_and_split(journal):
+    first = add(journal, '2024-05-01')
+    add(journal, '2024-05-03')
+    assert streaks(journal) == [('2024-05-01', '2024-05-01', 1), ('2024-05-03', '2024-05-03', 1)]
+
+    middle = add(journal, '2024-05-02')
+    assert streaks(journal) == [('2024-05-01', '2024-05-03', 3)]
+
+    # A second entry on a day does not change the streak, and losing it neither
+    second = add(journal, '2024-05-02')
+    delete_entry(journal, second)
+    journal.commit()
+    assert streaks(journal) == [('2024-05-01', '2024-05-03', 3)]
+
+    delete_entry(journal, middle)
+    journal.commit()
+    assert streaks(journal) == [('2024-05-01', '2024-05-01', 1), ('2024-05-03', '2024-05-03', 1)]
+
+    # Moving an entry leaves its old day and joins the new one
+    journal.execute("UPDATE entries SET full_date = '2024-05-04' WHERE id = ?", (first,))
+    journal.commit()
+    assert streaks(journal) == [('2024-05-03', '2024-05-04', 2)]
+    assert load_writing_streaks(journal, today=datetime.date(2024, 5, 5)) == {'current': 2, 'longest': 2}
+    assert load_writing_streaks(journal, today=datetime.date(2024, 5, 6)) == {'current': 0, 'longest': 2}
+
+def test_streaks_skip_days_that_are_not_dates(journal):
+    journal.execute('''
+        INSERT INTO entries (full_date, date, weekday, time, mood_id)
+        VALUES ('someday', '', '', '12:00', ?)
+    ''', (MOOD_IDS['meh'],))
+    journal.commit()
+    assert streaks(journal) == []
+    assert_rollups_match(journal)
+
+def test_activity_masks_follow_entry_activities(journal):
+    entry_id = add(journal, '2024-05-01', ['work', 'sport'])
+    assert_rollups_match(journal)
+
+    journal.execute('''
+        DELETE FROM entry_activities
+        WHERE entry_id = ? AND activity_id = (SELECT id FROM activities WHERE name = 'work')
+    ''', (entry_id,))
+    journal.commit()
+    assert_rollups_match(journal)
+
+    # Deleting an activity clears its bit from every entry
+    journal.execute("DELETE FROM entry_activities WHERE activity_id = (SELECT id FROM activities WHERE name = 'sport')")
+    journal.execute("DELETE FROM activities WHERE name = 'sport'")
+    journal.commit()
+    assert journal.execute('SELECT activity_mask FROM entries WHERE id = ?', (entry_id,)).fetchone()[0] == 0
+    assert_rollups_match(journal)
+
+def test_rollups_survive_random_edits(journal):
+    rng = random.Random(7)
+    activities = [row[0] for row in journal.execute('SELECT name FROM activities')]
+    days = [(datetime.date(2024, 1, 1) + datetime.timedelta(days=offset)).isoformat() for offset in range(20)]
+    entry_ids = []
+    for _ in range(300):
+        action = rng.random()
+        if action < 0.5 or not entry_ids:
+            entry_ids.append(add(journal, rng.choice(days), rng.sample(activities, rng.randint(0, 4)),
+                                 rng.choice(list(MOOD_IDS))))
+        elif action < 0.7:
+            journal.execute('UPDATE entries SET full_date = ? WHERE id = ?', (rng.choice(days), rng.choice(entry_ids)))
+        elif action < 0.85:
+            journal.execute('UPDATE entries SET mood_id = ? WHERE id = ?',
+                            (rng.choice(list(MOOD_IDS.values())), rng.choice(entry_ids)))
+        else:
+            delete_entry(journal, entry_ids.pop(rng.randrange(len(entry_ids))))
+        journal.commit()
+        assert_rollups_match(journal)
@@ -0,0 +1,59 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from journal_core import DatabaseWorker
+
+def wait_for_results(worker, count, timeout=5):
+    delivered = 0
+    deadline = time.monotonic() + timeout
+    while delivered < count:
+        assert time.monotonic() < deadline, 'the worker did not finish in time'
+        delivered += worker.deliver_results()
+        time.sleep(0.01)
+
+@pytest.fixture
+def worker(tmp_path):
+    worker = DatabaseWorker(str(tmp_path / 'journal.db'))
+    yield worker
+    worker.close()
+
+def test_calls_run_in_order_on_the_worker_thread(worker):
+    results = []
+    threads = set()
+
+    def count_entries(conn, label):
+        threads.add(threading.current_thread().name)
+        return label, conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def add(conn):
+        conn.execute("INSERT INTO entries (full_date, date, weekday, time, mood_id) VALUES ('2024-05-01', '', '', '', 1)")
+
+    worker.submit(count_entries, 'before', on_done=results.append)
+    worker.submit(add)
+    worker.submit(count_entries, 'after', on_done=results.append)
+    # Callbacks only run when the UI thread asks for them
+    time.sleep(0.1)
+    assert results == []
+    wait_for_results(worker, 3)
+    assert results == [('before', 0), ('after', 1)]
+    assert threads == {'database-worker'}
+
+def test_failed_calls_are_rolled_back(worker):
+    errors = []
+
+    def half_done(conn):
+        conn.execute("INSERT INTO entries (full_date, date, weekday, time, mood_id) VALUES ('2024-05-01', '', '', '', 1)")
+        conn.execute('SELECT missing FROM entries')
+
+    worker.submit(half_done, on_error=errors.append)
+    worker.submit(half_done)
+    counts = []
+    worker.submit(lambda conn: conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0], on_done=counts.append)
+    with pytest.raises(sqlite3.OperationalError):
+        wait_for_results(worker, 3)
+    wait_for_results(worker, 1)
+    assert isinstance(errors[0], sqlite3.OperationalError)
+    assert counts == [0]